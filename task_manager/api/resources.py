@@ -0,0 +1,152 @@
+from dataclasses import dataclass
+
+from django.contrib.auth import get_user_model
+from django.db.models import Prefetch
+
+from task_manager.labels.models import Label
+from task_manager.statuses.models import Status
+from task_manager.tasks.models import Task
+
+
+class UnknownField(ValueError):
+    pass
+
+
+@dataclass
+class ApiField:
+    getter: object
+    columns: tuple = ()
+    select_related: tuple = ()
+    prefetch: object = None
+
+
+def user_ref(user):
+    if user is None:
+        return None
+    return {
+        'id': user.id,
+        'first_name': user.first_name,
+        'last_name': user.last_name,
+    }
+
+
+def isoformat(value):
+    return value.isoformat() if value else None
+
+
+@dataclass
+class Resource:
+    model: type
+    fields: dict
+    ordering: tuple = ('id',)
+    default_fields: tuple = ()
+
+    def parse_fields(self, value):
+        if not value:
+            return list(self.default_fields or self.fields)
+        names = [name.strip() for name in value.split(',') if name.strip()]
+        unknown = [name for name in names if name not in self.fields]
+        if unknown:
+            raise UnknownField(', '.join(unknown))
+        return names
+
+    def queryset(self, names, base=None):
+        queryset = base if base is not None else self.model.objects.all()
+        columns = set(self.ordering)
+        related = set()
+        prefetches = []
+        for name in names:
+            api_field = self.fields[name]
+            columns.update(api_field.columns)
+            related.update(api_field.select_related)
+            if api_field.prefetch is not None:
+                prefetches.append(api_field.prefetch)
+        # Annotations such as search_rank are not model columns.
+        model_fields = {f.name for f in self.model._meta.concrete_fields}
+        columns = {
+            column for column in columns
+            if column.split('__')[0] in model_fields
+        }
+        if related:
+            queryset = queryset.select_related(*sorted(related))
+        if prefetches:
+            queryset = queryset.prefetch_related(*prefetches)
+        return queryset.only(*sorted(columns))
+
+    def serialize(self, obj, names):
+        return {name: self.fields[name].getter(obj) for name in names}
+
+
+TASKS = Resource(
+    model=Task,
+    ordering=('time_create', 'id'),
+    fields={
+        'id': ApiField(lambda task: task.id, ('id',)),
+        'name': ApiField(lambda task: task.name, ('name',)),
+        'description': ApiField(
+            lambda task: task.description, ('description',)
+        ),
+        'status': ApiField(
+            lambda task: {'id': task.status.id, 'name': task.status.name},
+            ('status', 'status__name'),
+            ('status',),
+        ),
+        'author': ApiField(
+            lambda task: user_ref(task.author),
+            ('author', 'author__first_name', 'author__last_name'),
+            ('author',),
+        ),
+        'executor': ApiField(
+            lambda task: user_ref(task.executor),
+            ('executor', 'executor__first_name', 'executor__last_name'),
+            ('executor',),
+        ),
+        'labels': ApiField(
+            lambda task: [
+                {'id': label.id, 'name': label.name}
+                for label in task.labels.all()
+            ],
+            prefetch=Prefetch('labels', queryset=Label.objects.only('name')),
+        ),
+        'time_create': ApiField(
+            lambda task: isoformat(task.time_create), ('time_create',)
+        ),
+    },
+)
+
+STATUSES = Resource(
+    model=Status,
+    fields={
+        'id': ApiField(lambda status: status.id, ('id',)),
+        'name': ApiField(lambda status: status.name, ('name',)),
+        'time_create': ApiField(
+            lambda status: isoformat(status.time_create), ('time_create',)
+        ),
+    },
+)
+
+LABELS = Resource(
+    model=Label,
+    fields={
+        'id': ApiField(lambda label: label.id, ('id',)),
+        'name': ApiField(lambda label: label.name, ('name',)),
+        'time_create': ApiField(
+            lambda label: isoformat(label.time_create), ('time_create',)
+        ),
+    },
+)
+
+USERS = Resource(
+    model=get_user_model(),
+    fields={
+        'id': ApiField(lambda user: user.id, ('id',)),
+        'username': ApiField(lambda user: user.username, ('username',)),
+        'first_name': ApiField(
+            lambda user: user.first_name, ('first_name',)
+        ),
+        'last_name': ApiField(lambda user: user.last_name, ('last_name',)),
+        'date_joined': ApiField(
+            lambda user: isoformat(user.date_joined), ('date_joined',)
+        ),
+    },
+)
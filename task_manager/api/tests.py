@@ -0,0 +1,120 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from task_manager.labels.models import Label
+from task_manager.statuses.models import Status
+from task_manager.tasks.models import Task
+from task_manager.users.models import CustomUser
+
+
+class TaskApiTest(TestCase):
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            username='api', first_name='Api', last_name='User'
+        )
+        self.other = CustomUser.objects.create_user(username='other')
+        self.status = Status.objects.create(name='Новый')
+        self.label = Label.objects.create(name='Баг')
+        self.client.force_login(self.user)
+        self.tasks_url = reverse('api:tasks')
+
+    def create_tasks(self, count):
+        tasks = Task.objects.bulk_create(
+            Task(
+                name=f'Task {i}',
+                description='',
+                author=self.user if i % 2 else self.other,
+                executor=self.user,
+                status=self.status,
+            )
+            for i in range(count)
+        )
+        Task.labels.through.objects.bulk_create(
+            Task.labels.through(task_id=task.id, label_id=self.label.id)
+            for task in tasks
+        )
+        return tasks
+
+    def test_requires_authentication(self):
+        self.client.logout()
+        response = self.client.get(self.tasks_url)
+        self.assertEqual(response.status_code, 401)
+
+    def test_sparse_fieldsets(self):
+        self.create_tasks(3)
+        response = self.client.get(self.tasks_url, {'fields': 'id,status'})
+        result = response.json()['results'][0]
+        self.assertEqual(set(result), {'id', 'status'})
+        self.assertEqual(result['status']['name'], 'Новый')
+
+    def test_unknown_field_is_rejected(self):
+        response = self.client.get(self.tasks_url, {'fields': 'id,secret'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_malformed_filter_is_rejected(self):
+        for params in ({'status': 'abc'}, {'executor': '9' * 30}):
+            with self.subTest(params=params):
+                response = self.client.get(self.tasks_url, params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('error', response.json())
+
+    def test_full_page_of_500_is_a_fixed_number_of_queries(self):
+        self.create_tasks(600)
+        # user + tasks with joined relations + labels
+        with self.assertNumQueries(3):
+            response = self.client.get(self.tasks_url, {'page_size': 500})
+        data = response.json()
+        self.assertEqual(len(data['results']), 500)
+        self.assertEqual(data['results'][0]['labels'][0]['name'], 'Баг')
+        self.assertIsNotNone(data['next'])
+
+    def test_sparse_fields_skip_relations(self):
+        self.create_tasks(5)
+        with self.assertNumQueries(2):
+            self.client.get(self.tasks_url, {'fields': 'id,name'})
+
+    def test_cursor_pagination_keeps_filters(self):
+        self.create_tasks(25)
+        seen = []
+        url, data = self.tasks_url, {'page_size': 4, 'self_tasks': 'on'}
+        while url:
+            payload = self.client.get(url, data).json()
+            seen.extend(task['id'] for task in payload['results'])
+            url, data = payload['next'], None
+        self.assertEqual(
+            seen,
+            list(
+                Task.objects.filter(author=self.user)
+                .order_by('time_create', 'id')
+                .values_list('id', flat=True)
+            ),
+        )
+
+    def test_task_detail(self):
+        task = self.create_tasks(1)[0]
+        response = self.client.get(
+            reverse('api:task', kwargs={'pk': task.pk}),
+            {'fields': 'name,labels'},
+        )
+        self.assertEqual(
+            response.json(),
+            {
+                'name': task.name,
+                'labels': [{'id': self.label.id, 'name': 'Баг'}],
+            },
+        )
+
+    def test_reference_lists(self):
+        for name, field, value in [
+            ('api:statuses', 'name', 'Новый'),
+            ('api:labels', 'name', 'Баг'),
+            ('api:users', 'username', 'api'),
+        ]:
+            with self.subTest(name=name):
+                response = self.client.get(reverse(name))
+                self.assertEqual(response.status_code, 200)
+                self.assertIn(
+                    value,
+                    [item[field] for item in response.json()['results']],
+                )
@@ -0,0 +1,23 @@
+from django.urls import path
+
+from task_manager.api import views as api_views
+
+app_name = 'api'
+
+urlpatterns = [
+    path('tasks/',
+         api_views.TaskListApiView.as_view(),
+         name='tasks'),
+    path('tasks/<int:pk>/',
+         api_views.TaskDetailApiView.as_view(),
+         name='task'),
+    path('statuses/',
+         api_views.StatusListApiView.as_view(),
+         name='statuses'),
+    path('labels/',
+         api_views.LabelListApiView.as_view(),
+         name='labels'),
+    path('users/',
+         api_views.UserListApiView.as_view(),
+         name='users'),
+]
@@ -0,0 +1,119 @@
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views.generic import View
+
+from task_manager.tasks.filters import (
+    InvalidFilter,
+    filter_tasks,
+    get_task_filters,
+    get_task_ordering,
+)
+from task_manager.tasks.pagination import (
+    InvalidCursor,
+    KeysetPaginator,
+    clamp_page_size,
+)
+
+from .resources import LABELS, STATUSES, TASKS, USERS, UnknownField
+
+API_PAGE_SIZE = 100
+API_MAX_PAGE_SIZE = 500
+
+
+def error(message, status):
+    return JsonResponse({'error': message}, status=status)
+
+
+class ApiLoginRequiredMixin:
+    def dispatch(self, request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return error('Требуется авторизация', 401)
+        return super().dispatch(request, *args, **kwargs)
+
+
+class ResourceListView(ApiLoginRequiredMixin, View):
+    resource = None
+
+    def get_base_queryset(self):
+        return self.resource.model.objects.all()
+
+    def get_ordering(self):
+        return self.resource.ordering
+
+    def get_filters(self):
+        return {}
+
+    def get(self, request, *args, **kwargs):
+        try:
+            names = self.resource.parse_fields(request.GET.get('fields'))
+        except UnknownField as unknown:
+            return error(f'Неизвестные поля: {unknown}', 400)
+
+        try:
+            queryset = self.get_base_queryset()
+        except InvalidFilter as invalid:
+            return error(f'Некорректный фильтр: {invalid}', 400)
+
+        paginator = KeysetPaginator(
+            self.resource.queryset(names, queryset),
+            self.get_ordering(),
+            clamp_page_size(
+                request.GET.get('page_size'), API_PAGE_SIZE, API_MAX_PAGE_SIZE
+            ),
+        )
+        try:
+            page = paginator.page(
+                request.GET.get('cursor'), self.get_filters()
+            )
+        except InvalidCursor:
+            return error('Некорректный курсор', 400)
+
+        next_url = None
+        if page.has_next:
+            params = request.GET.copy()
+            params['cursor'] = page.next_cursor
+            next_url = f'{request.path}?{params.urlencode()}'
+        return JsonResponse({
+            'results': [
+                self.resource.serialize(obj, names)
+                for obj in page.object_list
+            ],
+            'next': next_url,
+        })
+
+
+class TaskListApiView(ResourceListView):
+    resource = TASKS
+
+    def get_base_queryset(self):
+        return filter_tasks(
+            super().get_base_queryset(), self.request.GET, self.request.user
+        )
+
+    def get_ordering(self):
+        return get_task_ordering(self.request.GET)
+
+    def get_filters(self):
+        return get_task_filters(self.request.GET)
+
+
+class TaskDetailApiView(ApiLoginRequiredMixin, View):
+    def get(self, request, pk, *args, **kwargs):
+        try:
+            names = TASKS.parse_fields(request.GET.get('fields'))
+        except UnknownField as unknown:
+            return error(f'Неизвестные поля: {unknown}', 400)
+        task = get_object_or_404(TASKS.queryset(names), pk=pk)
+        return JsonResponse(TASKS.serialize(task, names))
+
+
+class StatusListApiView(ResourceListView):
+    resource = STATUSES
+
+
+class LabelListApiView(ResourceListView):
+    resource = LABELS
+
+
+class UserListApiView(ResourceListView):
+    resource = USERS
@@ -0,0 +1,425 @@
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection, connections
+from django.test import AsyncClient, Client, override_settings
+from django.urls import reverse
+
+from task_manager.labels.models import Label
+from task_manager.statuses.models import Status
+from task_manager.tasks.models import Task
+from task_manager.timing import percentile
+
+SAMPLE_SIZE = 1000
+
+
+@dataclass
+class Scenario:
+    name: str
+    url: object
+    data: object = None
+    anonymous: bool = False
+
+    def request(self, client, fixture):
+        url = self.url(fixture)
+        if self.data is None:
+            return client.get(url)
+        return client.post(url, self.data(fixture))
+
+    async def arequest(self, client, fixture):
+        url = self.url(fixture)
+        if self.data is None:
+            return await client.get(url)
+        return await client.post(url, self.data(fixture))
+
+
+class Fixture:
+    # Random existing rows for the scenarios to hit, so requests don't all
+    # land on the same (cached) page.
+
+    def __init__(self, seed=None):
+        self.random = random.Random(seed)
+        self.user = get_user_model().objects.order_by('pk').first()
+        self.task_ids = self.sample(Task)
+        self.status_ids = self.sample(Status)
+        self.label_ids = self.sample(Label)
+        self.user_ids = self.sample(get_user_model())
+        if not (self.user and self.task_ids and self.status_ids):
+            raise ValueError(
+                'The database needs at least one user, status and task; '
+                'run generate_fake_data first.'
+            )
+
+    def sample(self, model):
+        # Sampling over the pk range avoids ORDER BY RANDOM() on big tables.
+        queryset = model.objects.order_by('pk').values_list('pk', flat=True)
+        first, last = queryset.first(), queryset.last()
+        if first is None:
+            return []
+        picks = sorted({
+            self.random.randint(first, last) for _ in range(SAMPLE_SIZE)
+        })
+        return list(queryset.filter(pk__in=picks)) or [first]
+
+    def task(self):
+        return self.random.choice(self.task_ids)
+
+    def status(self):
+        return self.random.choice(self.status_ids)
+
+    def label(self):
+        return self.random.choice(self.label_ids) if self.label_ids else ''
+
+    def task_data(self):
+        return {
+            'name': f'Нагрузочная задача {self.random.randint(0, 10**9)}',
+            'description': 'Создана бенчмарком',
+            'status': self.status(),
+            'executor': self.random.choice(self.user_ids),
+            'labels': [self.label()] if self.label_ids else [],
+        }
+
+
+SCENARIOS = [
+    Scenario('task_list', lambda f: reverse('tasks:tasks')),
+    Scenario(
+        'login_redirect', lambda f: reverse('tasks:tasks'), anonymous=True
+    ),
+    Scenario(
+        'task_list_filtered',
+        lambda f: (
+            f'{reverse("tasks:tasks")}?status={f.status()}&label={f.label()}'
+        ),
+    ),
+    Scenario(
+        'task_search', lambda f: f'{reverse("tasks:tasks")}?q=задача'
+    ),
+    Scenario(
+        'task_detail',
+        lambda f: reverse('tasks:show_task', kwargs={'pk': f.task()}),
+    ),
+    Scenario('status_list', lambda f: reverse('statuses:statuses')),
+    Scenario('label_list', lambda f: reverse('labels:labels')),
+    Scenario('user_list', lambda f: reverse('users:users')),
+    Scenario('task_create_form', lambda f: reverse('tasks:create_task')),
+    Scenario(
+        'task_create',
+        lambda f: reverse('tasks:create_task'),
+        lambda f: f.task_data(),
+    ),
+    Scenario(
+        'task_edit_form',
+        lambda f: reverse('tasks:edit_task', kwargs={'pk': f.task()}),
+    ),
+    Scenario(
+        'task_edit',
+        lambda f: reverse('tasks:edit_task', kwargs={'pk': f.task()}),
+        lambda f: f.task_data(),
+    ),
+]
+
+
+class QueryCounter:
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def run_scenario(scenario, client, fixture, requests, warmup):
+    for _ in range(warmup):
+        scenario.request(client, fixture)
+
+    latencies = []
+    queries = []
+    counter = QueryCounter()
+    with connection.execute_wrapper(counter):
+        for _ in range(requests):
+            counter.count = 0
+            started = time.perf_counter()
+            response = scenario.request(client, fixture)
+            latencies.append((time.perf_counter() - started) * 1000)
+            queries.append(counter.count)
+            if response.status_code >= 400:
+                raise RuntimeError(
+                    f'{scenario.name}: HTTP {response.status_code}'
+                )
+
+    # Measured separately: tracing allocations slows requests down.
+    tracemalloc.start()
+    try:
+        scenario.request(client, fixture)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'requests': requests,
+        'p50_ms': round(percentile(latencies, 50), 2),
+        'p95_ms': round(percentile(latencies, 95), 2),
+        'p99_ms': round(percentile(latencies, 99), 2),
+        'queries': max(queries),
+        'peak_kib': round(peak / 1024, 1),
+    }
+
+
+def run(names=None, requests=50, warmup=5, host='localhost', seed=None):
+    fixture = Fixture(seed)
+    # The client runs the whole middleware stack in-process, the same way
+    # the WSGI handler does, without the network in the way.
+    client = Client(SERVER_NAME=host)
+    client.force_login(fixture.user)
+    anonymous = Client(SERVER_NAME=host)
+    return {
+        scenario.name: run_scenario(
+            scenario,
+            anonymous if scenario.anonymous else client,
+            fixture,
+            requests,
+            warmup,
+        )
+        for scenario in SCENARIOS
+        if not names or scenario.name in names
+    }
+
+
+# Throughput runs fire requests concurrently outside a transaction, so
+# only scenarios that don't write take part.
+READ_SCENARIOS = (
+    'task_list',
+    'task_list_filtered',
+    'task_search',
+    'task_detail',
+    'status_list',
+    'label_list',
+    'user_list',
+)
+
+
+def check_response(scenario, response):
+    if response.status_code >= 400:
+        raise RuntimeError(f'{scenario.name}: HTTP {response.status_code}')
+
+
+def split(requests, workers):
+    share, extra = divmod(requests, workers)
+    return [share + (worker < extra) for worker in range(workers)]
+
+
+def wsgi_latencies(scenario, fixture, requests, concurrency, cookies, host):
+    # One client per thread, like one WSGI worker thread per request.
+
+    def worker(count):
+        client = Client(SERVER_NAME=host)
+        client.cookies.update(cookies)
+        latencies = []
+        for _ in range(count):
+            started = time.perf_counter()
+            check_response(scenario, scenario.request(client, fixture))
+            latencies.append((time.perf_counter() - started) * 1000)
+        return latencies
+
+    def pooled_worker(count):
+        try:
+            return worker(count)
+        finally:
+            connections.close_all()
+
+    if concurrency == 1:
+        return worker(requests)
+    with ThreadPoolExecutor(concurrency) as pool:
+        return [
+            latency
+            for latencies in pool.map(
+                pooled_worker, split(requests, concurrency)
+            )
+            for latency in latencies
+        ]
+
+
+class HostAsyncClient(AsyncClient):
+    # AsyncClient always sends "Host: testserver" and appends any extra
+    # host header after it, so neither SERVER_NAME nor headers= reach
+    # request.get_host(). Rewrite the header instead.
+
+    def __init__(self, host, **defaults):
+        super().__init__(**defaults)
+        self.host = host.encode('ascii')
+
+    async def request(self, **request):
+        request['headers'] = [
+            (name, self.host if name == b'host' else value)
+            for name, value in request.get('headers', [])
+        ]
+        return await super().request(**request)
+
+
+def asgi_latencies(scenario, fixture, requests, concurrency, cookies, host):
+    # Requests share one event loop, at most ``concurrency`` in flight.
+
+    async def run_all():
+        client = HostAsyncClient(host)
+        client.cookies.update(cookies)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one():
+            async with semaphore:
+                started = time.perf_counter()
+                response = await scenario.arequest(client, fixture)
+                check_response(scenario, response)
+                return (time.perf_counter() - started) * 1000
+
+        return await asyncio.gather(*[one() for _ in range(requests)])
+
+    return list(async_to_sync(run_all)())
+
+
+ENTRY_POINTS = {
+    'wsgi': wsgi_latencies,
+    'asgi': asgi_latencies,
+}
+
+
+def throughput(entry_point='wsgi', names=None, requests=200, concurrency=10,
+               warmup=5, host='localhost', seed=None):
+    # In-process like run(): measures the handler, middleware and views,
+    # not a server's socket handling.
+    latencies_for = ENTRY_POINTS[entry_point]
+    fixture = Fixture(seed)
+    client = Client(SERVER_NAME=host)
+    client.force_login(fixture.user)
+    results = {}
+    for scenario in SCENARIOS:
+        if scenario.name not in READ_SCENARIOS or (
+            names and scenario.name not in names
+        ):
+            continue
+        if warmup:
+            latencies_for(
+                scenario, fixture, warmup, 1, client.cookies, host
+            )
+        started = time.perf_counter()
+        latencies = latencies_for(
+            scenario, fixture, requests, concurrency, client.cookies, host
+        )
+        elapsed = time.perf_counter() - started
+        results[scenario.name] = {
+            'requests': requests,
+            'concurrency': concurrency,
+            'rps': round(requests / elapsed, 1),
+            'p50_ms': round(percentile(latencies, 50), 2),
+            'p95_ms': round(percentile(latencies, 95), 2),
+        }
+    return results
+
+
+# Entry point and ASYNC_VIEWS for each setup compared by
+# `run_benchmarks --compare-entry-points`.
+ENTRY_POINT_SETUPS = {
+    'wsgi+sync_views': ('wsgi', 'false'),
+    'asgi+sync_views': ('asgi', 'false'),
+    'asgi+async_views': ('asgi', 'true'),
+}
+
+
+def compare_entry_points(names=None, requests=200, concurrency=10,
+                         warmup=5, host='localhost', seed=None):
+    # The URLconf picks the view classes on import, so every setup runs in
+    # a fresh process.
+    results = {}
+    for setup, (entry_point, async_views) in ENTRY_POINT_SETUPS.items():
+        command = [
+            sys.executable,
+            os.path.join(settings.BASE_DIR, 'manage.py'),
+            'run_benchmarks',
+            *(names or ()),
+            '--throughput', entry_point,
+            '--requests', str(requests),
+            '--concurrency', str(concurrency),
+            '--warmup', str(warmup),
+            '--host', host,
+            '--json',
+        ]
+        if seed is not None:
+            command += ['--seed', str(seed)]
+        process = subprocess.run(
+            command,
+            env={**os.environ, 'ASYNC_VIEWS': async_views},
+            capture_output=True,
+            text=True,
+        )
+        if process.returncode:
+            raise RuntimeError(f'{setup}: {process.stderr.strip()}')
+        results[setup] = json.loads(process.stdout)
+    return results
+
+
+# Session and flash message setups compared by
+# `run_benchmarks --compare-sessions`; the first one is what the project
+# used before sessions were cached and messages moved to a cookie.
+SESSION_SETUPS = {
+    'db+session_messages': {
+        'SESSION_ENGINE': 'django.contrib.sessions.backends.db',
+        'MESSAGE_STORAGE':
+            'django.contrib.messages.storage.session.SessionStorage',
+    },
+    'cached_db+cookie_messages': {
+        'SESSION_ENGINE': 'task_manager.sessions',
+        'MESSAGE_STORAGE':
+            'django.contrib.messages.storage.cookie.CookieStorage',
+    },
+    'signed_cookies+cookie_messages': {
+        'SESSION_ENGINE': 'django.contrib.sessions.backends.signed_cookies',
+        'MESSAGE_STORAGE':
+            'django.contrib.messages.storage.cookie.CookieStorage',
+    },
+}
+
+
+def compare_sessions(names=None, requests=50, warmup=5, host='localhost',
+                     seed=None):
+    results = {}
+    for setup, overrides in SESSION_SETUPS.items():
+        with override_settings(**overrides):
+            results[setup] = run(names, requests, warmup, host, seed)
+    return results
+
+
+def compare(results, baseline):
+    rows = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        for metric in ('p50_ms', 'p95_ms', 'queries', 'peak_kib'):
+            old = previous.get(metric) if previous else None
+            new = result[metric]
+            change = (new - old) / old * 100 if old else None
+            rows.append((name, metric, old, new, change))
+    return rows
+
+
+def load_baseline(path):
+    try:
+        with open(path) as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+
+
+def save_baseline(path, results):
+    with open(path, 'w') as file:
+        json.dump(results, file, indent=2, sort_keys=True)
+        file.write('\n')
@@ -0,0 +1,185 @@
+import time
+from dataclasses import dataclass
+from io import StringIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, get_resolver, reverse
+
+from task_manager.labels.models import Label
+from task_manager.tasks import choices
+from task_manager.tasks.models import Task
+
+# Queries and milliseconds each URL name may spend on one request against
+# a DATASET-sized database. Counts are taken with cold caches, so they are
+# the worst case a page can hit; anything per row on the task pages blows
+# the budget long before it shows up as latency.
+DATASET = {'users': 20, 'statuses': 5, 'labels': 20, 'tasks': 200}
+
+# URL names that are left out, with the reason.
+EXEMPT = {
+    'tasks:task_events': 'the stream never ends; see TaskEventsTest',
+}
+EXEMPT_NAMESPACES = {'admin'}
+
+
+@dataclass
+class Budget:
+    queries: int
+    ms: float
+    kwargs: object = None
+    params: object = None
+    data: object = None
+    anonymous: bool = False
+
+    def url(self, url_name, fixture):
+        kwargs = self.kwargs(fixture) if self.kwargs else None
+        return reverse(url_name, kwargs=kwargs)
+
+    def request(self, client, url, fixture):
+        if self.data is not None:
+            return client.post(url, self.data(fixture))
+        params = self.params(fixture) if self.params else None
+        return client.get(url, params)
+
+
+# Every logged-in count includes the session and the user; with cold
+# caches the session comes from the database.
+BUDGETS = {
+    'main_page': Budget(9, 150),
+    'login': Budget(0, 50, anonymous=True),
+    'logout': Budget(4, 50),
+    'tasks:tasks': Budget(5, 300),
+    'tasks:show_task': Budget(5, 100, kwargs=lambda f: {'pk': f.task.pk}),
+    'tasks:bulk_tasks': Budget(
+        7,
+        100,
+        data=lambda f: {
+            'action': 'add_label',
+            'label': f.label.pk,
+            'tasks': [f.task.pk],
+        },
+    ),
+    'tasks:export_tasks': Budget(4, 300, params=lambda f: {'format': 'csv'}),
+    'tasks:create_task': Budget(3, 100),
+    'tasks:edit_task': Budget(7, 100, kwargs=lambda f: {'pk': f.task.pk}),
+    'tasks:delete_task': Budget(3, 50, kwargs=lambda f: {'pk': f.task.pk}),
+    'statuses:statuses': Budget(4, 100),
+    'statuses:create_status': Budget(2, 50),
+    'statuses:edit_status': Budget(
+        3, 50, kwargs=lambda f: {'pk': f.task.status_id}
+    ),
+    'statuses:delete_status': Budget(
+        3, 50, kwargs=lambda f: {'pk': f.task.status_id}
+    ),
+    'labels:labels': Budget(4, 100),
+    'labels:autocomplete': Budget(3, 50, params=lambda f: {'q': 'Метка'}),
+    'labels:create_label': Budget(2, 50),
+    'labels:edit_label': Budget(3, 50, kwargs=lambda f: {'pk': f.label.pk}),
+    'labels:delete_label': Budget(
+        3, 50, kwargs=lambda f: {'pk': f.label.pk}
+    ),
+    'users:users': Budget(4, 100),
+    'users:autocomplete': Budget(3, 50, params=lambda f: {'q': 'Анна'}),
+    'users:create_user': Budget(0, 50, anonymous=True),
+    'users:login': Budget(0, 50, anonymous=True),
+    'users:logout': Budget(4, 50),
+    'users:edit_user': Budget(2, 50, kwargs=lambda f: {'pk': f.user.pk}),
+    'users:delete_user': Budget(2, 50, kwargs=lambda f: {'pk': f.user.pk}),
+    'api:tasks': Budget(4, 150),
+    'api:task': Budget(4, 50, kwargs=lambda f: {'pk': f.task.pk}),
+    'api:statuses': Budget(3, 50),
+    'api:labels': Budget(3, 50),
+    'api:users': Budget(3, 50),
+}
+
+
+class Fixture:
+    # The rows the routes are pointed at: a task with an executor and
+    # labels, logged in as its author so the ownership-checked pages render
+    # instead of redirecting.
+
+    def __init__(self):
+        self.task = (
+            Task.objects.filter(executor__isnull=False, labels__isnull=False)
+            .order_by('pk')
+            .first()
+        )
+        if self.task is None:
+            raise ValueError('Seed the database first.')
+        self.user = self.task.author
+        self.label = Label.objects.filter(tasks=self.task).order_by('pk')[0]
+
+
+def seed(seed=0):
+    call_command(
+        'generate_fake_data',
+        batch_size=100,
+        seed=seed,
+        stdout=StringIO(),
+        **DATASET,
+    )
+
+
+def url_names(patterns=None, namespace=None):
+    if patterns is None:
+        patterns = get_resolver().url_patterns
+    names = set()
+    for pattern in patterns:
+        if isinstance(pattern, URLPattern):
+            if pattern.name:
+                names.add(
+                    f'{namespace}:{pattern.name}' if namespace
+                    else pattern.name
+                )
+        elif pattern.namespace not in EXEMPT_NAMESPACES:
+            names |= url_names(pattern.url_patterns, pattern.namespace)
+    return names - set(EXEMPT)
+
+
+def measure(url_name, budget, fixture, repeat=3):
+    # Every run starts from cold caches and is rolled back, so the
+    # routes that write leave the data as they found it. The query count
+    # comes from the first run, the time is the best of all of them.
+    client = Client()
+    if not budget.anonymous:
+        client.force_login(fixture.user)
+    url = budget.url(url_name, fixture)
+    queries, timings = None, []
+    for _ in range(repeat):
+        cache.clear()
+        choices.clear()
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = budget.request(client, url, fixture)
+                if response.streaming:
+                    b''.join(response.streaming_content)
+                timings.append((time.perf_counter() - started) * 1000)
+            transaction.set_rollback(True)
+        if response.status_code >= 400:
+            raise RuntimeError(f'{url_name}: HTTP {response.status_code}')
+        if queries is None:
+            queries = [query['sql'] for query in captured.captured_queries]
+    return queries, min(timings)
+
+
+def check(url_name, budget, fixture):
+    # Returns a description of what went over budget, or None.
+    queries, ms = measure(url_name, budget, fixture)
+    ms_budget = budget.ms * settings.QUERY_BUDGET_TIME_SCALE
+    problems = []
+    if len(queries) > budget.queries:
+        problems.append(f'{len(queries)} queries, budget {budget.queries}')
+    if ms > ms_budget:
+        problems.append(f'{ms:.1f} ms, budget {ms_budget:.0f} ms')
+    if not problems:
+        return None
+    sql = '\n'.join(
+        f'{number}. {query}' for number, query in enumerate(queries, 1)
+    )
+    return f'{url_name}: {"; ".join(problems)}\n{sql}'
@@ -0,0 +1,35 @@
+from django.core.cache import cache
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+
+from task_manager.versions import get_versions
+
+
+def versioned_key(name, versions, *parts):
+    # Table versions are part of the key, so a write to any of the tables
+    # makes old entries unreachable instead of having to find and delete
+    # them. The bump time is included too: a rolled back bump hands out
+    # the same number again. CACHES['default']['VERSION'] covers
+    # whole-release invalidation.
+    tables = '.'.join(
+        f'{table}{version}@{updated_at.timestamp():.6f}'
+        for table, (version, updated_at) in sorted(versions.items())
+    )
+    return ':'.join([name, tables, *(str(part) for part in parts)])
+
+
+def get_or_build(key, build, timeout=DEFAULT_TIMEOUT):
+    value = cache.get(key)
+    if value is None:
+        value = build()
+        cache.set(key, value, timeout)
+    return value
+
+
+def versioned_get_or_build(name, tables, build, *parts, versions=None,
+                           timeout=DEFAULT_TIMEOUT):
+    if versions is None or set(tables) - set(versions):
+        versions = get_versions(*tables)
+    else:
+        versions = {table: versions[table] for table in tables}
+    key = versioned_key(name, versions, *parts)
+    return get_or_build(key, build, timeout)
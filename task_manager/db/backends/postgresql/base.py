@@ -0,0 +1,50 @@
+from functools import partial
+
+from django.db.backends.postgresql import base
+
+from task_manager.db import pool
+
+# Values of connection.info.transaction_status (psycopg2 and psycopg 3).
+TRANSACTION_IDLE = 0
+TRANSACTION_IN_TRANSACTION = 2
+TRANSACTION_IN_ERROR = 3
+
+
+def ping_connection(connection):
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+    return True
+
+
+def reset_connection(connection):
+    if connection.closed:
+        return False
+    status = connection.info.transaction_status
+    if status in (TRANSACTION_IN_TRANSACTION, TRANSACTION_IN_ERROR):
+        connection.rollback()
+        return True
+    return status == TRANSACTION_IDLE
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    # PostgreSQL backend that borrows connections from a per-process pool
+    # (settings_dict['POOL']) instead of opening one per request. Django
+    # still "closes" the connection at the end of every request, which
+    # hands it back to the pool.
+
+    def get_new_connection(self, conn_params):
+        options = {
+            'ping': ping_connection,
+            'reset': reset_connection,
+            **(self.settings_dict.get('POOL') or {}),
+        }
+        connect = partial(super().get_new_connection, conn_params)
+        return pool.get_pool(self.alias, connect, options).acquire()
+
+    def _close(self):
+        connection_pool = pool.get_pool(self.alias)
+        if self.connection is None or connection_pool is None:
+            return super()._close()
+        with self.wrap_database_errors:
+            connection_pool.release(self.connection)
+        pool.maybe_snapshot()
@@ -0,0 +1,194 @@
+import os
+import time
+from collections import deque
+from threading import Condition, Lock
+
+from django.conf import settings
+
+from task_manager import snapshots
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    # A bounded pool of DB-API connections. ``connect`` opens a new one,
+    # ``ping`` checks an idle one before reuse (pre-ping), ``reset`` gets a
+    # returned one ready for the next borrower and says whether to keep it.
+
+    def __init__(self, connect, size=10, timeout=30.0, max_lifetime=1800.0,
+                 pre_ping=True, ping=None, reset=None, close=None,
+                 clock=time.monotonic):
+        self.connect = connect
+        self.size = size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.pre_ping = pre_ping
+        self.ping = ping or (lambda connection: True)
+        self.reset = reset or (lambda connection: True)
+        self.close_connection = close or (lambda conn: conn.close())
+        self.clock = clock
+        self._idle = deque()
+        self._born = {}
+        self._busy = 0
+        self._condition = Condition(Lock())
+        self.counters = dict.fromkeys((
+            'connects', 'reuses', 'waits', 'timeouts', 'expired',
+            'failed_pings', 'discarded',
+        ), 0)
+
+    def _expired(self, connection):
+        born = self._born.get(id(connection))
+        return (
+            self.max_lifetime is not None
+            and born is not None
+            and self.clock() - born >= self.max_lifetime
+        )
+
+    def _discard(self, connection):
+        self._born.pop(id(connection), None)
+        try:
+            self.close_connection(connection)
+        except Exception:
+            pass
+
+    def _checkout(self, deadline):
+        # Returns an idle connection, or None once a slot for a new one has
+        # been reserved. Either way the slot is counted in ``_busy``.
+        with self._condition:
+            while True:
+                while self._idle:
+                    connection = self._idle.pop()
+                    if self._expired(connection):
+                        self.counters['expired'] += 1
+                        self._discard(connection)
+                        continue
+                    self._busy += 1
+                    return connection
+                if self._busy < self.size:
+                    self._busy += 1
+                    return None
+                remaining = deadline - self.clock()
+                if remaining <= 0:
+                    self.counters['timeouts'] += 1
+                    raise PoolTimeout(
+                        f'No database connection available after '
+                        f'{self.timeout}s (pool size {self.size})'
+                    )
+                self.counters['waits'] += 1
+                self._condition.wait(remaining)
+
+    def _give_back_slot(self):
+        with self._condition:
+            self._busy -= 1
+            self._condition.notify()
+
+    def acquire(self):
+        deadline = self.clock() + self.timeout
+        while True:
+            connection = self._checkout(deadline)
+            if connection is None:
+                break
+            if not self.pre_ping or self._ping(connection):
+                with self._condition:
+                    self.counters['reuses'] += 1
+                return connection
+            with self._condition:
+                self.counters['failed_pings'] += 1
+                self._discard(connection)
+            self._give_back_slot()
+
+        try:
+            connection = self.connect()
+        except Exception:
+            self._give_back_slot()
+            raise
+        with self._condition:
+            self._born[id(connection)] = self.clock()
+            self.counters['connects'] += 1
+        return connection
+
+    def _ping(self, connection):
+        try:
+            return bool(self.ping(connection))
+        except Exception:
+            return False
+
+    def release(self, connection, discard=False):
+        if id(connection) not in self._born:
+            # Not ours, e.g. inherited from the parent across a fork.
+            self._discard(connection)
+            return
+        try:
+            keep = not discard and self.reset(connection)
+        except Exception:
+            keep = False
+        with self._condition:
+            self._busy -= 1
+            if keep and not self._expired(connection):
+                self._idle.append(connection)
+            else:
+                self.counters['expired' if keep else 'discarded'] += 1
+                self._discard(connection)
+            self._condition.notify()
+
+    def close_idle(self):
+        with self._condition:
+            while self._idle:
+                self._discard(self._idle.pop())
+
+    def stats(self):
+        with self._condition:
+            return {
+                'size': self.size,
+                'idle': len(self._idle),
+                'in_use': self._busy,
+                **self.counters,
+            }
+
+
+# One pool per database alias and process: connections must never be
+# shared across a fork.
+_pools = {}
+_pools_lock = Lock()
+_last_snapshot = 0.0
+
+
+def get_pool(alias, connect=None, options=None):
+    key = (alias, os.getpid())
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None and connect is not None:
+            pool = _pools[key] = ConnectionPool(connect, **(options or {}))
+        return pool
+
+
+def get_stats():
+    pid = os.getpid()
+    with _pools_lock:
+        pools = [
+            (alias, pool) for (alias, owner), pool in _pools.items()
+            if owner == pid
+        ]
+    return {alias: pool.stats() for alias, pool in pools}
+
+
+def close_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close_idle()
+
+
+def maybe_snapshot():
+    global _last_snapshot
+    now = time.monotonic()
+    if now - _last_snapshot < settings.DB_POOL_STATS_INTERVAL:
+        return
+    _last_snapshot = now
+    try:
+        snapshots.write_snapshot(settings.DB_POOL_STATS_DIR, get_stats())
+    except OSError:
+        pass
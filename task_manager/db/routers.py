@@ -0,0 +1,95 @@
+import itertools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+
+# Alias the current request reads from; None leaves reads on the default
+# database. Set by ReplicaReadMixin for the whole request, so one page is
+# never stitched together from replicas with different lag.
+_read_alias = ContextVar('read_alias', default=None)
+_turn = itertools.count()
+_down_until = {}
+_lock = Lock()
+
+
+def is_available(alias):
+    if _down_until.get(alias, 0) > time.monotonic():
+        return False
+    try:
+        connections[alias].ensure_connection()
+    except OperationalError:
+        with _lock:
+            _down_until[alias] = (
+                time.monotonic() + settings.REPLICA_RETRY_SECONDS
+            )
+        return False
+    return True
+
+
+def choose_replica():
+    # Round-robin over the replicas, skipping the ones that are down and
+    # falling back to the primary when none is left.
+    replicas = settings.DATABASE_REPLICAS
+    if not replicas:
+        return DEFAULT_DB_ALIAS
+    start = next(_turn)
+    for offset in range(len(replicas)):
+        alias = replicas[(start + offset) % len(replicas)]
+        if is_available(alias):
+            return alias
+    return DEFAULT_DB_ALIAS
+
+
+def reset():
+    with _lock:
+        _down_until.clear()
+
+
+def is_pinned(request):
+    try:
+        until = int(request.COOKIES.get(settings.REPLICA_PIN_COOKIE, 0))
+    except ValueError:
+        return False
+    return until > time.time()
+
+
+def pin(response):
+    seconds = settings.REPLICA_PIN_SECONDS
+    response.set_cookie(
+        settings.REPLICA_PIN_COOKIE,
+        str(int(time.time()) + seconds),
+        max_age=seconds,
+        httponly=True,
+        samesite='Lax',
+    )
+
+
+@contextmanager
+def read_from(alias):
+    token = _read_alias.set(alias)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
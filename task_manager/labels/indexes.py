@@ -0,0 +1,23 @@
+# Index for the case-insensitive prefix search used by the label
+# autocomplete endpoint (``istartswith``).
+INDEX_NAME = 'labels_label_name_prefix_idx'
+INDEX_EXPRESSIONS = {
+    'postgresql': '(UPPER(name::text) text_pattern_ops)',
+    'sqlite': '(name COLLATE NOCASE)',
+}
+
+
+def install_name_prefix_index(schema_editor):
+    # SQLite drops the index when a migration rebuilds labels_label, so
+    # every migration that alters the table calls this again.
+    expression = INDEX_EXPRESSIONS.get(schema_editor.connection.vendor)
+    if expression is not None:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {INDEX_NAME} '
+            f'ON labels_label {expression}'
+        )
+
+
+def drop_name_prefix_index(schema_editor):
+    if schema_editor.connection.vendor in INDEX_EXPRESSIONS:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {INDEX_NAME}')
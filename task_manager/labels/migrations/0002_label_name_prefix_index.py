@@ -0,0 +1,25 @@
+from django.db import migrations
+
+from task_manager.labels.indexes import (
+    drop_name_prefix_index,
+    install_name_prefix_index,
+)
+
+
+def create_index(apps, schema_editor):
+    install_name_prefix_index(schema_editor)
+
+
+def drop_index(apps, schema_editor):
+    drop_name_prefix_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('labels', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
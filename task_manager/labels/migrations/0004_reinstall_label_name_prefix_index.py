@@ -0,0 +1,19 @@
+from django.db import migrations
+
+from task_manager.labels.indexes import install_name_prefix_index
+
+
+def reinstall_index(apps, schema_editor):
+    # SQLite rebuilt labels_label for 0003's AddField, dropping the index.
+    install_name_prefix_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('labels', '0003_label_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(reinstall_index, migrations.RunPython.noop),
+    ]
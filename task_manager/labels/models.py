@@ -5,9 +5,14 @@ from django.db.models import ProtectedError
 class Label(models.Model):
     name = models.CharField(max_length=255)
     time_create = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def delete(self, *args, **kwargs):
-        if self.tasks.exists():
+        # DeleteLabelView annotates in_use, saving the EXISTS query.
+        in_use = getattr(self, 'in_use', None)
+        if in_use is None:
+            in_use = self.tasks.exists()
+        if in_use:
             raise ProtectedError(
                 "Нельзя удалить метку, так как она связана с задачами.",
                 self.tasks.all()
@@ -1,8 +1,12 @@
 from django.contrib.messages import get_messages
+from django.db import connection
 from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
+from task_manager.labels.indexes import INDEX_NAME
 from task_manager.labels.models import Label
+from task_manager.tasks.models import LabelTaskCount, Task
 from task_manager.users.models import CustomUser
 
 
@@ -129,3 +133,105 @@ class LabelCRUDTestWithFixtures(TestCase):
 
             response = self.client.post(url)
             self.assertRedirects(response, reverse('users:login'))
+
+
+class LabelUsageTest(TestCase):
+    fixtures = ['users.json', 'statuses.json', 'labels.json', 'tasks.json']
+
+    def setUp(self):
+        self.client.force_login(CustomUser.objects.get(username='dixon'))
+
+    def test_list_shows_task_counts(self):
+        response = self.client.get(reverse('labels:labels'))
+        for label in response.context['labels']:
+            self.assertEqual(
+                label['task_count'],
+                Label.objects.get(pk=label['id']).tasks.count(),
+            )
+
+    def test_delete_guard_does_not_load_tasks(self):
+        url = reverse('labels:delete_label', kwargs={'pk': 1})
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(url)
+        self.assertTrue(Label.objects.filter(pk=1).exists())
+        # user, then the label with its in_use flag
+        self.assertEqual(len(queries), 2)
+        self.assertIn('AS "in_use"', queries[1]['sql'])
+        self.assertIn('"tasks_labeltaskcount"', queries[1]['sql'])
+
+    def test_delete_guard_follows_the_counter_or_the_links(self):
+        used = Label.objects.create(name='Используется')
+        unused = Label.objects.create(name='Свободна')
+        Task.objects.get(pk=1).labels.add(used)
+        for deleted_counters in (False, True):
+            if deleted_counters:
+                LabelTaskCount.objects.all().delete()
+            self.client.post(
+                reverse('labels:delete_label', kwargs={'pk': used.pk})
+            )
+            self.assertTrue(Label.objects.filter(pk=used.pk).exists())
+        self.client.post(
+            reverse('labels:delete_label', kwargs={'pk': unused.pk})
+        )
+        self.assertFalse(Label.objects.filter(pk=unused.pk).exists())
+
+
+class LabelObjectQueriesTest(TestCase):
+
+    def setUp(self):
+        self.client.force_login(CustomUser.objects.create_user(username='q'))
+        self.label = Label.objects.create(name='Новая')
+        self.edit_url = reverse(
+            'labels:edit_label', kwargs={'pk': self.label.pk}
+        )
+        self.delete_url = reverse(
+            'labels:delete_label', kwargs={'pk': self.label.pk}
+        )
+
+    def test_edit(self):
+        with self.assertNumQueries(2):
+            self.client.get(self.edit_url)
+        # user, label, then the update and the table version bump
+        with self.assertNumQueries(4):
+            response = self.client.post(self.edit_url, {'name': 'Другая'})
+        self.assertRedirects(response, reverse('labels:labels'))
+
+    def test_delete_form(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(self.delete_url)
+        self.assertContains(response, self.label.name)
+
+
+class LabelAutocompleteTest(TestCase):
+    fixtures = ['users.json', 'labels.json']
+
+    def setUp(self):
+        self.client.force_login(CustomUser.objects.get(username='dixon'))
+        self.label = Label.objects.get(pk=1)
+        self.url = reverse('labels:autocomplete')
+
+    def test_prefix_search(self):
+        prefix = self.label.name[:2].lower()
+        response = self.client.get(self.url, {'q': prefix})
+        self.assertIn(
+            {'id': self.label.pk, 'text': self.label.name},
+            response.json()['results'],
+        )
+
+    def test_requires_login(self):
+        self.client.logout()
+        response = self.client.get(self.url, {'q': 'a'})
+        self.assertRedirects(response, reverse('users:login'))
+
+    def test_prefix_index_survives_table_rebuilds(self):
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(
+                cursor, Label._meta.db_table
+            )
+        self.assertIn(INDEX_NAME, constraints)
+        if connection.vendor == 'sqlite':
+            plan = Label.objects.filter(
+                name__istartswith='ме'
+            ).values_list('pk', 'name').explain()
+            self.assertIn(INDEX_NAME, plan)
+            self.assertNotIn('SCAN labels_label', plan)
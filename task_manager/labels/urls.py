@@ -1,13 +1,21 @@
 from django.urls import path
 
 from task_manager.labels import views as label_views
+from task_manager.mixins import pick_view
+
+label_list_view = pick_view(
+    label_views.LabelsView, label_views.AsyncLabelsView
+)
 
 app_name = 'labels' 
 
 urlpatterns = [
     path('',
-         label_views.LabelsView.as_view(),
+         label_list_view,
          name='labels'),
+    path('autocomplete/',
+         label_views.LabelAutocompleteView.as_view(),
+         name='autocomplete'),
     path('create/',
          label_views.CreateLabelView.as_view(),
          name='create_label'),
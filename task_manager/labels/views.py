@@ -1,28 +1,56 @@
 from django.contrib import messages
 from django.db.models import ProtectedError
+from django.db.models.functions import Coalesce
 from django.shortcuts import redirect, render
 from django.urls import reverse_lazy
 from django.views.generic import DeleteView, ListView, UpdateView, View
 
-from task_manager.mixins import LoginRequiredMixin
+from task_manager.mixins import (
+    AsyncListMixin,
+    AutocompleteMixin,
+    ConditionalGetMixin,
+    LoginRequiredMixin,
+    ObjectOnceMixin,
+    ReplicaReadMixin,
+)
+from task_manager.tasks import counters
+from task_manager.tasks.models import LabelTaskCount
+from task_manager.versions import LABELS, TASKS
 
 from .forms import LabelForm
 from .models import Label
 
 
-class LabelsView(LoginRequiredMixin, ListView):
+class LabelsView(LoginRequiredMixin, ReplicaReadMixin, ConditionalGetMixin,
+                 ListView):
     model = Label
     template_name = 'labels/index.html'
     context_object_name = 'labels'
+    version_tables = (LABELS, TASKS)
 
     def get_queryset(self):
-        return Label.objects.annotate().values(
+        return Label.objects.annotate(
+            task_count=Coalesce('task_counter__count', 0)
+        ).values(
             'id', 
             'name', 
             'time_create',
+            'task_count',
         ).order_by('time_create')
 
 
+class AsyncLabelsView(AsyncListMixin, LabelsView):
+    pass
+
+
+class LabelAutocompleteView(LoginRequiredMixin, AutocompleteMixin, View):
+    def get_results(self, query, limit):
+        labels = Label.objects.filter(
+            name__istartswith=query
+        ).order_by('name', 'pk').values_list('pk', 'name')[:limit]
+        return [{'id': pk, 'text': name} for pk, name in labels]
+
+
 class CreateLabelView(LoginRequiredMixin, View):
     def get(self, request, *args, **kwargs):
         form = LabelForm()
@@ -37,7 +65,7 @@ class CreateLabelView(LoginRequiredMixin, View):
         return render(request, 'labels/create.html', {'form': form})
     
 
-class EditLabelView(LoginRequiredMixin, UpdateView):
+class EditLabelView(LoginRequiredMixin, ObjectOnceMixin, UpdateView):
     model = Label
     form_class = LabelForm
     template_name = 'labels/edit.html'
@@ -49,11 +77,17 @@ class EditLabelView(LoginRequiredMixin, UpdateView):
         return response
     
 
-class DeleteLabelView(LoginRequiredMixin, DeleteView):
+class DeleteLabelView(LoginRequiredMixin, ObjectOnceMixin, DeleteView):
     model = Label
     template_name = 'labels/label_confirm_delete.html'
     success_url = reverse_lazy('labels:labels')
 
+    def get_queryset(self):
+        # Label.delete checks in_use instead of querying tasks itself.
+        return Label.objects.annotate(
+            in_use=counters.in_use(LabelTaskCount)
+        )
+
     def form_valid(self, form):
         try:
             response = super().form_valid(form)
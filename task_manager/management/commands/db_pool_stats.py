@@ -0,0 +1,53 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from task_manager import snapshots
+from task_manager.db import pool
+
+COLUMNS = (
+    'size', 'idle', 'in_use', 'connects', 'reuses', 'waits', 'timeouts',
+    'expired', 'failed_pings', 'discarded',
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Prints database connection pool statistics reported by every '
+        'worker process.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--json', action='store_true')
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Remove the reported statistics after printing them.',
+        )
+
+    def handle(self, *args, **options):
+        stats = snapshots.read_snapshots(settings.DB_POOL_STATS_DIR)
+        local = pool.get_stats()
+        if local:
+            stats['current'] = local
+
+        if options['json']:
+            self.stdout.write(json.dumps(stats, indent=2, sort_keys=True))
+        elif not any(stats.values()):
+            self.stdout.write('No connection pools reported.')
+        else:
+            self.stdout.write(
+                f'{"worker":<10} {"alias":<10} '
+                + ' '.join(f'{column:>12}' for column in COLUMNS)
+            )
+            for worker, pools in stats.items():
+                for alias, row in sorted(pools.items()):
+                    self.stdout.write(
+                        f'{worker:<10} {alias:<10} '
+                        + ' '.join(
+                            f'{row.get(column, 0):>12}' for column in COLUMNS
+                        )
+                    )
+        if options['reset']:
+            snapshots.remove_snapshots(settings.DB_POOL_STATS_DIR)
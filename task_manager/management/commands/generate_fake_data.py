@@ -0,0 +1,222 @@
+import itertools
+import random
+import secrets
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from task_manager import versions
+from task_manager.labels.models import Label
+from task_manager.statuses.models import Status
+from task_manager.tasks import choices, counters
+from task_manager.tasks.models import Task
+
+FIRST_NAMES = (
+    'Анна', 'Иван', 'Мария', 'Пётр', 'Ольга', 'Сергей', 'Елена', 'Дмитрий',
+    'Наталья', 'Алексей', 'Татьяна', 'Михаил', 'Ирина', 'Андрей', 'Юлия',
+)
+LAST_NAMES = (
+    'Иванов', 'Смирнов', 'Кузнецов', 'Попов', 'Васильев', 'Петров',
+    'Соколов', 'Михайлов', 'Новиков', 'Фёдоров', 'Морозов', 'Волков',
+)
+VERBS = (
+    'Исправить', 'Проверить', 'Обновить', 'Добавить', 'Удалить',
+    'Настроить', 'Описать', 'Ускорить', 'Перенести', 'Согласовать',
+)
+OBJECTS = (
+    'форму входа', 'отчёт', 'базу данных', 'страницу задач', 'импорт',
+    'экспорт', 'уведомления', 'права доступа', 'документацию', 'поиск',
+    'кеш', 'миграции', 'профиль пользователя', 'API', 'сборку',
+)
+DETAILS = (
+    'Воспроизводится только на больших данных.',
+    'Нужно согласовать с командой.',
+    'Блокирует релиз.',
+    'Подробности в переписке.',
+    'После исправления проверить на стенде.',
+    '',
+)
+MAX_LABELS_PER_TASK = 4
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+def zipf_weights(count, exponent):
+    # A handful of labels end up on most tasks and the long tail is rare,
+    # which is what makes label filters and label counts interesting.
+    return list(itertools.accumulate(
+        1 / (rank ** exponent) for rank in range(1, count + 1)
+    ))
+
+
+class Command(BaseCommand):
+    help = (
+        'Bulk-generates a synthetic dataset (users, statuses, labels and '
+        'tasks with a skewed label distribution) for load testing.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50_000)
+        parser.add_argument('--statuses', type=int, default=200)
+        parser.add_argument('--labels', type=int, default=5_000)
+        parser.add_argument('--tasks', type=int, default=5_000_000)
+        parser.add_argument('--batch-size', type=int, default=5_000)
+        parser.add_argument(
+            '--label-skew',
+            type=float,
+            default=1.1,
+            help='Zipf exponent of the label distribution.',
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=730,
+            help='Spread task creation times over this many days.',
+        )
+        parser.add_argument('--seed', type=int, default=None)
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+        self.random = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        # Keeps names unique across repeated runs.
+        self.tag = secrets.token_hex(3)
+        started = time.monotonic()
+
+        user_ids = self.create_users(options['users'])
+        status_ids = self.create_named(
+            Status, options['statuses'], 'Статус'
+        )
+        label_ids = self.create_named(Label, options['labels'], 'Метка')
+        if options['tasks'] and not (user_ids and status_ids):
+            raise CommandError('Tasks need at least one user and status')
+        self.create_tasks(
+            options['tasks'], user_ids, status_ids, label_ids,
+            options['label_skew'], options['days'],
+        )
+
+        # bulk_create bypasses the model signals.
+        for model in counters.SOURCES:
+            counters.reconcile(model, self.batch_size)
+        versions.bump_versions(*versions.TABLES)
+        choices.invalidate()
+        self.stdout.write(self.style.SUCCESS(
+            f'Done in {time.monotonic() - started:.1f}s'
+        ))
+
+    def report(self, model, done, total):
+        self.stdout.write(f'{model.__name__}: {done}/{total}', ending='\r')
+        self.stdout.flush()
+
+    def finish(self, model, ids):
+        self.stdout.write(f'{model.__name__}: {len(ids)} created')
+        # With a zero count, tasks are spread over the existing rows.
+        return ids or list(model.objects.values_list('pk', flat=True))
+
+    def create_users(self, count):
+        model = get_user_model()
+        # Hashing is deliberately slow; every generated user shares one.
+        password = make_password('password')
+        ids = []
+        for batch in batched(range(count), self.batch_size):
+            users = model.objects.bulk_create([
+                model(
+                    username=f'user_{self.tag}_{number}',
+                    first_name=self.random.choice(FIRST_NAMES),
+                    last_name=self.random.choice(LAST_NAMES),
+                    password=password,
+                )
+                for number in batch
+            ])
+            ids.extend(user.pk for user in users)
+            self.report(model, len(ids), count)
+        return self.finish(model, ids)
+
+    def create_named(self, model, count, prefix):
+        ids = []
+        for batch in batched(range(count), self.batch_size):
+            objects = model.objects.bulk_create([
+                model(name=f'{prefix} {self.tag}-{number}')
+                for number in batch
+            ])
+            ids.extend(obj.pk for obj in objects)
+            self.report(model, len(ids), count)
+        return self.finish(model, ids)
+
+    def make_task(self, user_ids, status_ids, now, days):
+        sentences = self.random.randint(0, 3)
+        description = ' '.join(
+            self.random.choice(DETAILS) for _ in range(sentences)
+        )
+        created = now - timedelta(seconds=self.random.randint(0, days * 86400))
+        return Task(
+            name=f'{self.random.choice(VERBS)} {self.random.choice(OBJECTS)}',
+            description=description.strip(),
+            author_id=self.random.choice(user_ids),
+            executor_id=(
+                self.random.choice(user_ids)
+                if self.random.random() < 0.8 else None
+            ),
+            status_id=self.random.choice(status_ids),
+            time_create=created,
+            updated_at=created,
+        )
+
+    def pick_labels(self, label_ids, weights):
+        count = self.random.randint(0, MAX_LABELS_PER_TASK)
+        if not count or not label_ids:
+            return set()
+        return set(self.random.choices(
+            label_ids, cum_weights=weights, k=count
+        ))
+
+    def create_tasks(self, count, user_ids, status_ids, label_ids, skew,
+                     days):
+        through = Task.labels.through
+        weights = zipf_weights(len(label_ids), skew)
+        now = timezone.now()
+        created = 0
+        for batch in batched(range(count), self.batch_size):
+            with transaction.atomic():
+                tasks = [
+                    self.make_task(user_ids, status_ids, now, days)
+                    for _ in batch
+                ]
+                # auto_now/auto_now_add would overwrite the spread-out
+                # timestamps, so they are switched off for the insert.
+                with raw_timestamps(
+                    Task._meta.get_field('time_create'),
+                    Task._meta.get_field('updated_at'),
+                ):
+                    Task.objects.bulk_create(tasks)
+                through.objects.bulk_create([
+                    through(task_id=task.pk, label_id=label_id)
+                    for task in tasks
+                    for label_id in self.pick_labels(label_ids, weights)
+                ])
+            created += len(tasks)
+            self.report(Task, created, count)
+        self.stdout.write(f'Task: {created} created')
+
+
+@contextmanager
+def raw_timestamps(*fields):
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
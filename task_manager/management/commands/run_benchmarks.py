@@ -0,0 +1,219 @@
+import json
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from task_manager import benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        'Drives the task, status, label and user pages through the '
+        'middleware stack and reports latency percentiles, queries per '
+        'request and peak memory, diffed against a stored baseline.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'scenarios',
+            nargs='*',
+            help='Scenarios to run (default: all).',
+        )
+        parser.add_argument('--requests', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument('--host', default='localhost')
+        parser.add_argument('--seed', type=int, default=None)
+        parser.add_argument(
+            '--baseline',
+            default=os.path.join(settings.BASE_DIR, 'benchmarks',
+                                 'baseline.json'),
+        )
+        parser.add_argument(
+            '--save-baseline',
+            action='store_true',
+            help='Overwrite the baseline with this run.',
+        )
+        parser.add_argument(
+            '--max-regression',
+            type=float,
+            default=None,
+            help='Fail if any p95 grows by more than this many percent '
+                 'or any scenario issues more queries than the baseline.',
+        )
+        parser.add_argument(
+            '--compare-sessions',
+            action='store_true',
+            help='Compare queries per request across session and flash '
+                 'message storage setups instead of diffing a baseline.',
+        )
+        parser.add_argument(
+            '--throughput',
+            choices=sorted(benchmarks.ENTRY_POINTS),
+            help='Measure requests per second of the read-only scenarios '
+                 'through this entry point instead of diffing a baseline.',
+        )
+        parser.add_argument(
+            '--compare-entry-points',
+            action='store_true',
+            help='Compare throughput under WSGI and ASGI, with sync and '
+                 'async views, each in its own process.',
+        )
+        parser.add_argument('--concurrency', type=int, default=10)
+        parser.add_argument('--json', action='store_true')
+
+    def validate(self, options):
+        known = {scenario.name for scenario in benchmarks.SCENARIOS}
+        unknown = set(options['scenarios']) - known
+        if unknown:
+            raise CommandError(
+                f'Unknown scenarios: {", ".join(sorted(unknown))}'
+            )
+        if options['requests'] < 1:
+            raise CommandError('--requests must be positive')
+        if options['concurrency'] < 1:
+            raise CommandError('--concurrency must be positive')
+
+    def handle(self, *args, **options):
+        self.validate(options)
+        if options['throughput'] or options['compare_entry_points']:
+            self.handle_throughput(options)
+            return
+
+        runner = (
+            benchmarks.compare_sessions
+            if options['compare_sessions']
+            else benchmarks.run
+        )
+        # Writes made by the create/edit scenarios are rolled back.
+        with transaction.atomic():
+            try:
+                results = runner(
+                    options['scenarios'],
+                    options['requests'],
+                    options['warmup'],
+                    options['host'],
+                    options['seed'],
+                )
+            except (ValueError, RuntimeError) as error:
+                raise CommandError(error)
+            transaction.set_rollback(True)
+
+        if options['compare_sessions']:
+            if options['json']:
+                self.stdout.write(
+                    json.dumps(results, indent=2, sort_keys=True)
+                )
+            else:
+                self.write_session_table(results)
+            return
+
+        baseline = benchmarks.load_baseline(options['baseline'])
+        rows = benchmarks.compare(results, baseline)
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2, sort_keys=True))
+        else:
+            self.write_table(rows)
+
+        if options['save_baseline']:
+            os.makedirs(os.path.dirname(options['baseline']), exist_ok=True)
+            benchmarks.save_baseline(options['baseline'], results)
+            self.stdout.write(f'Baseline saved to {options["baseline"]}')
+        elif options['max_regression'] is not None:
+            self.check_regressions(rows, options['max_regression'])
+
+    def handle_throughput(self, options):
+        arguments = (
+            options['scenarios'],
+            options['requests'],
+            options['concurrency'],
+            options['warmup'],
+            options['host'],
+            options['seed'],
+        )
+        try:
+            if options['compare_entry_points']:
+                results = benchmarks.compare_entry_points(*arguments)
+            else:
+                results = {
+                    options['throughput']: benchmarks.throughput(
+                        options['throughput'], *arguments
+                    )
+                }
+        except (ValueError, RuntimeError) as error:
+            raise CommandError(error)
+
+        if options['json']:
+            if not options['compare_entry_points']:
+                results = results[options['throughput']]
+            self.stdout.write(json.dumps(results, indent=2, sort_keys=True))
+        else:
+            self.write_throughput_table(results)
+
+    def write_table(self, rows):
+        self.stdout.write(
+            f'{"scenario":<20} {"metric":<9} {"baseline":>10} '
+            f'{"current":>10} {"change":>8}'
+        )
+        for name, metric, old, new, change in rows:
+            old_text = '-' if old is None else f'{old:.1f}'
+            change_text = '-' if change is None else f'{change:+.0f}%'
+            line = (
+                f'{name:<20} {metric:<9} {old_text:>10} '
+                f'{new:>10.1f} {change_text:>8}'
+            )
+            if change is not None and change > 0 and metric == 'queries':
+                line = self.style.ERROR(line)
+            self.stdout.write(line)
+
+    def write_session_table(self, results):
+        setups = list(results)
+        width = max(len(setup) for setup in setups)
+        self.stdout.write('Queries per request:')
+        self.stdout.write(
+            f'{"scenario":<20} '
+            + ' '.join(f'{setup:>{width}}' for setup in setups)
+        )
+        for name in results[setups[0]]:
+            self.stdout.write(
+                f'{name:<20} '
+                + ' '.join(
+                    f'{results[setup][name]["queries"]:>{width}}'
+                    for setup in setups
+                )
+            )
+
+    def write_throughput_table(self, results):
+        setups = list(results)
+        width = max(len(setup) for setup in setups)
+        self.stdout.write('Requests per second (p95 ms):')
+        self.stdout.write(
+            f'{"scenario":<20} '
+            + ' '.join(f'{setup:>{width}}' for setup in setups)
+        )
+        for name in results[setups[0]]:
+            self.stdout.write(
+                f'{name:<20} '
+                + ' '.join(
+                    f'{self.format_throughput(results[setup][name]):>{width}}'
+                    for setup in setups
+                )
+            )
+
+    def format_throughput(self, result):
+        return f'{result["rps"]:.0f} ({result["p95_ms"]:.0f})'
+
+    def check_regressions(self, rows, threshold):
+        failures = [
+            f'{name} {metric}: {old} -> {new}'
+            for name, metric, old, new, change in rows
+            if change is not None and (
+                (metric == 'p95_ms' and change > threshold)
+                or (metric == 'queries' and new > old)
+            )
+        ]
+        if failures:
+            raise CommandError(
+                'Regressions against the baseline:\n' + '\n'.join(failures)
+            )
@@ -0,0 +1,53 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from task_manager import timing
+
+
+class Command(BaseCommand):
+    help = (
+        'Prints p50/p95/p99 request timings per URL name, merged from the '
+        'snapshots written by ServerTimingMiddleware in every worker.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='Print the report as JSON.',
+        )
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Remove the snapshots after printing them.',
+        )
+
+    def handle(self, *args, **options):
+        report = timing.summarize(timing.read_snapshots())
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2, sort_keys=True))
+        elif not report:
+            self.stdout.write('No samples recorded.')
+        else:
+            self.write_table(report)
+        if options['reset']:
+            timing.remove_snapshots()
+
+    def write_table(self, report):
+        columns = [
+            f'{metric}_p{rank}'
+            for metric in timing.METRICS
+            for rank in timing.PERCENTILES
+        ]
+        width = max(len(name) for name in report)
+        self.stdout.write(
+            f'{"view":<{width}} {"count":>6} '
+            + ' '.join(f'{column:>12}' for column in columns)
+        )
+        for name in sorted(report):
+            row = report[name]
+            self.stdout.write(
+                f'{name:<{width}} {row["count"]:>6} '
+                + ' '.join(f'{row[column]:>12.2f}' for column in columns)
+            )
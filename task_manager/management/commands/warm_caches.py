@@ -0,0 +1,54 @@
+import time
+
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand, CommandError
+
+from task_manager.tasks import choices
+from task_manager.tasks.filters import first_task_page
+from task_manager.tasks.pagination import DEFAULT_PAGE_SIZE
+
+
+class Command(BaseCommand):
+    help = (
+        'Fills the shared cache with the status, label and user choice '
+        'lists and the first page of the task list, so the first requests '
+        'after a deploy or restart are not cold. Needs a shared '
+        'CACHE_BACKEND (file or redis).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--page-size',
+            type=int,
+            action='append',
+            dest='page_sizes',
+            help=f'Task list page sizes to warm (default '
+                 f'{DEFAULT_PAGE_SIZE}); can be repeated.',
+        )
+
+    def warm(self, name, build):
+        started = time.monotonic()
+        size = len(build())
+        elapsed = (time.monotonic() - started) * 1000
+        self.stdout.write(f'{name}: {size} entries in {elapsed:.0f} ms')
+
+    def handle(self, *args, **options):
+        # A per-process cache would be filled for this command only and
+        # thrown away when it exits.
+        if isinstance(caches['default'], (LocMemCache, DummyCache)):
+            raise CommandError(
+                'The default cache is not shared between processes; set '
+                'CACHE_BACKEND to file or redis.'
+            )
+        # Rebuild rather than trust whatever an older process left behind.
+        choices.clear()
+        for name in choices.LOADERS:
+            self.warm(f'choices:{name}', lambda: choices.get_choices(name))
+        for page_size in options['page_sizes'] or [DEFAULT_PAGE_SIZE]:
+            self.warm(
+                f'tasks:first_page:{page_size}',
+                lambda: first_task_page(page_size).object_list,
+            )
+        self.stdout.write(self.style.SUCCESS('Caches warmed'))
@@ -0,0 +1,94 @@
+import time
+
+from asgiref.sync import (
+    iscoroutinefunction,
+    markcoroutinefunction,
+    sync_to_async,
+)
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from task_manager import timing
+from task_manager.db import routers
+
+
+class ServerTimingMiddleware:
+    # Removed from the chain at startup unless SERVER_TIMING is on, so a
+    # disabled instance costs nothing per request.
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.SERVER_TIMING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        timing.instrument_templates()
+        timing.instrument_caches()
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        metrics, token = timing.start()
+        try:
+            timing.instrument_connections()
+            response = self.get_response(request)
+        finally:
+            timing.finish(token)
+        return self.finish(request, metrics, response)
+
+    async def __acall__(self, request):
+        metrics, token = timing.start()
+        try:
+            await sync_to_async(timing.instrument_connections)()
+            response = await self.get_response(request)
+        finally:
+            timing.finish(token)
+        return self.finish(request, metrics, response)
+
+    def finish(self, request, metrics, response):
+        if metrics.view_started is not None:
+            metrics.view_ms = (
+                time.perf_counter() - metrics.view_started
+            ) * 1000
+        total_ms = metrics.total_ms()
+        response['Server-Timing'] = metrics.server_timing(total_ms)
+        match = getattr(request, 'resolver_match', None)
+        if match is not None and match.view_name:
+            timing.record(match.view_name, metrics, total_ms)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics = timing.current()
+        if metrics is not None:
+            metrics.view_started = time.perf_counter()
+
+
+class ReplicaPinMiddleware:
+    # After any write the browser gets a short-lived cookie that keeps its
+    # reads on the primary (see ReplicaReadMixin).
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return self.pin(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.pin(request, await self.get_response(request))
+
+    def pin(self, request, response):
+        if request.method not in ('GET', 'HEAD', 'OPTIONS', 'TRACE'):
+            routers.pin(response)
+        return response
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:05
+
+from django.db import migrations, models
+from django.utils import timezone
+
+TABLES = ('tasks', 'statuses', 'labels', 'users')
+
+
+def seed_versions(apps, schema_editor):
+    TableVersion = apps.get_model('task_manager', 'TableVersion')
+    now = timezone.now()
+    TableVersion.objects.bulk_create(
+        TableVersion(name=name, version=1, updated_at=now) for name in TABLES
+    )
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TableVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=64, unique=True)),
+                ('version', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.RunPython(seed_versions, migrations.RunPython.noop),
+    ]
@@ -1,13 +1,221 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib import messages
+from django.http import JsonResponse
+from django.middleware.csrf import get_token
 from django.shortcuts import redirect
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
 
+from task_manager.db import routers
+from task_manager.versions import (
+    aget_versions,
+    get_versions,
+    last_modified,
+    make_etag,
+)
 
-class LoginRequiredMixin:  
+# The dispatch mixins below work for sync and async views alike: for an
+# async view (every handler a coroutine) dispatch returns a coroutine and
+# the next dispatch in the chain is awaited.
+
+
+class LoginRequiredMixin:
     def dispatch(self, request, *args, **kwargs):
+        if self.view_is_async:
+            return self.login_required_adispatch(request, *args, **kwargs)
+        if not request.user.is_authenticated:
+            return self.handle_not_authenticated(request)
+        return super().dispatch(request, *args, **kwargs)
+
+    async def login_required_adispatch(self, request, *args, **kwargs):
+        # The lazy request.user would hit the database from the event loop.
+        request.user = await request.auser()
         if not request.user.is_authenticated:
-            messages.error(
-                request,
-                'Вы не авторизованы! Пожалуйста, войдите в систему.'
-            )
-            return redirect('users:login')
-        return super().dispatch(request, *args, **kwargs)
\ No newline at end of file
+            return self.handle_not_authenticated(request)
+        return await super().dispatch(request, *args, **kwargs)
+
+    def handle_not_authenticated(self, request):
+        messages.error(
+            request,
+            'Вы не авторизованы! Пожалуйста, войдите в систему.'
+        )
+        return redirect('users:login')
+
+
+class ObjectOnceMixin:
+    # Generic views call get_object() in get() and post(), and permission
+    # checks call it in dispatch. It is loaded once per request, with what
+    # get_queryset selects for the check and the template.
+    resolved_object = None
+
+    def load_object(self):
+        return super().get_object()
+
+    def get_object(self, queryset=None):
+        if queryset is not None:
+            return super().get_object(queryset)
+        if self.resolved_object is None:
+            self.resolved_object = self.load_object()
+        return self.resolved_object
+
+
+class ObjectPermissionMixin(ObjectOnceMixin):
+    permission_denied_message = 'У вас нет прав для этого действия'
+
+    def has_object_permission(self, obj):
+        return True
+
+    def dispatch(self, request, *args, **kwargs):
+        if not self.has_object_permission(self.get_object()):
+            messages.error(request, self.permission_denied_message)
+            return redirect(self.success_url)
+        return super().dispatch(request, *args, **kwargs)
+
+
+class AsyncListMixin:
+    # For ListView subclasses: the queryset is read with the async ORM, the
+    # template response is rendered afterwards by the handler.
+
+    async def get(self, request, *args, **kwargs):
+        self.object_list = [row async for row in self.get_queryset()]
+        return self.render_to_response(self.get_context_data())
+
+
+def pick_view(view_class, async_view_class):
+    # The read-only pages have async variants for ASGI deploys; the URLconfs
+    # pick one when imported, so ASYNC_VIEWS is read once per process.
+    if settings.ASYNC_VIEWS:
+        return async_view_class.as_view()
+    return view_class.as_view()
+
+
+class AutocompleteMixin:
+    # Views define get_results(query, limit), returning a list of
+    # {'id': ..., 'text': ...} dicts.
+    default_limit = 20
+    max_limit = 50
+
+    def get_limit(self):
+        try:
+            limit = int(self.request.GET.get('limit', self.default_limit))
+        except ValueError:
+            limit = self.default_limit
+        return max(1, min(limit, self.max_limit))
+
+    def get(self, request, *args, **kwargs):
+        query = request.GET.get('q', '').strip()
+        results = self.get_results(query, self.get_limit()) if query else []
+        return JsonResponse({'results': results})
+
+
+class ConditionalGetMixin:
+    # Answers If-None-Match / If-Modified-Since from the per-table version
+    # counters with a single query, before the view touches anything else.
+    version_tables = ()
+    # Kept for the view, so it can key caches without another query.
+    table_versions = None
+
+    def get_version_tables(self):
+        return self.version_tables
+
+    # Pages rendering a form carry a CSRF token derived from the browser's
+    # CSRF secret, which login rotates; a 304 would keep the stale token.
+    etag_csrf = False
+
+    def get_etag_parts(self):
+        parts = (self.request.get_full_path(), self.request.user.pk)
+        if self.etag_csrf:
+            # Creates the secret if the browser has none yet, so the ETag
+            # matches the cookie set on this response.
+            get_token(self.request)
+            parts += (self.request.META['CSRF_COOKIE'],)
+        return parts
+
+    def is_conditional(self, request):
+        # Pending flash messages must be rendered, so never answer 304.
+        return request.method in ('GET', 'HEAD') and not len(
+            messages.get_messages(request)
+        )
+
+    def conditional_response(self, request, versions):
+        self.table_versions = versions
+        self.etag = f'"{make_etag(versions, *self.get_etag_parts())}"'
+        modified = last_modified(versions)
+        # HTTP dates have second precision.
+        self.timestamp = int(modified.timestamp()) if modified else None
+        return get_conditional_response(
+            request, etag=self.etag, last_modified=self.timestamp
+        )
+
+    def patch_conditional(self, response):
+        if response.status_code in (200, 304):
+            response.headers.setdefault('ETag', self.etag)
+            if self.timestamp is not None:
+                response.headers.setdefault(
+                    'Last-Modified', http_date(self.timestamp)
+                )
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def dispatch(self, request, *args, **kwargs):
+        if self.view_is_async:
+            return self.conditional_adispatch(request, *args, **kwargs)
+        if not self.is_conditional(request):
+            return super().dispatch(request, *args, **kwargs)
+
+        versions = get_versions(*self.get_version_tables())
+        response = self.conditional_response(request, versions)
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+        return self.patch_conditional(response)
+
+    async def conditional_adispatch(self, request, *args, **kwargs):
+        if not self.is_conditional(request):
+            return await super().dispatch(request, *args, **kwargs)
+
+        versions = await aget_versions(*self.get_version_tables())
+        response = self.conditional_response(request, versions)
+        if response is None:
+            response = await super().dispatch(request, *args, **kwargs)
+        return self.patch_conditional(response)
+
+
+class ReplicaReadMixin:
+    # Serves GET/HEAD from a read replica unless the browser wrote
+    # something within the last REPLICA_PIN_SECONDS.
+
+    def dispatch(self, request, *args, **kwargs):
+        if self.view_is_async:
+            return self.replica_read_adispatch(request, *args, **kwargs)
+        if request.method not in ('GET', 'HEAD') or routers.is_pinned(
+            request
+        ):
+            return super().dispatch(request, *args, **kwargs)
+
+        # Session and user come from the primary, a lagging replica must
+        # not log anyone out.
+        request.user.is_authenticated
+        with routers.read_from(routers.choose_replica()):
+            response = super().dispatch(request, *args, **kwargs)
+            # Template responses evaluate their querysets while rendering,
+            # which has to happen while reads still go to the replica.
+            if hasattr(response, 'render') and not response.is_rendered:
+                response.render()
+        return response
+
+    async def replica_read_adispatch(self, request, *args, **kwargs):
+        request.user = await request.auser()
+        if request.method not in ('GET', 'HEAD') or routers.is_pinned(
+            request
+        ):
+            return await super().dispatch(request, *args, **kwargs)
+
+        alias = await sync_to_async(routers.choose_replica)()
+        # The alias is a ContextVar, so it follows the queries and the
+        # render into the threads sync_to_async runs them in.
+        with routers.read_from(alias):
+            response = await super().dispatch(request, *args, **kwargs)
+            if hasattr(response, 'render') and not response.is_rendered:
+                await sync_to_async(response.render)()
+        return response
@@ -0,0 +1,10 @@
+from django.db import models
+
+
+class TableVersion(models.Model):
+    name = models.CharField(max_length=64, unique=True)
+    version = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField()
+
+    def __str__(self):
+        return f'{self.name}@{self.version}'
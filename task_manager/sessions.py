@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.contrib.sessions.backends import cached_db
+
+
+class CappedCache:
+    # Passes everything through to the cache but never stores an entry for
+    # longer than ``max_age`` seconds.
+
+    def __init__(self, cache, max_age):
+        self.cache = cache
+        self.max_age = max_age
+
+    def __getattr__(self, name):
+        return getattr(self.cache, name)
+
+    def __contains__(self, key):
+        return key in self.cache
+
+    def cap(self, timeout):
+        return self.max_age if timeout is None else min(timeout, self.max_age)
+
+    def set(self, key, value, timeout=None, version=None):
+        return self.cache.set(key, value, self.cap(timeout), version)
+
+    async def aset(self, key, value, timeout=None, version=None):
+        return await self.cache.aset(key, value, self.cap(timeout), version)
+
+
+class SessionStore(cached_db.SessionStore):
+    # cached_db keeps a session in the cache for its whole expiry age;
+    # SESSION_CACHE_MAX_AGE shortens that when the cache isn't shared.
+
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        if settings.SESSION_CACHE_MAX_AGE is not None:
+            self._cache = CappedCache(
+                self._cache, settings.SESSION_CACHE_MAX_AGE
+            )
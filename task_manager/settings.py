@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 
 from pathlib import Path
 import os
+import tempfile
 from dotenv import load_dotenv
 from django.contrib.messages import constants as messages
 import urllib.parse
@@ -59,12 +60,14 @@ INSTALLED_APPS = [
     'task_manager.users.apps.UsersConfig',
     'task_manager.statuses.apps.StatusesConfig',
     'task_manager.tasks.apps.TasksConfig',
-    'task_manager.labels.apps.LabelsConfig'
+    'task_manager.labels.apps.LabelsConfig',
+    'task_manager.api.apps.ApiConfig',
 ]
 
 AUTH_USER_MODEL = 'users.CustomUser'
 
 MIDDLEWARE = [
+    'task_manager.middleware.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -72,6 +75,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'task_manager.middleware.ReplicaPinMiddleware',
     'rollbar.contrib.django.middleware.RollbarNotifierMiddleware',
 
 ]
@@ -107,6 +111,48 @@ WSGI_APPLICATION = 'task_manager.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
+# DB_POOL_SIZE > 0 switches to the pooled backend; Django then "closes"
+# every connection after the request, which returns it to the pool, so
+# CONN_MAX_AGE must stay 0.
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 0))
+
+
+def database_from_url(url):
+    parsed = urllib.parse.urlparse(url)
+    if parsed.scheme == 'sqlite':
+        return {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': parsed.path,
+        }
+    return {
+        'ENGINE': (
+            'task_manager.db.backends.postgresql'
+            if DB_POOL_SIZE
+            else 'django.db.backends.postgresql'
+        ),
+        'NAME': parsed.path[1:],
+        'USER': parsed.username,
+        'PASSWORD': parsed.password,
+        'HOST': parsed.hostname,
+        'PORT': parsed.port,
+        'CONN_MAX_AGE': (
+            0 if DB_POOL_SIZE
+            else int(os.getenv('DB_CONN_MAX_AGE', 60))
+        ),
+        'CONN_HEALTH_CHECKS': os.getenv(
+            'DB_CONN_HEALTH_CHECKS', 'true'
+        ).lower() == 'true',
+        'POOL': {
+            'size': DB_POOL_SIZE,
+            'timeout': float(os.getenv('DB_POOL_TIMEOUT', 30)),
+            'max_lifetime': float(os.getenv('DB_POOL_MAX_LIFETIME', 1800)),
+            'pre_ping': os.getenv(
+                'DB_POOL_PRE_PING', 'true'
+            ).lower() == 'true',
+        },
+    }
+
+
 if os.getenv('DJANGO_ENV') == 'development':
     DATABASES = {
         'default': {
@@ -117,20 +163,34 @@ if os.getenv('DJANGO_ENV') == 'development':
 else:
     db_url = os.getenv('DATABASE_URL')
     if db_url:
-        parsed = urllib.parse.urlparse(db_url)
         DATABASES = {
-            'default': {
-                'ENGINE': 'django.db.backends.postgresql',
-                'NAME': parsed.path[1:],
-                'USER': parsed.username,
-                'PASSWORD': parsed.password,
-                'HOST': parsed.hostname,
-                'PORT': parsed.port,
-            }
+            'default': database_from_url(db_url),
         }
     else:
         raise ValueError("DATABASE_URL not set for production environment")
 
+# Optional read replicas (comma-separated URLs, sqlite:///path works too).
+# Views with ReplicaReadMixin read from them round-robin; see
+# task_manager/db/routers.py. Tests mirror them onto the default database.
+DATABASE_REPLICAS = []
+for number, replica_url in enumerate(
+    filter(None, os.getenv('DATABASE_REPLICA_URLS', '').split(',')), 1
+):
+    alias = f'replica_{number}'
+    DATABASES[alias] = {
+        **database_from_url(replica_url.strip()),
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['task_manager.db.routers.ReplicaRouter']
+# After a write the browser reads from the primary for this long, so a
+# redirect after POST shows the change even if the replicas lag.
+REPLICA_PIN_SECONDS = int(os.getenv('REPLICA_PIN_SECONDS', 5))
+REPLICA_PIN_COOKIE = 'primary_pin'
+# A replica that fails to connect is skipped for this long.
+REPLICA_RETRY_SECONDS = int(os.getenv('REPLICA_RETRY_SECONDS', 30))
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -173,4 +233,123 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 LOGIN_URL = 'login'
 LOGIN_REDIRECT_URL = 'main_page'
 
-MESSAGE_STORAGE = 'django.contrib.messages.storage.session.SessionStorage'
\ No newline at end of file
+# Flash messages travel in a signed cookie, so queuing one never writes to
+# the session (and the database).
+MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
+
+# CACHE_BACKEND: "locmem" (default, per process), "file" (shared by the
+# workers of one host, CACHE_LOCATION) or "redis" (shared, CACHE_URL).
+# Keys are prefixed with CACHE_KEY_PREFIX and CACHE_VERSION; bumping the
+# version on deploy orphans everything cached by the previous release.
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'locmem')
+CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'task_manager',
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv(
+            'CACHE_LOCATION',
+            os.path.join(tempfile.gettempdir(), 'task_manager_cache'),
+        ),
+    },
+    'redis': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv('CACHE_URL', 'redis://127.0.0.1:6379/0'),
+    },
+}
+CACHE_KEY_PREFIX = os.getenv('CACHE_KEY_PREFIX', 'task_manager')
+CACHE_VERSION = int(os.getenv('CACHE_VERSION', 1))
+CACHES = {
+    'default': {
+        **CACHE_BACKENDS[CACHE_BACKEND],
+        'KEY_PREFIX': CACHE_KEY_PREFIX,
+        'VERSION': CACHE_VERSION,
+        'TIMEOUT': int(os.getenv('CACHE_TIMEOUT', 300)),
+    },
+}
+
+# SESSION_BACKEND: "cached_db" reads sessions from the cache and writes
+# through to the database, "signed_cookies" keeps them in the browser only,
+# "db" is Django's plain database backend. A per-process cache would keep
+# accepting a session another worker logged out, so outside development
+# (one runserver process) cached_db needs a shared CACHE_BACKEND and the
+# default falls back to db.
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'task_manager.sessions',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SHARED_CACHE = CACHE_BACKEND != 'locmem'
+SESSION_BACKEND = os.getenv(
+    'SESSION_BACKEND',
+    'cached_db'
+    if SHARED_CACHE or os.getenv('DJANGO_ENV') == 'development'
+    else 'db',
+)
+if (
+    SESSION_BACKEND == 'cached_db' and not SHARED_CACHE
+    and os.getenv('DJANGO_ENV') != 'development'
+):
+    raise ValueError(
+        "SESSION_BACKEND=cached_db needs a shared CACHE_BACKEND (file, redis)"
+    )
+SESSION_ENGINE = SESSION_ENGINES[SESSION_BACKEND]
+SESSION_CACHE_ALIAS = 'sessions'
+CACHES['sessions'] = {
+    **CACHES['default'],
+    'KEY_PREFIX': f'{CACHE_KEY_PREFIX}:sessions',
+}
+# A per-process cache doesn't see sessions changed or deleted (logout) by
+# other processes, e.g. a management command, so there cached sessions
+# live only briefly.
+SESSION_CACHE_MAX_AGE = (
+    None if SHARED_CACHE else int(os.getenv('SESSION_CACHE_MAX_AGE', 60))
+)
+
+# Choice lists for the task forms are kept per process in front of the
+# shared cache and invalidated by model signals; the TTL bounds how long
+# other workers can serve a stale list.
+CHOICES_CACHE_TTL = int(os.getenv('CHOICES_CACHE_TTL', 300))
+CHOICES_CACHE_VERSION = int(os.getenv('CHOICES_CACHE_VERSION', 1))
+# The unfiltered first page of the task list, keyed by table versions.
+TASK_PAGE_CACHE_TIMEOUT = int(os.getenv('TASK_PAGE_CACHE_TIMEOUT', 600))
+
+# Multiplies the response time budgets in task_manager/budgets.py, for slow
+# CI machines.
+QUERY_BUDGET_TIME_SCALE = float(os.getenv('QUERY_BUDGET_TIME_SCALE', 1))
+
+# Serve the task, status, label and user lists and the task page from
+# async views. Only worth it under an ASGI server (task_manager.asgi).
+ASYNC_VIEWS = os.getenv('ASYNC_VIEWS', 'false').lower() == 'true'
+
+# Live task list updates over Server-Sent Events, served only with
+# ASYNC_VIEWS since every open stream is a long-lived request. A stream
+# that falls TASK_EVENTS_QUEUE_SIZE events behind is told to reload.
+TASK_EVENTS_MAX_CONNECTIONS = int(
+    os.getenv('TASK_EVENTS_MAX_CONNECTIONS', 5000)
+)
+TASK_EVENTS_QUEUE_SIZE = int(os.getenv('TASK_EVENTS_QUEUE_SIZE', 100))
+TASK_EVENTS_HEARTBEAT = float(os.getenv('TASK_EVENTS_HEARTBEAT', 15))
+TASK_EVENTS_RETRY_MS = int(os.getenv('TASK_EVENTS_RETRY_MS', 5000))
+
+# Per-request Server-Timing header and rolling per-view percentiles. Each
+# worker keeps the last SERVER_TIMING_WINDOW samples per URL name and
+# writes them to SERVER_TIMING_DIR for `manage.py timing_report`.
+SERVER_TIMING_ENABLED = os.getenv('SERVER_TIMING', 'false').lower() == 'true'
+SERVER_TIMING_WINDOW = int(os.getenv('SERVER_TIMING_WINDOW', 1000))
+SERVER_TIMING_SNAPSHOT_INTERVAL = float(
+    os.getenv('SERVER_TIMING_SNAPSHOT_INTERVAL', 10)
+)
+SERVER_TIMING_DIR = os.getenv(
+    'SERVER_TIMING_DIR',
+    os.path.join(tempfile.gettempdir(), 'task_manager_timing'),
+)
+
+# Pool statistics are written per worker for `manage.py db_pool_stats`.
+DB_POOL_STATS_INTERVAL = float(os.getenv('DB_POOL_STATS_INTERVAL', 10))
+DB_POOL_STATS_DIR = os.getenv(
+    'DB_POOL_STATS_DIR',
+    os.path.join(tempfile.gettempdir(), 'task_manager_db_pool'),
+)
@@ -0,0 +1,56 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from task_manager.labels.models import Label
+from task_manager.statuses.models import Status
+from task_manager.tasks.models import Task
+
+from .versions import LABELS, STATUSES, TASKS, USERS, bump_versions
+
+# Fields that no page renders; saving only them must not invalidate pages.
+IGNORED_USER_FIELDS = {'last_login'}
+
+
+@receiver([post_save, post_delete], sender=Task)
+def bump_task_version(sender, **kwargs):
+    bump_versions(TASKS)
+
+
+@receiver([post_save, post_delete], sender=Status)
+def bump_status_version(sender, **kwargs):
+    bump_versions(STATUSES)
+
+
+@receiver([post_save, post_delete], sender=Label)
+def bump_label_version(sender, **kwargs):
+    bump_versions(LABELS)
+
+
+@receiver([post_save, post_delete], sender=get_user_model())
+def bump_user_version(sender, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) <= IGNORED_USER_FIELDS:
+        return
+    bump_versions(USERS)
+
+
+@receiver(m2m_changed, sender=Task.labels.through)
+def bump_task_labels_version(sender, instance, action, reverse, pk_set,
+                             **kwargs):
+    if action == 'pre_clear' and reverse:
+        # label.tasks.clear() sends no pk_set; remember the tasks first
+        instance._cleared_task_ids = list(
+            instance.tasks.values_list('pk', flat=True)
+        )
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        task_ids = [instance.pk]
+    elif action == 'post_clear':
+        task_ids = instance.__dict__.pop('_cleared_task_ids', [])
+    else:
+        task_ids = pk_set
+    Task.objects.filter(pk__in=task_ids).update(updated_at=timezone.now())
+    bump_versions(TASKS)
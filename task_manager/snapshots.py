@@ -0,0 +1,62 @@
+import json
+import os
+
+# Worker processes can't be inspected from a management command, so
+# per-process statistics are written to one JSON file per pid and merged
+# by whoever reads them. Files left by workers that have exited are
+# removed when read, so restarts don't keep adding in dead workers.
+
+
+def snapshot_path(directory, pid=None):
+    return os.path.join(directory, f'{pid or os.getpid()}.json')
+
+
+def write_snapshot(directory, data):
+    os.makedirs(directory, exist_ok=True)
+    path = snapshot_path(directory)
+    temporary = f'{path}.tmp'
+    with open(temporary, 'w') as file:
+        json.dump(data, file)
+    os.replace(temporary, path)
+
+
+def is_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Alive, but another user's process.
+        pass
+    return True
+
+
+def read_snapshots(directory):
+    snapshots = {}
+    if not os.path.isdir(directory):
+        return snapshots
+    for filename in sorted(os.listdir(directory)):
+        pid, extension = os.path.splitext(filename)
+        if extension != '.json' or not pid.isdigit():
+            continue
+        path = os.path.join(directory, filename)
+        if not is_alive(int(pid)):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            continue
+        try:
+            with open(path) as file:
+                snapshots[pid] = json.load(file)
+        except (OSError, ValueError):
+            continue
+    return snapshots
+
+
+def remove_snapshots(directory):
+    if not os.path.isdir(directory):
+        return
+    for filename in os.listdir(directory):
+        if filename.endswith('.json'):
+            os.remove(os.path.join(directory, filename))
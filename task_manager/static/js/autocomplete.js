@@ -0,0 +1,59 @@
+(function () {
+    'use strict';
+
+    const DELAY = 250;
+
+    function replaceOptions(select, results) {
+        Array.from(select.options).forEach(function (option) {
+            if (!option.selected && option.value !== '') {
+                option.remove();
+            }
+        });
+        const present = new Set(
+            Array.from(select.options).map(function (option) {
+                return option.value;
+            })
+        );
+        results.forEach(function (item) {
+            const value = String(item.id);
+            if (!present.has(value)) {
+                select.add(new Option(item.text, value));
+            }
+        });
+    }
+
+    function attach(select) {
+        const input = document.createElement('input');
+        input.type = 'search';
+        input.className = 'form-control mb-1';
+        input.placeholder = 'Поиск…';
+        input.autocomplete = 'off';
+        select.parentNode.insertBefore(input, select);
+
+        let timer = null;
+        let controller = null;
+        input.addEventListener('input', function () {
+            clearTimeout(timer);
+            timer = setTimeout(function () {
+                const query = input.value.trim();
+                if (!query) {
+                    return;
+                }
+                if (controller) {
+                    controller.abort();
+                }
+                controller = new AbortController();
+                const url = new URL(select.dataset.autocompleteUrl, window.location.origin);
+                url.searchParams.set('q', query);
+                fetch(url, {signal: controller.signal, credentials: 'same-origin'})
+                    .then(function (response) { return response.json(); })
+                    .then(function (data) { replaceOptions(select, data.results); })
+                    .catch(function () {});
+            }, DELAY);
+        });
+    }
+
+    document.addEventListener('DOMContentLoaded', function () {
+        document.querySelectorAll('select[data-autocomplete-url]').forEach(attach);
+    });
+})();
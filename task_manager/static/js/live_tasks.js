@@ -0,0 +1,84 @@
+(function () {
+    'use strict';
+
+    // Keeps an open task list current from the server's event stream: rows
+    // are updated or removed in place, new matches only raise a notice.
+
+    function rowFor(table, id) {
+        const checkbox = table.querySelector('input[name="tasks"][value="' + id + '"]');
+        return checkbox ? checkbox.closest('tr') : null;
+    }
+
+    function updateRow(row, task) {
+        row.cells[2].querySelector('a').textContent = task.name;
+        row.cells[3].textContent = task.status;
+        row.cells[5].textContent = task.executor || 'Не назначен';
+    }
+
+    function renameOptions(name, owner) {
+        let previous = null;
+        document.querySelectorAll(
+            'select[name="' + name + '"] option[value="' + owner.id + '"]'
+        ).forEach(function (option) {
+            previous = option.textContent.trim();
+            option.textContent = owner.name;
+        });
+        return previous;
+    }
+
+    let source = null;
+
+    function connect() {
+        const notice = document.getElementById('live-notice');
+        const table = document.querySelector('table[data-events-url]');
+        if (source) {
+            source.close();
+            source = null;
+        }
+        if (!notice || !table) {
+            return;
+        }
+        notice.classList.add('d-none');
+        source = new EventSource(table.dataset.eventsUrl);
+
+        function showNotice() {
+            notice.querySelector('a').href = window.location.href;
+            notice.classList.remove('d-none');
+        }
+
+        source.addEventListener('task', function (event) {
+            const task = JSON.parse(event.data);
+            const row = rowFor(table, task.id);
+            if (!task.visible) {
+                if (row) {
+                    row.remove();
+                }
+            } else if (row) {
+                updateRow(row, task);
+            } else {
+                showNotice();
+            }
+        });
+        source.addEventListener('status', function (event) {
+            const status = JSON.parse(event.data);
+            const previous = renameOptions('status', status);
+            if (previous === null) {
+                showNotice();
+                return;
+            }
+            Array.from(table.tBodies[0].rows).forEach(function (row) {
+                if (row.cells[3].textContent.trim() === previous) {
+                    row.cells[3].textContent = status.name;
+                }
+            });
+        });
+        source.addEventListener('label', function (event) {
+            renameOptions('label', JSON.parse(event.data));
+        });
+        source.addEventListener('reset', showNotice);
+    }
+
+    document.addEventListener('DOMContentLoaded', connect);
+    // The filter form swaps in a new table with its own stream URL.
+    document.addEventListener('tasks:replaced', connect);
+})();
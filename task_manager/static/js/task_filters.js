@@ -0,0 +1,90 @@
+(function () {
+    'use strict';
+
+    // Applies the task filters and follows the pagination links by
+    // swapping in the results fragment instead of reloading the page.
+
+    let controller = null;
+
+    function filterUrl(form) {
+        const params = new URLSearchParams();
+        new FormData(form).forEach(function (value, name) {
+            if (value !== '') {
+                params.append(name, value);
+            }
+        });
+        const url = new URL(window.location.pathname, window.location.origin);
+        url.search = params.toString();
+        return url.toString();
+    }
+
+    function updateFilterLinks(query) {
+        const filters = document.querySelector('#bulk-form input[name="filters"]');
+        if (filters) {
+            filters.value = query;
+        }
+        document.querySelectorAll('a[data-export-format]').forEach(function (link) {
+            const url = new URL(link.href);
+            const params = new URLSearchParams(query);
+            params.set('format', link.dataset.exportFormat);
+            url.search = params.toString();
+            link.href = url.toString();
+        });
+    }
+
+    function replaceResults(html) {
+        const template = document.createElement('template');
+        template.innerHTML = html.trim();
+        const results = template.content.getElementById('task-results');
+        document.getElementById('task-results').replaceWith(results);
+        updateFilterLinks(results.dataset.exportQuery);
+        document.dispatchEvent(new CustomEvent('tasks:replaced'));
+    }
+
+    function load(url) {
+        if (controller) {
+            controller.abort();
+        }
+        controller = new AbortController();
+        const fragmentUrl = new URL(url);
+        fragmentUrl.searchParams.set('fragment', 'rows');
+        fetch(fragmentUrl, {signal: controller.signal, credentials: 'same-origin'})
+            .then(function (response) {
+                if (!response.ok) {
+                    throw new Error(response.statusText);
+                }
+                return response.text();
+            })
+            .then(function (html) {
+                replaceResults(html);
+                history.pushState(null, '', url);
+            })
+            .catch(function (error) {
+                if (error.name !== 'AbortError') {
+                    window.location.assign(url);
+                }
+            });
+    }
+
+    document.addEventListener('DOMContentLoaded', function () {
+        const form = document.getElementById('task-filter-form');
+        if (!form) {
+            return;
+        }
+        form.addEventListener('submit', function (event) {
+            event.preventDefault();
+            load(filterUrl(form));
+        });
+        document.addEventListener('click', function (event) {
+            const link = event.target.closest('#task-results nav a');
+            if (link) {
+                event.preventDefault();
+                load(link.href);
+            }
+        });
+        // The form doesn't track history, so back and forward reload.
+        window.addEventListener('popstate', function () {
+            window.location.reload();
+        });
+    });
+})();
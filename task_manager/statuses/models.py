@@ -5,9 +5,14 @@ from django.db.models import ProtectedError
 class Status(models.Model):
     name = models.CharField(max_length=255)
     time_create = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def delete(self, *args, **kwargs):
-        if self.task_set.exists():
+        # StatusDeleteView annotates in_use, saving the EXISTS query.
+        in_use = getattr(self, 'in_use', None)
+        if in_use is None:
+            in_use = self.task_set.exists()
+        if in_use:
             raise ProtectedError(
                 "Нельзя удалить статус, так как он связан с задачами.",
                 self.task_set.all()
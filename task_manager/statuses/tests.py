@@ -1,8 +1,12 @@
 from django.contrib.messages import get_messages
+from django.db import connection
+from django.db.models import ProtectedError
 from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from task_manager.statuses.models import Status
+from task_manager.tasks.models import StatusTaskCount, Task
 from task_manager.users.models import CustomUser
 
 
@@ -113,3 +117,98 @@ class StatusCRUDTestWithFixtures(TestCase):
 
             response = self.client.post(url)
             self.assertRedirects(response, reverse('users:login'))
+
+
+class StatusObjectQueriesTest(TestCase):
+
+    def setUp(self):
+        self.client.force_login(CustomUser.objects.create_user(username='q'))
+        self.status = Status.objects.create(name='Новый')
+        self.edit_url = reverse(
+            'statuses:edit_status', kwargs={'pk': self.status.pk}
+        )
+        self.delete_url = reverse(
+            'statuses:delete_status', kwargs={'pk': self.status.pk}
+        )
+
+    def test_edit(self):
+        with self.assertNumQueries(2):
+            self.client.get(self.edit_url)
+        # user, status, then the update and the table version bump
+        with self.assertNumQueries(4):
+            response = self.client.post(self.edit_url, {'name': 'Другой'})
+        self.assertRedirects(response, reverse('statuses:statuses'))
+
+    def test_delete_form(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(self.delete_url)
+        self.assertContains(response, self.status.name)
+
+
+class StatusUsageTest(TestCase):
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='usage')
+        self.client.force_login(self.user)
+        self.used = Status.objects.create(name='Используется')
+        self.unused = Status.objects.create(name='Свободен')
+        for number in range(3):
+            Task.objects.create(
+                name=f'Задача {number}', status=self.used, author=self.user
+            )
+
+    def test_list_shows_task_counts(self):
+        response = self.client.get(reverse('statuses:statuses'))
+        counts = {
+            status['id']: status['task_count']
+            for status in response.context['statuses']
+        }
+        self.assertEqual(counts, {self.used.pk: 3, self.unused.pk: 0})
+
+    def test_list_counts_in_one_query(self):
+        self.client.get(reverse('statuses:statuses'))
+        # user, table versions, statuses with their counts
+        with self.assertNumQueries(3):
+            self.client.get(
+                reverse('statuses:statuses'), HTTP_CACHE_CONTROL='no-cache'
+            )
+
+    def test_task_changes_refresh_counts(self):
+        url = reverse('statuses:statuses')
+        etag = self.client.get(url)['ETag']
+        Task.objects.create(name='Ещё', status=self.unused, author=self.user)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_delete_guard_does_not_load_tasks(self):
+        url = reverse('statuses:delete_status', kwargs={'pk': self.used.pk})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(url)
+        # user, then the status with its in_use flag
+        self.assertEqual(len(queries), 2)
+        self.assertIn('AS "in_use"', queries[1]['sql'])
+        self.assertRedirects(response, reverse('statuses:statuses'))
+        self.assertTrue(Status.objects.filter(pk=self.used.pk).exists())
+
+    def test_delete_guard_reads_the_list_counter(self):
+        url = reverse('statuses:delete_status', kwargs={'pk': self.used.pk})
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(url)
+        self.assertIn('"tasks_statustaskcount"', queries[1]['sql'])
+        self.assertTrue(Status.objects.filter(pk=self.used.pk).exists())
+
+    def test_delete_guard_without_a_counter_row(self):
+        StatusTaskCount.objects.all().delete()
+        for status, kept in ((self.used, True), (self.unused, False)):
+            self.client.post(
+                reverse('statuses:delete_status', kwargs={'pk': status.pk})
+            )
+            self.assertEqual(
+                Status.objects.filter(pk=status.pk).exists(), kept
+            )
+
+    def test_model_delete_still_guards_without_annotation(self):
+        with self.assertRaises(ProtectedError):
+            self.used.delete()
+        self.unused.delete()
+        self.assertFalse(Status.objects.filter(pk=self.unused.pk).exists())
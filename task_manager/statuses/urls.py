@@ -1,12 +1,17 @@
 from django.urls import path
 
+from task_manager.mixins import pick_view
 from task_manager.statuses import views as status_views
 
+status_list_view = pick_view(
+    status_views.StatusView, status_views.AsyncStatusView
+)
+
 app_name = 'statuses'
 
 urlpatterns = [
     path('',
-         status_views.StatusView.as_view(),
+         status_list_view,
          name='statuses'),
     path('create/',
          status_views.CreateStatusView.as_view(),
@@ -1,24 +1,42 @@
 from django.contrib import messages
 from django.db.models import ProtectedError
+from django.db.models.functions import Coalesce
 from django.shortcuts import redirect
 from django.urls import reverse_lazy
 from django.views.generic import CreateView, DeleteView, ListView, UpdateView
 
-from task_manager.mixins import LoginRequiredMixin
+from task_manager.mixins import (
+    AsyncListMixin,
+    ConditionalGetMixin,
+    LoginRequiredMixin,
+    ObjectOnceMixin,
+    ReplicaReadMixin,
+)
+from task_manager.tasks import counters
+from task_manager.tasks.models import StatusTaskCount
+from task_manager.versions import STATUSES, TASKS
 
 from .forms import StatusForm
 from .models import Status
 
 
-class StatusView(LoginRequiredMixin, ListView):
+class StatusView(LoginRequiredMixin, ReplicaReadMixin, ConditionalGetMixin,
+                 ListView):
     model = Status
     template_name = 'statuses/index.html'
     context_object_name = 'statuses'
+    version_tables = (STATUSES, TASKS)
 
     def get_queryset(self):
-        return Status.objects.values(
-            'id', 'name', 'time_create').order_by('time_create'
-        )
+        return Status.objects.annotate(
+            task_count=Coalesce('task_counter__count', 0)
+        ).values(
+            'id', 'name', 'time_create', 'task_count'
+        ).order_by('time_create')
+
+
+class AsyncStatusView(AsyncListMixin, StatusView):
+    pass
 
 
 class CreateStatusView(LoginRequiredMixin, CreateView):
@@ -33,7 +51,7 @@ class CreateStatusView(LoginRequiredMixin, CreateView):
         return response
 
 
-class EditStatusView(LoginRequiredMixin, UpdateView):
+class EditStatusView(LoginRequiredMixin, ObjectOnceMixin, UpdateView):
     model = Status
     form_class = StatusForm
     template_name = 'statuses/edit.html'
@@ -45,11 +63,17 @@ class EditStatusView(LoginRequiredMixin, UpdateView):
         return response
 
 
-class StatusDeleteView(LoginRequiredMixin, DeleteView):
+class StatusDeleteView(LoginRequiredMixin, ObjectOnceMixin, DeleteView):
     model = Status
     template_name = 'statuses/status_confirm_delete.html'
     success_url = reverse_lazy('statuses:statuses')
 
+    def get_queryset(self):
+        # Status.delete checks in_use instead of querying tasks itself.
+        return Status.objects.annotate(
+            in_use=counters.in_use(StatusTaskCount)
+        )
+
     def form_valid(self, form):
         try:
             response = super().form_valid(form)
@@ -0,0 +1,139 @@
+from django.db import connections, router, transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from task_manager.versions import TASKS, bump_versions
+
+from . import counters, events
+from .models import ExecutorTaskCount, LabelTaskCount, StatusTaskCount, Task
+
+# Every action is a fixed sequence of set-based statements over the
+# selection subquery, so the statement count doesn't depend on how many
+# tasks are selected. The counters are adjusted from GROUP BY queries run
+# before the selection changes; counters.apply takes two statements per
+# APPLY_BATCH distinct owners (statuses, executors, labels) it touches, so
+# only a selection spread over more than that many owners adds statements.
+# Nothing here sends model signals, so open live task lists are told to
+# reload.
+
+Links = Task.labels.through
+
+
+def selection(queryset):
+    # A plain pk__in subquery: drops joins and annotations (search rank)
+    # so the selection can be reused in UPDATE and DELETE statements.
+    return Task.objects.filter(pk__in=queryset.order_by().values('pk'))
+
+
+def owner_counts(queryset, field):
+    return dict(
+        queryset.order_by().values_list(field).annotate(total=Count('pk'))
+    )
+
+
+def negated(counts):
+    return {owner_id: -total for owner_id, total in counts.items()}
+
+
+def set_field(selected, field, counter, value):
+    changed = selected.exclude(**{field: value})
+    before = owner_counts(changed, field)
+    changes = negated(before)
+    if value is not None:
+        changes[value.pk] = changes.get(value.pk, 0) + sum(before.values())
+    counters.apply(counter, changes)
+    return changed.update(**{field: value, 'updated_at': timezone.now()})
+
+
+def link_label(queryset, label):
+    # INSERT ... SELECT: one statement however many tasks get the label.
+    connection = connections[router.db_for_write(Links)]
+    subquery = queryset.order_by().values('id').distinct().query
+    sql, params = subquery.get_compiler(connection=connection).as_sql()
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {quote(Links._meta.db_table)} '
+            f'({quote("task_id")}, {quote("label_id")}) '
+            f'SELECT selected.{quote("id")}, %s FROM ({sql}) selected',
+            [label.pk, *params],
+        )
+
+
+def delete_rows(queryset):
+    # DELETE ... WHERE id IN (SELECT ...). QuerySet.delete() would load the
+    # tasks to send their delete signals, which adjust the counters and
+    # publish events one task at a time.
+    model = queryset.model
+    connection = connections[router.db_for_write(model)]
+    subquery = queryset.order_by().values('id').query
+    sql, params = subquery.get_compiler(connection=connection).as_sql()
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {quote(model._meta.db_table)} '
+            f'WHERE {quote("id")} IN '
+            f'(SELECT selected.{quote("id")} FROM ({sql}) selected)',
+            params,
+        )
+        return cursor.rowcount
+
+
+def add_label(selected, label):
+    changed = selected.exclude(labels=label)
+    # The task list caches rows by updated_at; touch before linking, while
+    # the subquery still matches the same tasks.
+    count = changed.update(updated_at=timezone.now())
+    link_label(changed, label)
+    counters.apply(LabelTaskCount, {label.pk: count})
+    return count
+
+
+def remove_label(selected, label):
+    count = selected.filter(labels=label).update(updated_at=timezone.now())
+    # The through model has no delete signals or relations, so this is a
+    # single DELETE.
+    Links.objects.filter(
+        label=label, task__in=selected.values('pk')
+    ).delete()
+    counters.apply(LabelTaskCount, {label.pk: -count})
+    return count
+
+
+def delete_tasks(selected, user):
+    # Same rule as DeleteTaskView: only the author may delete a task.
+    deletable = selected.filter(author=user)
+    links = Links.objects.filter(task__in=deletable.values('pk'))
+    counters.apply(StatusTaskCount, negated(owner_counts(deletable, 'status')))
+    counters.apply(
+        ExecutorTaskCount, negated(owner_counts(deletable, 'executor'))
+    )
+    counters.apply(LabelTaskCount, negated(owner_counts(links, 'label')))
+    links.delete()
+    return delete_rows(deletable)
+
+
+def apply_action(queryset, action, value, user):
+    # Returns the number of changed tasks and the number of selected tasks
+    # that were left alone because the user may not delete them.
+    selected = selection(queryset)
+    with transaction.atomic():
+        skipped = 0
+        if action == 'status':
+            count = set_field(selected, 'status', StatusTaskCount, value)
+        elif action == 'executor':
+            count = set_field(selected, 'executor', ExecutorTaskCount, value)
+        elif action == 'add_label':
+            count = add_label(selected, value)
+        elif action == 'remove_label':
+            count = remove_label(selected, value)
+        elif action == 'delete':
+            total = selected.count()
+            count = delete_tasks(selected, user)
+            skipped = total - count
+        else:
+            raise ValueError(f'Unknown bulk action: {action}')
+        if count:
+            bump_versions(TASKS)
+            events.tasks_reset()
+    return count, skipped
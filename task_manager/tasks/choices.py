@@ -0,0 +1,127 @@
+import time
+from threading import Lock
+
+from django import forms
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.forms.models import ModelChoiceIterator
+
+from task_manager import timing
+from task_manager.labels.models import Label
+from task_manager.statuses.models import Status
+
+# Per-process store of choice lists in front of the shared cache. Writes
+# drop the entry from this process and the shared cache through signals
+# (see tasks/signals.py); other workers pick the change up once their TTL
+# runs out.
+_store = {}
+_lock = Lock()
+
+
+def by_pk(queryset, pks):
+    queryset = queryset.order_by('pk')
+    return queryset if pks is None else queryset.filter(pk__in=pks)
+
+
+def load_statuses(pks=None):
+    return list(by_pk(Status.objects, pks).values_list('pk', 'name'))
+
+
+def load_users(pks=None):
+    return [
+        (pk, f'{first_name} {last_name}')
+        for pk, first_name, last_name in by_pk(
+            get_user_model().objects, pks
+        ).values_list('pk', 'first_name', 'last_name')
+    ]
+
+
+def load_labels(pks=None):
+    return list(by_pk(Label.objects, pks).values_list('pk', 'name'))
+
+
+LOADERS = {
+    'statuses': load_statuses,
+    'users': load_users,
+    'labels': load_labels,
+}
+
+
+def make_key(name):
+    return f'choices:{name}:v{settings.CHOICES_CACHE_VERSION}'
+
+
+def get_choices(name):
+    # Two tiers: this process's store, then the shared cache, then the
+    # database. Only the database load counts as a miss.
+    key = make_key(name)
+    now = time.monotonic()
+    entry = _store.get(key)
+    if entry is not None and entry[0] > now:
+        timing.record_cache(hit=True)
+        return entry[1]
+    choices = cache.get(key)
+    if choices is None:
+        choices = LOADERS[name]()
+        cache.set(key, choices, settings.CHOICES_CACHE_TTL)
+    with _lock:
+        _store[key] = (now + settings.CHOICES_CACHE_TTL, choices)
+    return choices
+
+
+def get_selected_labels(name, pks):
+    # Labels for the few selected options of an autocomplete widget; the
+    # whole list is never loaded for them.
+    return dict(LOADERS[name](pks)) if pks else {}
+
+
+def invalidate(*names):
+    keys = [make_key(name) for name in names or LOADERS]
+    with _lock:
+        for key in keys:
+            _store.pop(key, None)
+    cache.delete_many(keys)
+
+
+def clear():
+    invalidate()
+    with _lock:
+        _store.clear()
+
+
+class CachedChoiceIterator(ModelChoiceIterator):
+
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ('', self.field.empty_label)
+        yield from get_choices(self.field.choice_list)
+
+    def __len__(self):
+        return (
+            len(get_choices(self.field.choice_list))
+            + (self.field.empty_label is not None)
+        )
+
+    def __bool__(self):
+        return self.field.empty_label is not None or bool(
+            get_choices(self.field.choice_list)
+        )
+
+
+class CachedChoicesMixin:
+    iterator = CachedChoiceIterator
+
+    def __init__(self, *args, choice_list, **kwargs):
+        self.choice_list = choice_list
+        super().__init__(*args, **kwargs)
+
+
+class CachedModelChoiceField(CachedChoicesMixin, forms.ModelChoiceField):
+    pass
+
+
+class CachedModelMultipleChoiceField(
+    CachedChoicesMixin, forms.ModelMultipleChoiceField
+):
+    pass
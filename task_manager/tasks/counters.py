@@ -0,0 +1,142 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import (
+    BooleanField,
+    Case,
+    Count,
+    Exists,
+    F,
+    OuterRef,
+    When,
+)
+
+from .models import ExecutorTaskCount, LabelTaskCount, StatusTaskCount, Task
+
+# Counter model -> the rows it counts and the field pointing at its owner.
+SOURCES = {
+    StatusTaskCount: (Task, 'status'),
+    LabelTaskCount: (Task.labels.through, 'label'),
+    ExecutorTaskCount: (Task, 'executor'),
+}
+TOP_COUNT = 10
+# Keeps the CASE expression well under the databases' parameter limits.
+APPLY_BATCH = 500
+
+
+def apply(model, changes):
+    # Two statements per APPLY_BATCH owners: missing counter rows are
+    # created at zero, then a single UPDATE applies every delta.
+    changes = [
+        (owner_id, delta) for owner_id, delta in changes.items()
+        if owner_id is not None and delta
+    ]
+    for start in range(0, len(changes), APPLY_BATCH):
+        batch = dict(changes[start:start + APPLY_BATCH])
+        model.objects.bulk_create(
+            [model(pk=owner_id) for owner_id in batch],
+            ignore_conflicts=True,
+        )
+        deltas = Case(
+            *[When(pk=owner, then=delta) for owner, delta in batch.items()],
+            default=0,
+        )
+        model.objects.filter(pk__in=batch).update(count=F('count') + deltas)
+
+
+def record_task_change(before, after):
+    # ``before`` and ``after`` are (status_id, executor_id) pairs, None for
+    # a task that didn't exist before or doesn't exist after.
+    statuses, executors = Counter(), Counter()
+    for values, sign in ((before, -1), (after, 1)):
+        if values is not None:
+            status_id, executor_id = values
+            statuses[status_id] += sign
+            executors[executor_id] += sign
+    apply(StatusTaskCount, statuses)
+    apply(ExecutorTaskCount, executors)
+
+
+def record_label_change(changes):
+    apply(LabelTaskCount, changes)
+
+
+def recount(model, owner_ids):
+    source, field = SOURCES[model]
+    return dict(
+        source.objects.filter(**{f'{field}__in': owner_ids})
+        .order_by()
+        .values_list(field)
+        .annotate(total=Count('pk'))
+    )
+
+
+def reconcile(model, batch_size=1000, fix=True):
+    # Walks the owners in pk batches. Counter rows are locked before the
+    # recount, so tasks saved meanwhile are neither missed nor counted
+    # twice.
+    owners = model._meta.pk.related_model.objects.order_by('pk')
+    report = {'checked': 0, 'drifted': 0, 'off_by': 0}
+    last = None
+    while True:
+        batch = owners if last is None else owners.filter(pk__gt=last)
+        owner_ids = list(batch.values_list('pk', flat=True)[:batch_size])
+        if not owner_ids:
+            return report
+        last = owner_ids[-1]
+        with transaction.atomic():
+            stored = dict(
+                model.objects.select_for_update()
+                .filter(pk__in=owner_ids)
+                .values_list('pk', 'count')
+            )
+            actual = recount(model, owner_ids)
+            drifted = {
+                owner_id: actual.get(owner_id, 0)
+                for owner_id in owner_ids
+                if stored.get(owner_id, 0) != actual.get(owner_id, 0)
+            }
+            if fix:
+                model.objects.bulk_update([
+                    model(pk=owner_id, count=count)
+                    for owner_id, count in drifted.items()
+                    if owner_id in stored
+                ], ['count'])
+                model.objects.bulk_create([
+                    model(pk=owner_id, count=count)
+                    for owner_id, count in drifted.items()
+                    if owner_id not in stored
+                ])
+        report['checked'] += len(owner_ids)
+        report['drifted'] += len(drifted)
+        report['off_by'] += sum(
+            abs(count - stored.get(owner_id, 0))
+            for owner_id, count in drifted.items()
+        )
+
+
+def in_use(model):
+    # Whether an owner has tasks, for annotating its queryset: read from
+    # the same counter row the list pages show, so the two always agree.
+    # Owners without a row yet fall back to the recount's source table.
+    source, field = SOURCES[model]
+    counter = model._meta.pk.remote_field.related_name
+    return Case(
+        When(**{f'{counter}__count__gt': 0}, then=True),
+        When(
+            **{f'{counter}__isnull': True},
+            then=Exists(source.objects.filter(**{field: OuterRef('pk')})),
+        ),
+        default=False,
+        output_field=BooleanField(),
+    )
+
+
+def top(model, limit=TOP_COUNT):
+    owner = model._meta.pk.name
+    return [
+        (str(getattr(counter, owner)), counter.count)
+        for counter in model.objects.filter(count__gt=0)
+        .select_related(owner)
+        .order_by('-count', 'pk')[:limit]
+    ]
@@ -0,0 +1,82 @@
+from django.db.models import Sum
+
+from task_manager.cache import versioned_get_or_build
+from task_manager.versions import LABELS, STATUSES, TASKS
+
+from . import counters
+from .models import ExecutorTaskCount, LabelTaskCount, StatusTaskCount, Task
+
+RECENT_COUNT = 5
+
+# Every widget is either a maintained counter or a LIMITed walk down one of
+# the (..., time_create, id) indexes, so its cost doesn't grow with the
+# number of tasks. Each one is cached until one of the tables it reads
+# changes, so renaming a label leaves the status and task widgets alone.
+
+
+def recent_tasks(queryset):
+    return list(
+        queryset.select_related('status')
+        .order_by('-time_create', '-id')
+        .values('id', 'name', 'status__name', 'time_create')[:RECENT_COUNT]
+    )
+
+
+def build_total():
+    return StatusTaskCount.objects.aggregate(
+        total=Sum('count')
+    )['total'] or 0
+
+
+def build_assigned_count(user_id):
+    count = ExecutorTaskCount.objects.filter(pk=user_id).values_list(
+        'count', flat=True
+    ).first()
+    return count or 0
+
+
+# Widget -> the tables it reads and its builder.
+WIDGETS = {
+    'total': ((TASKS,), build_total),
+    'by_status': ((TASKS, STATUSES), lambda: counters.top(StatusTaskCount)),
+    'top_labels': ((TASKS, LABELS), lambda: counters.top(LabelTaskCount)),
+    'recent': ((TASKS, STATUSES), lambda: recent_tasks(Task.objects.all())),
+}
+# Tasks have no open/closed state, so the personal widgets cover every
+# task the user is the executor of.
+PERSONAL_WIDGETS = {
+    'count': ((TASKS,), build_assigned_count),
+    'recent': (
+        (TASKS, STATUSES),
+        lambda user_id: recent_tasks(Task.objects.filter(executor_id=user_id)),
+    ),
+}
+
+
+def widget_tables():
+    # Everything the page shows, for its ETag.
+    return tuple(sorted({
+        table
+        for tables, _ in (*WIDGETS.values(), *PERSONAL_WIDGETS.values())
+        for table in tables
+    }))
+
+
+def get_dashboard(user, versions=None):
+    dashboard = {
+        name: versioned_get_or_build(
+            f'dashboard:{name}', tables, build, versions=versions
+        )
+        for name, (tables, build) in WIDGETS.items()
+    }
+    dashboard['my_tasks'] = {
+        name: versioned_get_or_build(
+            f'dashboard:user:{name}',
+            tables,
+            lambda build=build: build(user.pk),
+            user.pk,
+            versions=versions,
+        )
+        for name, (tables, build) in PERSONAL_WIDGETS.items()
+    }
+    return dashboard
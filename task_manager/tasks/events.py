@@ -0,0 +1,250 @@
+import asyncio
+import json
+from collections import deque
+from dataclasses import dataclass
+from functools import partial
+from threading import Lock
+
+from django.conf import settings
+from django.db import transaction
+
+from .filters import get_task_filters
+from .models import Task
+from .search import WORD_RE
+
+# In-process pub/sub for the live task list. Model signals queue the
+# changed tasks per transaction and publish them on commit; every open
+# event stream is a subscriber with a bounded queue. Only streams served by
+# the same process hear about a change.
+
+
+@dataclass
+class TaskChange:
+    action: str
+    id: int
+    name: str = ''
+    text: str = ''
+    status_id: int | None = None
+    status: str = ''
+    executor_id: int | None = None
+    executor: str | None = None
+    author_id: int | None = None
+    label_ids: frozenset = frozenset()
+
+    def matches(self, filters, user_id):
+        # Mirrors filter_tasks; search falls back to word containment, the
+        # stream only has to decide whether the row may be on the page.
+        if self.action == 'deleted':
+            return False
+        if 'status' in filters and str(self.status_id) != filters['status']:
+            return False
+        if 'executor' in filters and (
+            str(self.executor_id) != filters['executor']
+        ):
+            return False
+        if 'label' in filters and filters['label'] not in {
+            str(label_id) for label_id in self.label_ids
+        }:
+            return False
+        if 'self_tasks' in filters and self.author_id != user_id:
+            return False
+        return all(
+            word.casefold() in self.text
+            for word in WORD_RE.findall(filters.get('q', ''))
+        )
+
+    def payload(self, visible):
+        if not visible:
+            return {'action': self.action, 'id': self.id, 'visible': False}
+        return {
+            'action': self.action,
+            'id': self.id,
+            'visible': True,
+            'name': self.name,
+            'status': self.status,
+            'executor': self.executor,
+        }
+
+
+class Subscriber:
+
+    def __init__(self, filters, user_id, loop, queue_size):
+        self.filters = filters
+        self.user_id = user_id
+        self.loop = loop
+        self.queue = deque()
+        self.queue_size = queue_size
+        self.overflowed = False
+        self.ready = asyncio.Event()
+
+    def push(self, name, data):
+        # A reader that falls this far behind gets a single reset event
+        # instead of an ever growing backlog.
+        if self.overflowed:
+            return
+        if len(self.queue) >= self.queue_size:
+            self.overflowed = True
+            self.queue.clear()
+        else:
+            self.queue.append((name, data))
+        self.loop.call_soon_threadsafe(self.ready.set)
+
+    def drain(self):
+        if self.overflowed:
+            self.overflowed = False
+            self.queue.clear()
+            return [('reset', {})]
+        events = []
+        while self.queue:
+            events.append(self.queue.popleft())
+        return events
+
+
+class Broker:
+
+    def __init__(self):
+        self.subscribers = set()
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self.subscribers)
+
+    def subscribe(self, subscriber):
+        with self._lock:
+            self.subscribers.add(subscriber)
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self.subscribers.discard(subscriber)
+
+    def publish(self, name, data=None, changes=()):
+        with self._lock:
+            subscribers = list(self.subscribers)
+        for subscriber in subscribers:
+            try:
+                if name != 'task':
+                    subscriber.push(name, data or {})
+                    continue
+                for change in changes:
+                    visible = change.matches(
+                        subscriber.filters, subscriber.user_id
+                    )
+                    # New rows elsewhere don't concern this page.
+                    if visible or change.action != 'created':
+                        subscriber.push('task', change.payload(visible))
+            except RuntimeError:
+                # The subscriber's event loop is gone.
+                self.unsubscribe(subscriber)
+
+
+broker = Broker()
+
+
+def load_changes(actions):
+    changes = {
+        task_id: TaskChange(action, task_id)
+        for task_id, action in actions.items()
+        if action == 'deleted'
+    }
+    ids = [task_id for task_id in actions if task_id not in changes]
+    if not ids:
+        return list(changes.values())
+    labels = {}
+    for task_id, label_id in Task.labels.through.objects.filter(
+        task_id__in=ids
+    ).values_list('task_id', 'label_id'):
+        labels.setdefault(task_id, set()).add(label_id)
+    for row in Task.objects.filter(pk__in=ids).values(
+        'id', 'name', 'description', 'status_id', 'status__name',
+        'executor_id', 'executor__first_name', 'executor__last_name',
+        'author_id',
+    ):
+        executor = None
+        if row['executor_id'] is not None:
+            executor = (
+                f'{row["executor__first_name"]} {row["executor__last_name"]}'
+            )
+        changes[row['id']] = TaskChange(
+            actions[row['id']],
+            row['id'],
+            name=row['name'],
+            text=f'{row["name"]} {row["description"]}'.casefold(),
+            status_id=row['status_id'],
+            status=row['status__name'],
+            executor_id=row['executor_id'],
+            executor=executor,
+            author_id=row['author_id'],
+            label_ids=frozenset(labels.get(row['id'], ())),
+        )
+    return list(changes.values())
+
+
+def flush(actions):
+    connection = transaction.get_connection()
+    callback = getattr(connection, 'task_events', None)
+    if callback and callback.args[0] is actions:
+        del connection.task_events
+    if actions and len(broker):
+        broker.publish('task', changes=load_changes(actions))
+
+
+def task_changed(task_id, action):
+    # Changes are collected per outermost transaction, so a form save that
+    # also sets labels publishes one event and loads the task once.
+    if not len(broker):
+        return
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        flush({task_id: action})
+        return
+    callback = getattr(connection, 'task_events', None)
+    if not any(func is callback for _, func, _ in connection.run_on_commit):
+        # The last batch was published, or a rollback dropped it.
+        callback = connection.task_events = partial(flush, {})
+        transaction.on_commit(callback)
+    actions = callback.args[0]
+    if actions.get(task_id) != 'created' or action == 'deleted':
+        actions[task_id] = action
+
+
+def owner_renamed(name, owner_id, title):
+    if len(broker):
+        transaction.on_commit(
+            lambda: broker.publish(name, {'id': owner_id, 'name': title})
+        )
+
+
+def tasks_reset():
+    # Bulk actions change rows without signals; clients reload instead.
+    if len(broker):
+        transaction.on_commit(lambda: broker.publish('reset'))
+
+
+def format_event(name, data):
+    return f'event: {name}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n'
+
+
+async def stream(params, user_id):
+    subscriber = Subscriber(
+        get_task_filters(params),
+        user_id,
+        asyncio.get_running_loop(),
+        settings.TASK_EVENTS_QUEUE_SIZE,
+    )
+    broker.subscribe(subscriber)
+    try:
+        yield f'retry: {settings.TASK_EVENTS_RETRY_MS}\n\n'
+        while True:
+            try:
+                await asyncio.wait_for(
+                    subscriber.ready.wait(), settings.TASK_EVENTS_HEARTBEAT
+                )
+            except TimeoutError:
+                # Keeps proxies from closing an idle stream.
+                yield ': ping\n\n'
+                continue
+            subscriber.ready.clear()
+            for name, data in subscriber.drain():
+                yield format_event(name, data)
+    finally:
+        broker.unsubscribe(subscriber)
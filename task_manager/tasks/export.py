@@ -0,0 +1,87 @@
+import csv
+import json
+
+from django.db.models import Prefetch
+
+from task_manager.labels.models import Label
+
+EXPORT_COLUMNS = (
+    'id',
+    'name',
+    'description',
+    'status',
+    'author',
+    'executor',
+    'labels',
+    'time_create',
+)
+EXPORT_CHUNK_SIZE = 2000
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
+def export_queryset(queryset):
+    return queryset.select_related(
+        'status', 'author', 'executor'
+    ).only(
+        'id',
+        'name',
+        'description',
+        'time_create',
+        'status__name',
+        'author__first_name',
+        'author__last_name',
+        'executor__first_name',
+        'executor__last_name',
+    ).prefetch_related(
+        Prefetch('labels', queryset=Label.objects.only('name'))
+    )
+
+
+def full_name(user):
+    if user is None:
+        return ''
+    return f'{user.first_name} {user.last_name}'
+
+
+def task_to_row(task):
+    return {
+        'id': task.id,
+        'name': task.name,
+        'description': task.description,
+        'status': task.status.name,
+        'author': full_name(task.author),
+        'executor': full_name(task.executor),
+        'labels': [label.name for label in task.labels.all()],
+        'time_create': task.time_create.isoformat(),
+    }
+
+
+def iter_tasks(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    # iterator() streams rows through a server-side cursor where the backend
+    # supports one and runs the labels prefetch once per chunk.
+    return export_queryset(queryset).iterator(chunk_size=chunk_size)
+
+
+def stream_csv(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    writer = csv.DictWriter(Echo(), fieldnames=EXPORT_COLUMNS)
+    yield writer.writeheader()
+    for task in iter_tasks(queryset, chunk_size):
+        row = task_to_row(task)
+        row['labels'] = ', '.join(row['labels'])
+        yield writer.writerow(row)
+
+
+def stream_jsonl(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    for task in iter_tasks(queryset, chunk_size):
+        yield json.dumps(task_to_row(task), ensure_ascii=False) + '\n'
+
+
+EXPORT_FORMATS = {
+    'csv': (stream_csv, 'text/csv; charset=utf-8'),
+    'jsonl': (stream_jsonl, 'application/x-ndjson; charset=utf-8'),
+}
+
@@ -0,0 +1,106 @@
+from django.conf import settings
+
+from task_manager.cache import versioned_get_or_build
+from task_manager.versions import LABELS, STATUSES, TASKS, USERS
+
+from .models import Task
+from .pagination import KeysetPaginator
+from .search import search_tasks
+
+TASK_FILTER_PARAMS = ('status', 'executor', 'label', 'self_tasks', 'q')
+ID_FILTER_PARAMS = ('status', 'executor', 'label')
+MAX_ID = 2 ** 63 - 1
+TASK_ORDERING = ('time_create', 'id')
+SEARCH_ORDERING = ('search_rank', 'id')
+TASK_LIST_TABLES = (TASKS, STATUSES, USERS, LABELS)
+
+
+def task_list_queryset():
+    return Task.objects.select_related(
+        'status', 'author', 'executor'
+    ).only(
+        'id',
+        'name',
+        'time_create',
+        'updated_at',
+        'status__name',
+        'status__updated_at',
+        'author__first_name',
+        'author__last_name',
+        'executor__first_name',
+        'executor__last_name',
+    )
+
+
+def get_task_filters(params):
+    return {
+        param: params[param]
+        for param in TASK_FILTER_PARAMS
+        if params.get(param)
+    }
+
+
+class InvalidFilter(ValueError):
+    pass
+
+
+def clean_id_filters(params):
+    # Checked up front: the ORM raises a bare ValueError for these, and
+    # an export would only fail after its 200 headers went out.
+    ids = {}
+    for param in ID_FILTER_PARAMS:
+        value = params.get(param)
+        if not value:
+            continue
+        try:
+            ids[param] = int(value)
+        except ValueError:
+            raise InvalidFilter(param) from None
+        if not 0 < ids[param] <= MAX_ID:
+            raise InvalidFilter(param)
+    return ids
+
+
+def filter_tasks(queryset, params, user):
+    ids = clean_id_filters(params)
+    status = ids.get('status')
+    executor = ids.get('executor')
+    label = ids.get('label')
+    self_tasks = params.get('self_tasks')
+    query = params.get('q', '').strip()
+
+    if status:
+        queryset = queryset.filter(status=status)
+    if executor:
+        queryset = queryset.filter(executor=executor)
+    if label:
+        queryset = queryset.filter(labels=label)
+
+    if self_tasks:
+        queryset = queryset.filter(author=user)
+
+    if query:
+        queryset = search_tasks(queryset, query)
+
+    return queryset
+
+
+def get_task_ordering(params):
+    if params.get('q', '').strip():
+        return SEARCH_ORDERING
+    return TASK_ORDERING
+
+
+def first_task_page(page_size, versions=None):
+    # The unfiltered first page is the same for every user, so it is kept
+    # in the shared cache until one of the tables it shows changes.
+    return versioned_get_or_build(
+        'tasks:first_page',
+        TASK_LIST_TABLES,
+        lambda: KeysetPaginator(
+            task_list_queryset(), TASK_ORDERING, page_size
+        ).page(),
+        page_size,
+        versions=versions,
+        timeout=settings.TASK_PAGE_CACHE_TIMEOUT,
+    )
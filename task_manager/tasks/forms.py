@@ -1,29 +1,55 @@
 from django import forms
 from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
 
 from task_manager.labels.models import Label
 from task_manager.statuses.models import Status
+from task_manager.tasks.choices import (
+    CachedModelChoiceField,
+    CachedModelMultipleChoiceField,
+)
 from task_manager.tasks.models import Task
+from task_manager.tasks.pagination import MAX_PAGE_SIZE
+from task_manager.tasks.widgets import (
+    AutocompleteSelect,
+    AutocompleteSelectMultiple,
+)
 
 
 class TaskFilterForm(forms.Form):
-    status = forms.ModelChoiceField(
+    q = forms.CharField(
+        required=False,
+        label='Поиск',
+        widget=forms.TextInput(attrs={
+            'class': 'form-control',
+            'placeholder': 'Имя или описание задачи',
+            'type': 'search'
+        })
+    )
+    status = CachedModelChoiceField(
         queryset=Status.objects.all(),
+        choice_list='statuses',
         required=False,
         label='Статус',
         widget=forms.Select(attrs={'class': 'form-control'})
     )
-    executor = forms.ModelChoiceField(
+    executor = CachedModelChoiceField(
         queryset=get_user_model().objects.all(),
+        choice_list='users',
         required=False,
         label='Исполнитель',
-        widget=forms.Select(attrs={'class': 'form-control'})
+        widget=AutocompleteSelect(
+            'users:autocomplete', 'users', attrs={'class': 'form-control'}
+        )
     )
-    label = forms.ModelChoiceField(
+    label = CachedModelChoiceField(
         queryset=Label.objects.all(),
+        choice_list='labels',
         required=False,
         label='Метка',
-        widget=forms.Select(attrs={'class': 'form-control'})
+        widget=AutocompleteSelect(
+            'labels:autocomplete', 'labels', attrs={'class': 'form-control'}
+        )
     )
     self_tasks = forms.BooleanField(
         required=False,
@@ -49,21 +75,30 @@ class TaskForm(forms.ModelForm):
         }),
         required=False
     )
-    status = forms.ModelChoiceField(
+    status = CachedModelChoiceField(
         label="Статус",
         queryset=Status.objects.all(),
+        choice_list='statuses',
         widget=forms.Select(attrs={'class': 'form-control'})
     )
-    executor = forms.ModelChoiceField(
+    executor = CachedModelChoiceField(
         label="Исполнитель",
         queryset=get_user_model().objects.all(),
-        widget=forms.Select(attrs={'class': 'form-control'}),
+        choice_list='users',
+        widget=AutocompleteSelect(
+            'users:autocomplete', 'users', attrs={'class': 'form-control'}
+        ),
         required=False
     )
-    labels = forms.ModelMultipleChoiceField(
+    labels = CachedModelMultipleChoiceField(
         label="Метки",
         queryset=Label.objects.all(),
-        widget=forms.SelectMultiple(attrs={'class': 'form-control'}),
+        choice_list='labels',
+        widget=AutocompleteSelectMultiple(
+            'labels:autocomplete',
+            'labels',
+            attrs={'class': 'form-select', 'size': 4}
+        ),
         required=False
     )
 
@@ -88,4 +123,91 @@ class TaskForm(forms.ModelForm):
         if commit:
             task.save()
             self.save_m2m()
-        return task
\ No newline at end of file
+        return task
+
+
+class TaskIdsField(forms.Field):
+    widget = forms.MultipleHiddenInput
+
+    def to_python(self, value):
+        try:
+            ids = {int(task_id) for task_id in value or ()}
+        except (TypeError, ValueError):
+            raise ValidationError('Некорректный список задач')
+        if len(ids) > MAX_PAGE_SIZE:
+            raise ValidationError(
+                f'Можно выбрать не больше {MAX_PAGE_SIZE} задач; '
+                f'для большего числа используйте текущий фильтр'
+            )
+        return sorted(ids)
+
+
+class TaskBulkForm(forms.Form):
+    ACTIONS = [
+        ('status', 'Изменить статус'),
+        ('executor', 'Назначить исполнителя'),
+        ('add_label', 'Добавить метку'),
+        ('remove_label', 'Снять метку'),
+        ('delete', 'Удалить'),
+    ]
+    # The form field holding the value each action needs.
+    ACTION_FIELDS = {
+        'status': 'status',
+        'executor': 'executor',
+        'add_label': 'label',
+        'remove_label': 'label',
+    }
+
+    action = forms.ChoiceField(
+        label='Действие',
+        choices=ACTIONS,
+        widget=forms.Select(attrs={'class': 'form-control'})
+    )
+    tasks = TaskIdsField(required=False)
+    select_all = forms.BooleanField(
+        required=False,
+        label='Все задачи по текущему фильтру',
+        widget=forms.CheckboxInput(attrs={'class': 'form-check-input'})
+    )
+    filters = forms.CharField(required=False, widget=forms.HiddenInput)
+    status = CachedModelChoiceField(
+        queryset=Status.objects.all(),
+        choice_list='statuses',
+        required=False,
+        label='Статус',
+        widget=forms.Select(attrs={'class': 'form-control'})
+    )
+    executor = CachedModelChoiceField(
+        queryset=get_user_model().objects.all(),
+        choice_list='users',
+        required=False,
+        label='Исполнитель',
+        widget=AutocompleteSelect(
+            'users:autocomplete', 'users', attrs={'class': 'form-control'}
+        )
+    )
+    label = CachedModelChoiceField(
+        queryset=Label.objects.all(),
+        choice_list='labels',
+        required=False,
+        label='Метка',
+        widget=AutocompleteSelect(
+            'labels:autocomplete', 'labels', attrs={'class': 'form-control'}
+        )
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if not cleaned_data.get('select_all') and not cleaned_data.get(
+            'tasks'
+        ):
+            raise ValidationError('Не выбрано ни одной задачи')
+        field = self.ACTION_FIELDS.get(cleaned_data.get('action'))
+        # An empty executor unassigns the tasks.
+        if field in ('status', 'label') and not cleaned_data.get(field):
+            self.add_error(field, 'Обязательное поле.')
+        return cleaned_data
+
+    def get_value(self):
+        field = self.ACTION_FIELDS.get(self.cleaned_data['action'])
+        return self.cleaned_data.get(field) if field else None
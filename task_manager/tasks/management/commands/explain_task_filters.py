@@ -0,0 +1,99 @@
+import re
+from itertools import combinations
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from task_manager.tasks.filters import (
+    TASK_FILTER_PARAMS,
+    filter_tasks,
+    get_task_ordering,
+    task_list_queryset,
+)
+from task_manager.tasks.pagination import DEFAULT_PAGE_SIZE
+
+# SQLite reports a full scan as "SCAN <table>" without "USING ... INDEX",
+# PostgreSQL as "Seq Scan on <table>".
+FULL_SCAN_PATTERNS = {
+    'sqlite': re.compile(r'\bSCAN (\w+)(?!.*\bUSING\b)'),
+    'postgresql': re.compile(r'Seq Scan on (\w+)'),
+}
+CHECKED_TABLES = {'tasks_task', 'tasks_task_labels'}
+SAMPLE_VALUES = {'self_tasks': 'on', 'q': 'задача'}
+
+
+def filter_combinations():
+    for size in range(len(TASK_FILTER_PARAMS) + 1):
+        yield from combinations(TASK_FILTER_PARAMS, size)
+
+
+def find_full_scans(plan, vendor):
+    pattern = FULL_SCAN_PATTERNS.get(vendor)
+    if pattern is None:
+        return []
+    return [
+        match.group(1)
+        for line in plan.splitlines()
+        for match in [pattern.search(line)]
+        if match and match.group(1) in CHECKED_TABLES
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        'Runs EXPLAIN for every TaskView filter combination and fails '
+        'if any of them falls back to a full table scan.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--page-size',
+            type=int,
+            default=DEFAULT_PAGE_SIZE,
+        )
+        parser.add_argument(
+            '--verbose-plans',
+            action='store_true',
+            help='Print the full plan for every combination.',
+        )
+
+    def explain(self, params, user, page_size):
+        queryset = filter_tasks(task_list_queryset(), params, user)
+        queryset = queryset.order_by(
+            *get_task_ordering(params)
+        )[:page_size + 1]
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                # Small tables are cheaper to scan; disabling seq scans makes
+                # the planner show whether a usable index exists at all.
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+            return queryset.explain()
+
+    def handle(self, *args, **options):
+        vendor = connection.vendor
+        if vendor not in FULL_SCAN_PATTERNS:
+            raise CommandError(f'Unsupported database backend: {vendor}')
+
+        user = get_user_model()(pk=1)
+        failures = []
+        for combination in filter_combinations():
+            params = {
+                param: SAMPLE_VALUES.get(param, '1') for param in combination
+            }
+            plan = self.explain(params, user, options['page_size'])
+            name = ', '.join(combination) or 'no filters'
+            scans = find_full_scans(plan, vendor)
+            if options['verbose_plans']:
+                self.stdout.write(f'{name}:\n{plan}\n')
+            if scans:
+                failures.append(f'{name}: {", ".join(sorted(set(scans)))}')
+                self.stdout.write(self.style.ERROR(f'FULL SCAN  {name}'))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'OK         {name}'))
+
+        if failures:
+            raise CommandError(
+                'Full table scans detected:\n' + '\n'.join(failures)
+            )
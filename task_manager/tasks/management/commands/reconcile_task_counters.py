@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from task_manager import versions
+from task_manager.tasks import counters
+
+
+class Command(BaseCommand):
+    help = (
+        'Recomputes the per-status, per-label and per-executor task '
+        'counters in batches, reports how far they drifted and fixes them.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report the drift.',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+        fix = not options['dry_run']
+        drifted = 0
+        for model in counters.SOURCES:
+            report = counters.reconcile(model, options['batch_size'], fix)
+            drifted += report['drifted']
+            line = (
+                f'{model.__name__}: {report["checked"]} checked, '
+                f'{report["drifted"]} drifted, off by {report["off_by"]}'
+            )
+            style = self.style.WARNING if report['drifted'] else str
+            self.stdout.write(style(line))
+        if drifted and fix:
+            # The fixes bypass the signals; pages showing counts are cached
+            # by table version.
+            versions.bump_versions(versions.TASKS)
+            self.stdout.write(self.style.SUCCESS('Counters fixed'))
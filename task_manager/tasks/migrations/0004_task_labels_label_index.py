@@ -0,0 +1,18 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0003_task_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=(
+                'CREATE INDEX tasks_task_labels_label_task_idx '
+                'ON tasks_task_labels (label_id, task_id)'
+            ),
+            reverse_sql='DROP INDEX tasks_task_labels_label_task_idx',
+        ),
+    ]
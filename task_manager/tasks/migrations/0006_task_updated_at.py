@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:05
+
+from django.db import migrations, models
+
+from task_manager.tasks.search import install_search_index
+
+
+def reinstall_search_index(apps, schema_editor):
+    # SQLite rebuilds tasks_task for AddField, dropping the FTS triggers.
+    install_search_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0005_task_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(
+            reinstall_search_index, migrations.RunPython.noop
+        ),
+    ]
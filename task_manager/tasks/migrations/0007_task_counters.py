@@ -0,0 +1,76 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:32
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+COUNTERS = (
+    ('StatusTaskCount', 'status'),
+    ('LabelTaskCount', 'label'),
+    ('ExecutorTaskCount', 'executor'),
+)
+
+
+def fill_counters(apps, schema_editor):
+    Task = apps.get_model('tasks', 'Task')
+    for name, field in COUNTERS:
+        model = apps.get_model('tasks', name)
+        source = Task.labels.through if field == 'label' else Task
+        totals = (
+            source.objects.exclude(**{field: None})
+            .order_by()
+            .values_list(field)
+            .annotate(total=Count('pk'))
+        )
+        model.objects.bulk_create(
+            (model(pk=owner_id, count=total) for owner_id, total in totals),
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('labels', '0003_label_updated_at'),
+        ('statuses', '0002_status_updated_at'),
+        ('tasks', '0006_task_updated_at'),
+        ('users', '0002_user_name_prefix_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExecutorTaskCount',
+            fields=[
+                ('count', models.BigIntegerField(default=0)),
+                ('executor', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='executor_task_counter', serialize=False, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'abstract': False,
+                'indexes': [models.Index(fields=['count'], name='executortaskcount_count_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='LabelTaskCount',
+            fields=[
+                ('count', models.BigIntegerField(default=0)),
+                ('label', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='task_counter', serialize=False, to='labels.label')),
+            ],
+            options={
+                'abstract': False,
+                'indexes': [models.Index(fields=['count'], name='labeltaskcount_count_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='StatusTaskCount',
+            fields=[
+                ('count', models.BigIntegerField(default=0)),
+                ('status', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='task_counter', serialize=False, to='statuses.status')),
+            ],
+            options={
+                'abstract': False,
+                'indexes': [models.Index(fields=['count'], name='statustaskcount_count_idx')],
+            },
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
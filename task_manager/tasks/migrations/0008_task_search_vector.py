@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+import task_manager.tasks.search
+from task_manager.tasks.search import install_search_index
+
+
+def add_search_vector(apps, schema_editor):
+    # Replaces the expression index with the stored search_vector column.
+    # On SQLite only the queries change.
+    if schema_editor.connection.vendor == 'postgresql':
+        install_search_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0007_task_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskSearchEntry',
+            fields=[
+                ('task', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_entry', serialize=False, to='tasks.task')),
+                ('document', task_manager.tasks.search.SearchDocumentField(db_column='tasks_task_fts')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'tasks_task_fts',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(add_search_vector, migrations.RunPython.noop),
+    ]
@@ -1,9 +1,12 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Q
 
 from task_manager.labels.models import Label
 from task_manager.statuses.models import Status
 from task_manager.users.models import CustomUser
 
+from .search import FTS_TABLE, SearchDocumentField
+
 
 class Task(models.Model):
     name = models.CharField(max_length=255)
@@ -11,19 +14,22 @@ class Task(models.Model):
     author = models.ForeignKey(
         CustomUser, 
         on_delete=models.PROTECT,
-        related_name='authored_tasks'
+        related_name='authored_tasks',
+        db_index=False
     )
     executor = models.ForeignKey(
         CustomUser, 
         on_delete=models.PROTECT,
         null=True, 
         blank=True, 
-        related_name='executed_tasks'
+        related_name='executed_tasks',
+        db_index=False
     )
     status = models.ForeignKey(
         Status,
         on_delete=models.PROTECT,
-        related_name='task_set'
+        related_name='task_set',
+        db_index=False
     )
     labels = models.ManyToManyField(
         Label,
@@ -32,6 +38,104 @@ class Task(models.Model):
         verbose_name='Метки'
     )
     time_create = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        # Every TaskView filter ends with the (time_create, id) keyset
+        # ordering, so the FK indexes are composites with it as the suffix.
+        indexes = [
+            models.Index(
+                fields=['time_create', 'id'],
+                name='task_time_create_idx'
+            ),
+            models.Index(
+                fields=['status', 'time_create', 'id'],
+                name='task_status_time_idx'
+            ),
+            models.Index(
+                fields=['author', 'time_create', 'id'],
+                name='task_author_time_idx'
+            ),
+            models.Index(
+                fields=['executor', 'time_create', 'id'],
+                name='task_executor_time_idx',
+                condition=Q(executor__isnull=False)
+            ),
+        ]
+
+    @property
+    def row_version(self):
+        # Changes whenever something shown in a task list row changes;
+        # label changes touch updated_at through the m2m signal.
+        return (
+            self.updated_at,
+            self.status.updated_at,
+            str(self.author),
+            str(self.executor) if self.executor_id else '',
+        )
+
+    def save(self, *args, **kwargs):
+        # The counters are updated from post_save; the transaction keeps
+        # them in step with the row.
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
 
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return self.name
+
+
+class TaskSearchEntry(models.Model):
+    # The SQLite FTS5 table that search.py creates and its triggers keep in
+    # sync. Only read, joined through Task.search_entry; the document column
+    # is FTS5's hidden column named after the table, used for MATCH.
+    task = models.OneToOneField(
+        Task,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column='rowid',
+        db_constraint=False,
+        related_name='search_entry'
+    )
+    document = SearchDocumentField(db_column=FTS_TABLE)
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = FTS_TABLE
+
+
+class TaskCounter(models.Model):
+    count = models.BigIntegerField(default=0)
+
+    class Meta:
+        abstract = True
+        indexes = [
+            models.Index(fields=['count'], name='%(class)s_count_idx'),
+        ]
+
+
+class StatusTaskCount(TaskCounter):
+    status = models.OneToOneField(
+        Status,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='task_counter'
+    )
+
+
+class LabelTaskCount(TaskCounter):
+    label = models.OneToOneField(
+        Label,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='task_counter'
+    )
+
+
+class ExecutorTaskCount(TaskCounter):
+    executor = models.OneToOneField(
+        CustomUser,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='executor_task_counter'
+    )
\ No newline at end of file
@@ -0,0 +1,188 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import datetime
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from django.http import Http404
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+@dataclass
+class KeysetPage:
+    object_list: list
+    next_cursor: str | None
+    page_size: int
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+
+def encode_cursor(values, filters=None):
+    payload = {
+        'k': [
+            value.isoformat() if isinstance(value, datetime) else value
+            for value in values
+        ],
+        'f': filters or {},
+    }
+    raw = json.dumps(payload, separators=(',', ':'), sort_keys=True)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    padded = cursor + '=' * (-len(cursor) % 4)
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return list(payload['k']), dict(payload['f'])
+    except (
+        binascii.Error,
+        UnicodeDecodeError,
+        ValueError,
+        KeyError,
+        TypeError,
+    ) as error:
+        raise InvalidCursor(cursor) from error
+
+
+def clamp_page_size(value, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(size, maximum))
+
+
+# Pages are fetched with a ``(a, b) > (x, y)`` predicate on a unique
+# ascending ordering instead of OFFSET, so deep pages cost the same as the
+# first one.
+class KeysetPaginator:
+
+    def __init__(self, queryset, ordering=('time_create', 'id'),
+                 page_size=DEFAULT_PAGE_SIZE):
+        self.queryset = queryset.order_by(*ordering)
+        self.ordering = tuple(ordering)
+        self.page_size = page_size
+
+    def _to_python(self, name, value):
+        try:
+            field = self.queryset.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return value
+        try:
+            return field.to_python(value)
+        except ValidationError as error:
+            raise InvalidCursor(value) from error
+
+    def _after(self, values):
+        condition = Q()
+        for position, name in enumerate(self.ordering):
+            step = Q(**{f'{name}__gt': values[position]})
+            for previous, previous_name in enumerate(self.ordering[:position]):
+                step &= Q(**{previous_name: values[previous]})
+            condition |= step
+        return condition
+
+    def _page_queryset(self, cursor, filters):
+        queryset = self.queryset
+        if cursor:
+            values, cursor_filters = decode_cursor(cursor)
+            if len(values) != len(self.ordering):
+                raise InvalidCursor(cursor)
+            if cursor_filters == filters:
+                values = [
+                    self._to_python(name, value)
+                    for name, value in zip(self.ordering, values)
+                ]
+                queryset = queryset.filter(self._after(values))
+        return queryset[:self.page_size + 1]
+
+    def _make_page(self, rows, filters):
+        next_cursor = None
+        if len(rows) > self.page_size:
+            rows = rows[:self.page_size]
+            last = rows[-1]
+            next_cursor = encode_cursor(
+                [getattr(last, name) for name in self.ordering], filters
+            )
+        return KeysetPage(rows, next_cursor, self.page_size)
+
+    def page(self, cursor=None, filters=None):
+        filters = filters or {}
+        rows = list(self._page_queryset(cursor, filters))
+        return self._make_page(rows, filters)
+
+    async def apage(self, cursor=None, filters=None):
+        filters = filters or {}
+        rows = [row async for row in self._page_queryset(cursor, filters)]
+        return self._make_page(rows, filters)
+
+
+class KeysetPaginationMixin:
+    keyset_ordering = ('time_create', 'id')
+    page_size = DEFAULT_PAGE_SIZE
+    max_page_size = MAX_PAGE_SIZE
+    cursor_param = 'cursor'
+    page_size_param = 'page_size'
+
+    def get_keyset_filters(self):
+        return {}
+
+    def get_keyset_ordering(self):
+        return self.keyset_ordering
+
+    def get_page_size(self):
+        return clamp_page_size(
+            self.request.GET.get(self.page_size_param),
+            self.page_size,
+            self.max_page_size,
+        )
+
+    def get_keyset_paginator(self, queryset):
+        return KeysetPaginator(
+            queryset, self.get_keyset_ordering(), self.get_page_size()
+        )
+
+    def paginate_keyset(self, queryset):
+        try:
+            return self.get_keyset_paginator(queryset).page(
+                self.request.GET.get(self.cursor_param),
+                self.get_keyset_filters(),
+            )
+        except InvalidCursor:
+            raise Http404('Некорректный курсор страницы')
+
+    async def apaginate_keyset(self, queryset):
+        try:
+            return await self.get_keyset_paginator(queryset).apage(
+                self.request.GET.get(self.cursor_param),
+                self.get_keyset_filters(),
+            )
+        except InvalidCursor:
+            raise Http404('Некорректный курсор страницы')
+
+    def get_page_link_params(self):
+        return self.request.GET.copy()
+
+    def get_first_page_url(self):
+        if not self.request.GET.get(self.cursor_param):
+            return None
+        params = self.get_page_link_params()
+        del params[self.cursor_param]
+        return f'{self.request.path}?{params.urlencode()}'
+
+    def get_next_page_url(self, page):
+        if not page.has_next:
+            return None
+        params = self.get_page_link_params()
+        params[self.cursor_param] = page.next_cursor
+        return f'{self.request.path}?{params.urlencode()}'
@@ -0,0 +1,141 @@
+import re
+
+from django.db import connection, models
+from django.db.models import F, FloatField, Lookup, Q, Value
+from django.db.models.expressions import RawSQL
+
+# PostgreSQL text search configuration. It is part of the generated
+# search_vector column, so changing it requires a migration that rebuilds
+# the column.
+SEARCH_CONFIG = 'russian'
+SEARCH_DOCUMENT = (
+    f"to_tsvector('{SEARCH_CONFIG}', "
+    "coalesce(name, '') || ' ' || coalesce(description, ''))"
+)
+FTS_TABLE = 'tasks_task_fts'
+
+SQLITE_FTS_SQL = [
+    f'''CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        name, description,
+        content='tasks_task', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )''',
+    f'''CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai
+    AFTER INSERT ON tasks_task BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END''',
+    f'''CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad
+    AFTER DELETE ON tasks_task BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END''',
+    f'''CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au
+    AFTER UPDATE OF name, description ON tasks_task BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END''',
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+SQLITE_FTS_DROP_SQL = [
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_ai',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_ad',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_au',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+]
+# The vector is stored, so ranking reads it instead of recomputing it for
+# every matching row. Not a model field: Django never selects or writes it.
+POSTGRESQL_FTS_SQL = [
+    f'ALTER TABLE tasks_task ADD COLUMN IF NOT EXISTS search_vector tsvector '
+    f'GENERATED ALWAYS AS ({SEARCH_DOCUMENT}) STORED',
+    'CREATE INDEX IF NOT EXISTS tasks_task_search_vector_idx '
+    'ON tasks_task USING GIN (search_vector)',
+    # The expression index from before the column existed.
+    'DROP INDEX IF EXISTS tasks_task_search_idx',
+]
+POSTGRESQL_FTS_DROP_SQL = [
+    'DROP INDEX IF EXISTS tasks_task_search_vector_idx',
+    'ALTER TABLE tasks_task DROP COLUMN IF EXISTS search_vector',
+]
+
+WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def install_search_index(schema_editor):
+    # SQLite drops triggers when a migration rebuilds tasks_task, so every
+    # migration that alters the table calls this again.
+    statements = {
+        'sqlite': SQLITE_FTS_SQL,
+        'postgresql': POSTGRESQL_FTS_SQL,
+    }.get(schema_editor.connection.vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def drop_search_index(schema_editor):
+    statements = {
+        'sqlite': SQLITE_FTS_DROP_SQL,
+        'postgresql': POSTGRESQL_FTS_DROP_SQL,
+    }.get(schema_editor.connection.vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+class SearchDocumentField(models.TextField):
+    pass
+
+
+@SearchDocumentField.register_lookup
+class Match(Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', [*lhs_params, *rhs_params]
+
+
+def fts5_query(query):
+    # Quote every word so user input can't inject FTS5 syntax; the trailing
+    # * turns each word into a prefix match.
+    return ' '.join(f'"{word}"*' for word in WORD_RE.findall(query))
+
+
+def search_tasks(queryset, query):
+    # Annotates ``search_rank`` so that ascending order means best match
+    # first, which lets the keyset paginator page through ranked results.
+    words = WORD_RE.findall(query)
+    if not words:
+        return queryset.annotate(
+            search_rank=Value(0.0, output_field=FloatField())
+        ).none()
+
+    vendor = connection.vendor
+    if vendor == 'sqlite':
+        # One join against the FTS table: it filters, and its rank column
+        # (bm25) orders. Going through the ORM keeps the table aliases right
+        # when the queryset is used as a subquery (bulk actions).
+        return queryset.filter(
+            search_entry__document__match=fts5_query(query)
+        ).annotate(search_rank=F('search_entry__rank'))
+    if vendor == 'postgresql':
+        tsquery = f"websearch_to_tsquery('{SEARCH_CONFIG}', %s)"
+        # pk__in lets Django qualify the column, so the filter stays
+        # correct when the queryset is used as a subquery (bulk actions).
+        return queryset.filter(pk__in=RawSQL(
+            f'SELECT id FROM tasks_task WHERE search_vector @@ {tsquery}',
+            [query],
+        )).annotate(search_rank=RawSQL(
+            f'-ts_rank(tasks_task.search_vector, {tsquery})',
+            [query],
+            output_field=FloatField(),
+        ))
+
+    condition = Q()
+    for word in words:
+        condition &= Q(name__icontains=word) | Q(description__icontains=word)
+    return queryset.filter(condition).annotate(
+        search_rank=Value(0.0, output_field=FloatField())
+    )
@@ -0,0 +1,132 @@
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from task_manager.labels.models import Label
+from task_manager.statuses.models import Status
+
+from . import choices, counters, events
+from .models import Task
+
+USER_CHOICE_FIELDS = {'first_name', 'last_name'}
+
+
+@receiver([post_save, post_delete], sender=Status)
+def invalidate_status_choices(sender, **kwargs):
+    choices.invalidate('statuses')
+
+
+@receiver([post_save, post_delete], sender=Label)
+def invalidate_label_choices(sender, **kwargs):
+    choices.invalidate('labels')
+
+
+@receiver(post_save, sender=Status)
+@receiver(post_save, sender=Label)
+def publish_renamed_owner(sender, instance, created, **kwargs):
+    if not created:
+        events.owner_renamed(
+            sender._meta.model_name, instance.pk, instance.name
+        )
+
+
+@receiver([post_save, post_delete], sender=get_user_model())
+def invalidate_user_choices(sender, update_fields=None, **kwargs):
+    # Logins save only last_login; skip them so the list stays warm.
+    if update_fields and not USER_CHOICE_FIELDS.intersection(update_fields):
+        return
+    choices.invalidate('users')
+
+
+@receiver(pre_save, sender=Task)
+def remember_counted_task(sender, instance, using, **kwargs):
+    if instance.pk is None:
+        return
+    # The stored row rather than the instance: it may have been loaded
+    # before someone else changed it.
+    stored = Task.objects.using(using).filter(pk=instance.pk)
+    if transaction.get_connection(using).in_atomic_block:
+        stored = stored.select_for_update()
+    instance._counted_before = stored.values_list(
+        'status_id', 'executor_id'
+    ).first()
+
+
+@receiver(post_save, sender=Task)
+def count_saved_task(sender, instance, created, **kwargs):
+    counters.record_task_change(
+        instance.__dict__.pop('_counted_before', None),
+        (instance.status_id, instance.executor_id),
+    )
+    events.task_changed(instance.pk, 'created' if created else 'updated')
+
+
+@receiver(pre_delete, sender=Task)
+def remember_task_labels(sender, instance, **kwargs):
+    # The label links are deleted along with the task without sending
+    # m2m_changed.
+    instance._counted_labels = Counter(
+        instance.labels.values_list('pk', flat=True)
+    )
+
+
+@receiver(post_delete, sender=Task)
+def count_deleted_task(sender, instance, **kwargs):
+    counters.record_task_change(
+        (instance.status_id, instance.executor_id), None
+    )
+    labels = instance.__dict__.pop('_counted_labels', {})
+    counters.record_label_change(
+        {label_id: -count for label_id, count in labels.items()}
+    )
+    events.task_changed(instance.pk, 'deleted')
+
+
+@receiver(m2m_changed, sender=Task.labels.through)
+def count_task_labels(sender, instance, action, reverse, pk_set, **kwargs):
+    if action in ('pre_remove', 'pre_clear'):
+        # remove() reports the ids it was given, linked or not, and clear()
+        # reports none; count the links that are really going away.
+        links = sender.objects.filter(
+            **{'label_id' if reverse else 'task_id': instance.pk}
+        )
+        if action == 'pre_remove':
+            links = links.filter(
+                **{'task_id__in' if reverse else 'label_id__in': pk_set}
+            )
+        instance._counted_labels = Counter(
+            links.values_list('label_id', flat=True)
+        )
+    elif action in ('post_remove', 'post_clear'):
+        labels = instance.__dict__.pop('_counted_labels', {})
+        counters.record_label_change(
+            {label_id: -count for label_id, count in labels.items()}
+        )
+    elif action == 'post_add':
+        # pk_set only holds the links that were actually created.
+        if reverse:
+            counters.record_label_change({instance.pk: len(pk_set)})
+        else:
+            counters.record_label_change(Counter(pk_set))
+
+
+@receiver(m2m_changed, sender=Task.labels.through)
+def publish_task_labels(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        events.task_changed(instance.pk, 'updated')
+    elif pk_set is None:
+        events.tasks_reset()
+    else:
+        for task_id in pk_set:
+            events.task_changed(task_id, 'updated')
@@ -1,11 +1,35 @@
+import asyncio
+import csv
+import json
+from io import StringIO
+from unittest import mock
+
 from django.contrib.messages import get_messages
-from django.test import Client, TestCase
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.models.signals import post_delete
+from django.http import QueryDict
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from task_manager.labels.models import Label
 from task_manager.statuses.models import Status
+from task_manager.tasks import bulk, choices, counters, events, search
 from task_manager.tasks.forms import TaskForm
-from task_manager.tasks.models import Task
+from task_manager.tasks.management.commands.explain_task_filters import (
+    find_full_scans,
+)
+from task_manager.tasks.models import (
+    ExecutorTaskCount,
+    LabelTaskCount,
+    StatusTaskCount,
+    Task,
+)
+from task_manager.tasks.pagination import MAX_PAGE_SIZE
+from task_manager.users.models import CustomUser
 
 
 class TaskCRUDTestWithFixtures(TestCase):
@@ -112,3 +136,1033 @@ class TaskCRUDTestWithFixtures(TestCase):
             self.assertRedirects(response, reverse('users:login'))
             response = self.client.post(url)
             self.assertRedirects(response, reverse('users:login'))
+
+
+class TaskObjectQueriesTest(TestCase):
+    fixtures = ['users.json', 'statuses.json', 'labels.json', 'tasks.json']
+
+    def setUp(self):
+        self.task = Task.objects.get(pk=1)
+        self.author = self.task.author
+        self.other = CustomUser.objects.exclude(pk=self.author.pk).first()
+        self.client.force_login(self.author)
+        self.edit_url = reverse('tasks:edit_task', kwargs={'pk': 1})
+        self.delete_url = reverse('tasks:delete_task', kwargs={'pk': 1})
+        choices.clear()
+
+    def test_edit_form(self):
+        # user, task, its labels, then the status, executor and label
+        # choices
+        with self.assertNumQueries(6):
+            response = self.client.get(self.edit_url)
+        self.assertEqual(response.status_code, 200)
+
+    def test_delete_form(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(self.delete_url)
+        self.assertContains(response, self.task.name)
+
+    def test_delete_loads_task_once(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.delete_url)
+        selects = [
+            query['sql'] for query in queries
+            if query['sql'].startswith('SELECT "tasks_task"."id"')
+        ]
+        self.assertEqual(len(selects), 1)
+        self.assertRedirects(response, reverse('tasks:tasks'))
+        self.assertFalse(Task.objects.filter(pk=1).exists())
+
+    def test_denied_delete_stops_after_the_task(self):
+        self.client.force_login(self.other)
+        for method in (self.client.get, self.client.post):
+            with self.assertNumQueries(2):
+                response = method(self.delete_url)
+            self.assertRedirects(response, reverse('tasks:tasks'))
+        self.assertTrue(Task.objects.filter(pk=1).exists())
+
+    def test_missing_task(self):
+        url = reverse('tasks:delete_task', kwargs={'pk': 0})
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertEqual(self.client.post(url).status_code, 404)
+
+
+class TaskListQueryBudgetTest(TestCase):
+    # user + table versions + tasks; the session comes from the session
+    # cache and filter choices from the warm choice cache
+    QUERY_BUDGET = 3
+    # each bound model filter is validated with a single lookup
+    MODEL_FILTERS = {'status', 'executor', 'label'}
+    # and the autocomplete pickers look up the selected option's label
+    AUTOCOMPLETE_FILTERS = {'executor', 'label'}
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            username='budget', first_name='Query', last_name='Budget'
+        )
+        self.executor = CustomUser.objects.create_user(
+            username='executor', first_name='Task', last_name='Executor'
+        )
+        self.status = Status.objects.create(name='Новый')
+        self.label = Label.objects.create(name='Метка')
+        self.client.force_login(self.user)
+        self.tasks_url = reverse('tasks:tasks')
+
+    def create_tasks(self, count):
+        tasks = Task.objects.bulk_create(
+            Task(
+                name=f'Task {i}',
+                description='',
+                author=self.user,
+                executor=self.executor if i % 2 else None,
+                status=self.status,
+            )
+            for i in range(count)
+        )
+        Task.labels.through.objects.bulk_create(
+            Task.labels.through(task_id=task.id, label_id=self.label.id)
+            for task in tasks
+        )
+
+    def assert_list_within_budget(self, count):
+        self.create_tasks(count)
+        filters = [
+            {},
+            {'status': self.status.id},
+            {'executor': self.executor.id},
+            {'label': self.label.id},
+            {'self_tasks': 'on'},
+        ]
+        self.client.get(self.tasks_url, {
+            'executor': self.executor.id, 'label': self.label.id
+        })
+        for params in filters:
+            with self.subTest(count=count, params=params):
+                expected = (
+                    self.QUERY_BUDGET
+                    + len(self.MODEL_FILTERS.intersection(params))
+                    + len(self.AUTOCOMPLETE_FILTERS.intersection(params))
+                )
+                with self.assertNumQueries(expected):
+                    response = self.client.get(self.tasks_url, params)
+                self.assertEqual(response.status_code, 200)
+
+    def test_small_task_list_query_budget(self):
+        self.assert_list_within_budget(10)
+
+    def test_large_task_list_query_budget(self):
+        self.assert_list_within_budget(10000)
+
+    def test_fragment_query_budget(self):
+        # No filter form to render, so bound filters cost nothing extra.
+        self.create_tasks(100)
+        for params in ({}, {'status': self.status.id, 'label': self.label.id}):
+            with self.subTest(params=params):
+                with CaptureQueriesContext(connection) as page:
+                    self.client.get(self.tasks_url, params)
+                with CaptureQueriesContext(connection) as fragment:
+                    response = self.client.get(
+                        self.tasks_url, {**params, 'fragment': 'rows'}
+                    )
+                self.assertEqual(response.status_code, 200)
+                self.assertLessEqual(len(fragment), len(page))
+                self.assertLessEqual(len(fragment), self.QUERY_BUDGET)
+
+
+class TaskListFragmentTest(TestCase):
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            username='fragment', first_name='Анна', last_name='Иванова'
+        )
+        self.status = Status.objects.create(name='Новый')
+        Task.objects.bulk_create(
+            Task(name=f'Задача {i}', author=self.user, status=self.status)
+            for i in range(60)
+        )
+        self.client.force_login(self.user)
+        self.url = reverse('tasks:tasks')
+
+    def test_fragment_holds_only_the_results(self):
+        params = {'status': self.status.pk}
+        page = self.client.get(self.url, params)
+        fragment = self.client.get(self.url, {**params, 'fragment': 'rows'})
+        self.assertTemplateUsed(fragment, 'tasks/results.html')
+        self.assertTemplateNotUsed(fragment, 'base.html')
+        self.assertNotContains(fragment, 'task-filter-form')
+        self.assertNotContains(fragment, 'id="bulk-form"')
+        self.assertContains(fragment, 'Задача 0')
+        self.assertContains(
+            fragment, f'data-export-query="status={self.status.pk}"'
+        )
+        self.assertLess(len(fragment.content), len(page.content))
+
+    def test_page_links_lead_to_full_pages(self):
+        fragment = self.client.get(self.url, {'fragment': 'rows'})
+        next_url = fragment.context['next_page_url']
+        self.assertIn('cursor=', next_url)
+        self.assertNotIn('fragment', next_url)
+        self.assertNotIn('fragment', self.client.get(
+            f'{next_url}&fragment=rows'
+        ).context['first_page_url'])
+
+    def test_fragment_and_page_have_their_own_etags(self):
+        page = self.client.get(self.url)
+        fragment = self.client.get(self.url, {'fragment': 'rows'})
+        self.assertNotEqual(page['ETag'], fragment['ETag'])
+        self.assertEqual(self.client.get(
+            self.url, {'fragment': 'rows'},
+            HTTP_IF_NONE_MATCH=fragment['ETag'],
+        ).status_code, 304)
+
+
+class TaskListKeysetPaginationTest(TestCase):
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='pager')
+        self.other = CustomUser.objects.create_user(username='other')
+        self.status = Status.objects.create(name='Новый')
+        self.client.force_login(self.user)
+        self.tasks_url = reverse('tasks:tasks')
+        Task.objects.bulk_create(
+            Task(
+                name=f'Task {i}',
+                description='',
+                author=self.user if i % 3 else self.other,
+                status=self.status,
+            )
+            for i in range(25)
+        )
+
+    def collect_pages(self, params):
+        seen = []
+        url, data = self.tasks_url, params
+        while url:
+            response = self.client.get(url, data)
+            self.assertEqual(response.status_code, 200)
+            seen.extend(task.id for task in response.context['tasks'])
+            url, data = response.context['next_page_url'], None
+        return seen
+
+    def test_pages_cover_all_tasks_once(self):
+        ids = self.collect_pages({'page_size': 10})
+        expected = list(
+            Task.objects.order_by('time_create', 'id')
+            .values_list('id', flat=True)
+        )
+        self.assertEqual(ids, expected)
+
+    def test_filters_are_kept_across_pages(self):
+        ids = self.collect_pages({'page_size': 4, 'self_tasks': 'on'})
+        expected = list(
+            Task.objects.filter(author=self.user)
+            .order_by('time_create', 'id')
+            .values_list('id', flat=True)
+        )
+        self.assertEqual(ids, expected)
+
+    def test_next_page_does_not_use_offset(self):
+        first = self.client.get(self.tasks_url, {'page_size': 5})
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(first.context['next_page_url'])
+        for query in queries.captured_queries:
+            self.assertNotIn('OFFSET', query['sql'].upper())
+
+    def test_page_size_is_bounded(self):
+        response = self.client.get(self.tasks_url, {'page_size': 100000})
+        self.assertEqual(
+            response.context['keyset_page'].page_size, MAX_PAGE_SIZE
+        )
+        response = self.client.get(self.tasks_url, {'page_size': 'abc'})
+        self.assertEqual(len(response.context['tasks']), 25)
+
+    def test_invalid_cursor_returns_404(self):
+        response = self.client.get(self.tasks_url, {'cursor': '!!!'})
+        self.assertEqual(response.status_code, 404)
+
+
+class ExplainTaskFiltersCommandTest(TestCase):
+
+    def test_every_filter_combination_uses_an_index(self):
+        out = StringIO()
+        call_command('explain_task_filters', stdout=out)
+        self.assertNotIn('FULL SCAN', out.getvalue())
+        self.assertIn('status, executor, label, self_tasks', out.getvalue())
+
+    def test_full_scan_detection(self):
+        self.assertEqual(
+            find_full_scans('2 0 0 SCAN tasks_task', 'sqlite'),
+            ['tasks_task'],
+        )
+        self.assertEqual(
+            find_full_scans(
+                '2 0 0 SCAN tasks_task USING INDEX task_time_create_idx',
+                'sqlite',
+            ),
+            [],
+        )
+        self.assertEqual(
+            find_full_scans(
+                'Limit\n  ->  Seq Scan on tasks_task_labels', 'postgresql'
+            ),
+            ['tasks_task_labels'],
+        )
+
+
+class TaskChoiceCacheTest(TestCase):
+
+    def setUp(self):
+        choices.clear()
+        self.user = CustomUser.objects.create_user(
+            username='cached', first_name='Cached', last_name='User'
+        )
+        self.status = Status.objects.create(name='Новый')
+        self.label = Label.objects.create(name='Срочно')
+        self.client.force_login(self.user)
+        self.create_url = reverse('tasks:create_task')
+
+    def test_warm_create_page_makes_no_choice_queries(self):
+        with self.assertNumQueries(2):
+            self.client.get(self.create_url)
+        # user only, the session is cached
+        with self.assertNumQueries(1):
+            response = self.client.get(self.create_url)
+        self.assertContains(response, 'Новый')
+
+    def test_writes_invalidate_choice_lists(self):
+        self.client.get(self.create_url)
+        self.status.name = 'В работе'
+        self.status.save()
+        label = Label.objects.create(name='Баг')
+        response = self.client.get(self.create_url)
+        self.assertContains(response, 'В работе')
+        self.assertIn((label.pk, 'Баг'), choices.get_choices('labels'))
+
+    def test_login_does_not_invalidate_user_choices(self):
+        choices.get_choices('users')
+        self.user.save(update_fields=['last_login'])
+        with self.assertNumQueries(0):
+            choices.get_choices('users')
+
+    def test_cache_key_is_versioned(self):
+        with self.settings(CHOICES_CACHE_VERSION=2):
+            self.assertEqual(
+                choices.make_key('labels'), 'choices:labels:v2'
+            )
+
+
+class TaskRowFragmentCacheTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(
+            username='rows', first_name='Иван', last_name='Петров'
+        )
+        self.status = Status.objects.create(name='Новый')
+        self.task = Task.objects.create(
+            name='Кешируемая', status=self.status, author=self.user,
+            executor=self.user,
+        )
+        self.client.force_login(self.user)
+        self.url = reverse('tasks:tasks')
+
+    def row_key(self):
+        task = Task.objects.select_related(
+            'status', 'author', 'executor'
+        ).get(pk=self.task.pk)
+        return make_template_fragment_key(
+            'task_row', [task.id, task.row_version]
+        )
+
+    def test_rendered_row_is_cached(self):
+        self.assertIsNone(cache.get(self.row_key()))
+        self.client.get(self.url)
+        self.assertIn('Кешируемая', cache.get(self.row_key()))
+
+    def test_status_rename_shows_in_row(self):
+        self.client.get(self.url)
+        self.status.name = 'В работе'
+        self.status.save()
+        self.assertContains(self.client.get(self.url), 'В работе')
+
+    def test_user_rename_shows_in_row(self):
+        self.client.get(self.url)
+        self.user.last_name = 'Сидоров'
+        self.user.save()
+        response = self.client.get(self.url)
+        self.assertContains(response, 'Иван Сидоров', count=2)
+
+    def test_task_edit_shows_in_row(self):
+        self.client.get(self.url)
+        self.task.name = 'Переименованная'
+        self.task.save()
+        self.assertContains(self.client.get(self.url), 'Переименованная')
+
+    def test_label_change_refreshes_row_key(self):
+        key = self.row_key()
+        self.task.labels.add(Label.objects.create(name='Срочно'))
+        self.assertNotEqual(self.row_key(), key)
+
+    def test_header_depends_on_authentication(self):
+        self.assertContains(self.client.get(self.url), 'Выход')
+        self.client.logout()
+        response = self.client.get(reverse('main_page'))
+        self.assertContains(response, 'Вход')
+        self.assertNotContains(response, 'Выход')
+
+
+class TaskCounterTest(TestCase):
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            username='counted', first_name='Анна', last_name='Иванова'
+        )
+        self.other = CustomUser.objects.create_user(
+            username='other', first_name='Пётр', last_name='Смирнов'
+        )
+        self.new = Status.objects.create(name='Новый')
+        self.done = Status.objects.create(name='Готово')
+        self.bug = Label.objects.create(name='Баг')
+        self.urgent = Label.objects.create(name='Срочно')
+        self.client.force_login(self.user)
+
+    def assertCounts(self, model, expected):
+        self.assertEqual(
+            dict(model.objects.filter(count__gt=0).values_list('pk', 'count')),
+            expected,
+        )
+
+    def create_task(self, **data):
+        self.client.post(reverse('tasks:create_task'), {
+            'name': 'Задача',
+            'description': '',
+            'status': self.new.pk,
+            'executor': self.user.pk,
+            'labels': [self.bug.pk, self.urgent.pk],
+            **data,
+        })
+        return Task.objects.latest('pk')
+
+    def test_create_edit_and_delete_through_views(self):
+        task = self.create_task()
+        self.create_task(labels=[self.bug.pk], executor='')
+        self.assertCounts(StatusTaskCount, {self.new.pk: 2})
+        self.assertCounts(ExecutorTaskCount, {self.user.pk: 1})
+        self.assertCounts(LabelTaskCount, {self.bug.pk: 2, self.urgent.pk: 1})
+
+        self.client.post(
+            reverse('tasks:edit_task', kwargs={'pk': task.pk}),
+            {
+                'name': task.name,
+                'description': '',
+                'status': self.done.pk,
+                'executor': self.other.pk,
+                'labels': [self.urgent.pk],
+            },
+        )
+        self.assertCounts(StatusTaskCount, {self.new.pk: 1, self.done.pk: 1})
+        self.assertCounts(ExecutorTaskCount, {self.other.pk: 1})
+        self.assertCounts(LabelTaskCount, {self.bug.pk: 1, self.urgent.pk: 1})
+
+        self.client.post(reverse('tasks:delete_task', kwargs={'pk': task.pk}))
+        self.assertCounts(StatusTaskCount, {self.new.pk: 1})
+        self.assertCounts(ExecutorTaskCount, {})
+        self.assertCounts(LabelTaskCount, {self.bug.pk: 1})
+
+    def test_stale_instance_does_not_skew_counts(self):
+        task = Task.objects.create(
+            name='Задача', status=self.new, author=self.user
+        )
+        stale = Task.objects.get(pk=task.pk)
+        task.status = self.done
+        task.save()
+        stale.name = 'Переименована'
+        stale.save()
+        self.assertCounts(StatusTaskCount, {self.new.pk: 1})
+
+    def test_label_side_changes(self):
+        first, second = [
+            Task.objects.create(name=name, status=self.new, author=self.user)
+            for name in ('Первая', 'Вторая')
+        ]
+        self.bug.tasks.add(first, second)
+        # Neither a second add nor removing an unlinked label counts.
+        first.labels.add(self.bug)
+        first.labels.remove(self.urgent)
+        self.assertCounts(LabelTaskCount, {self.bug.pk: 2})
+        self.bug.tasks.remove(first)
+        self.assertCounts(LabelTaskCount, {self.bug.pk: 1})
+        first.labels.set([self.bug, self.urgent])
+        self.assertCounts(LabelTaskCount, {self.bug.pk: 2, self.urgent.pk: 1})
+        first.labels.clear()
+        self.bug.tasks.clear()
+        self.assertCounts(LabelTaskCount, {})
+
+    def test_reconcile_reports_and_fixes_drift(self):
+        task = Task.objects.create(
+            name='Задача', status=self.new, author=self.user,
+            executor=self.other,
+        )
+        task.labels.add(self.bug)
+        StatusTaskCount.objects.filter(pk=self.new.pk).update(count=5)
+        LabelTaskCount.objects.all().delete()
+
+        out = StringIO()
+        call_command(
+            'reconcile_task_counters', '--dry-run', '--batch-size=1',
+            stdout=out,
+        )
+        self.assertIn('StatusTaskCount: 2 checked, 1 drifted, off by 4',
+                      out.getvalue())
+        self.assertIn('LabelTaskCount: 2 checked, 1 drifted, off by 1',
+                      out.getvalue())
+        self.assertCounts(StatusTaskCount, {self.new.pk: 5})
+
+        call_command('reconcile_task_counters', stdout=StringIO())
+        self.assertCounts(StatusTaskCount, {self.new.pk: 1})
+        self.assertCounts(LabelTaskCount, {self.bug.pk: 1})
+        self.assertCounts(ExecutorTaskCount, {self.other.pk: 1})
+        self.assertEqual(
+            counters.reconcile(StatusTaskCount, fix=False)['drifted'], 0
+        )
+
+
+class TaskBulkActionTest(TestCase):
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            username='bulk', first_name='Анна', last_name='Иванова'
+        )
+        self.other = CustomUser.objects.create_user(
+            username='other', first_name='Пётр', last_name='Смирнов'
+        )
+        self.new = Status.objects.create(name='Новый')
+        self.done = Status.objects.create(name='Готово')
+        self.bug = Label.objects.create(name='Баг')
+        self.urgent = Label.objects.create(name='Срочно')
+        self.client.force_login(self.user)
+        self.url = reverse('tasks:bulk_tasks')
+
+    def make_tasks(self, count, **fields):
+        tasks = [
+            Task.objects.create(
+                name=f'Задача {number}', status=self.new, author=self.user,
+                executor=self.other, **fields,
+            )
+            for number in range(count)
+        ]
+        tasks[0].labels.add(self.bug)
+        return tasks
+
+    def post(self, tasks=(), **data):
+        return self.client.post(
+            self.url, {'tasks': [task.pk for task in tasks], **data}
+        )
+
+    def assertCountersExact(self):
+        for model in counters.SOURCES:
+            self.assertEqual(
+                counters.reconcile(model, fix=False)['drifted'], 0, model
+            )
+
+    def test_change_status(self):
+        tasks = self.make_tasks(3)
+        untouched = self.make_tasks(1)[0]
+        response = self.post(tasks[:2], action='status', status=self.done.pk)
+        self.assertRedirects(response, reverse('tasks:tasks'))
+        self.assertEqual(
+            list(Task.objects.filter(status=self.done).order_by('pk')),
+            tasks[:2],
+        )
+        untouched.refresh_from_db()
+        self.assertEqual(untouched.status, self.new)
+        messages = [str(m) for m in get_messages(response.wsgi_request)]
+        self.assertEqual(messages, ['Изменено задач: 2'])
+        self.assertCountersExact()
+
+    def test_reassign_and_unassign(self):
+        tasks = self.make_tasks(3)
+        self.post(tasks[:2], action='executor', executor=self.user.pk)
+        self.post(tasks[1:], action='executor', executor='')
+        self.assertEqual(
+            [task.executor_id for task in Task.objects.order_by('pk')],
+            [self.user.pk, None, None],
+        )
+        self.assertCountersExact()
+
+    def test_add_and_remove_label(self):
+        tasks = self.make_tasks(3)
+        self.post(tasks, action='add_label', label=self.bug.pk)
+        self.assertEqual(self.bug.tasks.count(), 3)
+        self.post(tasks[:2], action='remove_label', label=self.bug.pk)
+        self.assertEqual(list(self.bug.tasks.all()), tasks[2:])
+        self.assertCountersExact()
+
+    def test_label_change_refreshes_list_rows(self):
+        task = self.make_tasks(1)[0]
+        before = Task.objects.get(pk=task.pk).updated_at
+        self.post([task], action='add_label', label=self.urgent.pk)
+        self.assertGreater(Task.objects.get(pk=task.pk).updated_at, before)
+
+    def test_delete_only_own_tasks(self):
+        own = self.make_tasks(2)
+        foreign = Task.objects.create(
+            name='Чужая', status=self.new, author=self.other
+        )
+        response = self.post([*own, foreign], action='delete')
+        self.assertEqual(list(Task.objects.all()), [foreign])
+        messages = [str(m) for m in get_messages(response.wsgi_request)]
+        self.assertEqual(messages, [
+            'Удалено задач: 2',
+            'Не удалено задач: 1. Задачу может удалить только ее автор',
+        ])
+        self.assertCountersExact()
+
+    def test_delete_skips_the_per_task_signals(self):
+        tasks = self.make_tasks(3)
+        receiver = mock.Mock()
+        post_delete.connect(receiver, sender=Task)
+        self.addCleanup(post_delete.disconnect, receiver, sender=Task)
+        with CaptureQueriesContext(connection) as queries:
+            self.post(tasks, action='delete')
+        receiver.assert_not_called()
+        self.assertFalse(Task.objects.exists())
+        self.assertFalse(self.bug.tasks.exists())
+        deletes = [
+            query['sql'] for query in queries
+            if query['sql'].startswith('DELETE')
+        ]
+        self.assertEqual(len(deletes), 2)
+        self.assertCountersExact()
+
+    def test_select_all_matching_filter(self):
+        self.make_tasks(2)
+        done = Task.objects.create(
+            name='Отчёт', status=self.done, author=self.user
+        )
+        response = self.post(
+            action='add_label', label=self.urgent.pk, select_all='on',
+            filters=f'status={self.done.pk}&q=отчёт',
+        )
+        self.assertRedirects(
+            response,
+            f'{reverse("tasks:tasks")}?status={self.done.pk}&q=%D0%BE%D1'
+            f'%82%D1%87%D1%91%D1%82',
+            fetch_redirect_response=False,
+        )
+        self.assertEqual(list(self.urgent.tasks.all()), [done])
+        self.assertCountersExact()
+
+    def test_statement_count_does_not_grow_with_selection(self):
+        statements = {}
+        for size in (2, 20):
+            tasks = self.make_tasks(size)
+            for data in (
+                {'action': 'status', 'status': self.done.pk},
+                {'action': 'executor', 'executor': self.user.pk},
+                {'action': 'add_label', 'label': self.urgent.pk},
+                {'action': 'remove_label', 'label': self.urgent.pk},
+                {'action': 'delete'},
+            ):
+                with CaptureQueriesContext(connection) as queries:
+                    self.post(tasks, **data)
+                statements.setdefault(data['action'], []).append(
+                    len(queries)
+                )
+        for action, (small, large) in statements.items():
+            self.assertEqual(small, large, action)
+        self.assertCountersExact()
+
+    def test_requires_a_selection(self):
+        self.make_tasks(1)
+        response = self.post(action='status', status=self.done.pk)
+        messages = [str(m) for m in get_messages(response.wsgi_request)]
+        self.assertEqual(messages, ['Не выбрано ни одной задачи'])
+        self.assertFalse(Task.objects.filter(status=self.done).exists())
+
+    def test_status_is_required_for_status_change(self):
+        task = self.make_tasks(1)[0]
+        self.post([task], action='status')
+        task.refresh_from_db()
+        self.assertEqual(task.status, self.new)
+
+
+class TaskAutocompleteWidgetTest(TestCase):
+    fixtures = ['users.json', 'statuses.json', 'labels.json', 'tasks.json']
+
+    def setUp(self):
+        choices.clear()
+        self.task = Task.objects.get(pk=1)
+        self.client.force_login(self.task.author)
+
+    def test_create_page_renders_no_user_or_label_options(self):
+        response = self.client.get(reverse('tasks:create_task'))
+        executor = response.context['form']['executor']
+        self.assertEqual(
+            [option.data['value'] for option in executor.subwidgets], ['']
+        )
+        self.assertNotContains(response, 'Diukarev')
+        self.assertContains(
+            response, f'data-autocomplete-url="{reverse("users:autocomplete")}"'
+        )
+
+    def test_edit_page_renders_only_selected_values(self):
+        response = self.client.get(
+            reverse('tasks:edit_task', kwargs={'pk': self.task.pk})
+        )
+        form = response.context['form']
+        self.assertEqual(
+            [str(option.data['value']) for option in form['executor']][1:],
+            [str(self.task.executor_id)],
+        )
+        self.assertEqual(
+            sorted(str(option.data['value']) for option in form['labels']),
+            sorted(str(pk) for pk in self.task.labels.values_list(
+                'pk', flat=True
+            )),
+        )
+
+    def test_selected_values_skip_the_choice_lists(self):
+        self.client.get(reverse('tasks:edit_task', kwargs={'pk': 1}))
+        for name in ('users', 'labels'):
+            self.assertIsNone(cache.get(choices.make_key(name)))
+
+    def test_filter_keeps_selected_executor(self):
+        response = self.client.get(
+            reverse('tasks:tasks'), {'executor': self.task.executor_id}
+        )
+        self.assertContains(response, str(self.task.executor))
+
+
+class TaskSearchTest(TestCase):
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='searcher')
+        self.status = Status.objects.create(name='Новый')
+        self.other_status = Status.objects.create(name='Готово')
+        self.client.force_login(self.user)
+        self.tasks_url = reverse('tasks:tasks')
+
+    def create_task(self, name, description='', status=None):
+        return Task.objects.create(
+            name=name,
+            description=description,
+            author=self.user,
+            status=status or self.status,
+        )
+
+    def search(self, query, **params):
+        response = self.client.get(self.tasks_url, {'q': query, **params})
+        self.assertEqual(response.status_code, 200)
+        return [task.id for task in response.context['tasks']]
+
+    def test_matches_name_and_description_words(self):
+        by_name = self.create_task('Починить сервер')
+        by_description = self.create_task('Другое', 'Перезапустить сервер')
+        self.create_task('Не относится', 'Совсем про другое')
+        self.assertCountEqual(
+            self.search('сервер'), [by_name.id, by_description.id]
+        )
+        self.assertEqual(self.search('починить СЕРВЕР'), [by_name.id])
+        self.assertEqual(self.search('перезап'), [by_description.id])
+
+    def test_results_are_ranked(self):
+        weak = self.create_task('Отчёт', 'Подготовить отчёт по базам')
+        strong = self.create_task('База база', 'База данных и база знаний')
+        self.assertEqual(self.search('база'), [strong.id, weak.id])
+
+    def test_combines_with_filters(self):
+        self.create_task('Сервер', status=self.status)
+        done = self.create_task('Сервер', status=self.other_status)
+        self.assertEqual(
+            self.search('сервер', status=self.other_status.id), [done.id]
+        )
+
+    def test_index_follows_task_writes(self):
+        task = self.create_task('Старое имя')
+        task.name = 'Новое имя'
+        task.save()
+        self.assertEqual(self.search('новое'), [task.id])
+        self.assertEqual(self.search('старое'), [])
+        task.delete()
+        self.assertEqual(self.search('новое'), [])
+
+    def test_search_syntax_is_escaped(self):
+        self.create_task('Задача')
+        self.assertEqual(self.search('"OR NEAR(*'), [])
+        self.assertEqual(self.search('!!!'), [])
+
+    def test_ranked_results_paginate(self):
+        ids = [self.create_task(f'Сервер {i}').id for i in range(7)]
+        seen = []
+        url, data = self.tasks_url, {'q': 'сервер', 'page_size': 3}
+        while url:
+            response = self.client.get(url, data)
+            seen.extend(task.id for task in response.context['tasks'])
+            url, data = response.context['next_page_url'], None
+        self.assertCountEqual(seen, ids)
+
+    def test_ranks_from_a_single_fts_join(self):
+        sql = str(search.search_tasks(Task.objects.all(), 'сервер').query)
+        self.assertEqual(sql.count(f'JOIN "{search.FTS_TABLE}"'), 1)
+        self.assertNotIn('bm25', sql)
+
+    def test_bulk_action_over_search_results(self):
+        matched = self.create_task('Сервер')
+        other = self.create_task('Другое')
+        bulk.apply_action(
+            search.search_tasks(Task.objects.all(), 'сервер'),
+            'status', self.other_status, self.user,
+        )
+        matched.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual(matched.status, self.other_status)
+        self.assertEqual(other.status, self.status)
+
+
+class TaskExportTest(TestCase):
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            username='exporter', first_name='Export', last_name='User'
+        )
+        self.other = CustomUser.objects.create_user(username='other')
+        self.status = Status.objects.create(name='Новый')
+        self.labels = [
+            Label.objects.create(name='Баг'),
+            Label.objects.create(name='Срочно'),
+        ]
+        self.client.force_login(self.user)
+        self.export_url = reverse('tasks:export_tasks')
+        tasks = Task.objects.bulk_create(
+            Task(
+                name=f'Task {i}',
+                description='Описание',
+                author=self.user if i % 2 else self.other,
+                executor=self.user if i % 3 == 0 else None,
+                status=self.status,
+            )
+            for i in range(25)
+        )
+        Task.labels.through.objects.bulk_create(
+            Task.labels.through(task_id=task.id, label_id=label.id)
+            for task in tasks
+            for label in self.labels
+        )
+
+    def read(self, response):
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv_export(self):
+        response = self.client.get(self.export_url, {'format': 'csv'})
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        rows = list(csv.DictReader(StringIO(self.read(response))))
+        self.assertEqual(len(rows), 25)
+        self.assertEqual(rows[0]['labels'], 'Баг, Срочно')
+        self.assertEqual(rows[0]['executor'], 'Export User')
+
+    def test_jsonl_export_uses_task_filters(self):
+        response = self.client.get(
+            self.export_url, {'format': 'jsonl', 'self_tasks': 'on'}
+        )
+        rows = [json.loads(line) for line in self.read(response).splitlines()]
+        self.assertEqual(len(rows), 12)
+        self.assertEqual({row['author'] for row in rows}, {'Export User'})
+        self.assertEqual(rows[0]['labels'], ['Баг', 'Срочно'])
+
+    def test_queries_per_chunk_not_per_row(self):
+        with mock.patch(
+            'task_manager.tasks.views.ExportTasksView.chunk_size', 10
+        ):
+            response = self.client.get(self.export_url, {'format': 'jsonl'})
+            # one streamed tasks query + one labels query per chunk of 10
+            with self.assertNumQueries(4):
+                self.read(response)
+
+    def test_unknown_format(self):
+        response = self.client.get(self.export_url, {'format': 'xml'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_invalid_filters_are_rejected_before_streaming(self):
+        invalid = [
+            {'status': 'abc'},
+            {'executor': '1.5'},
+            {'label': str(2 ** 63)},
+            {'status': '-1'},
+        ]
+        for params in invalid:
+            with self.subTest(params=params):
+                response = self.client.get(self.export_url, params)
+                self.assertEqual(response.status_code, 400)
+                self.assertFalse(response.streaming)
+                response = self.client.get(reverse('tasks:tasks'), params)
+                self.assertEqual(response.status_code, 400)
+
+    def test_bulk_select_all_rejects_invalid_filters(self):
+        response = self.client.post(reverse('tasks:bulk_tasks'), {
+            'action': 'status',
+            'status': self.status.pk,
+            'select_all': 'on',
+            'filters': 'status=abc',
+        })
+        self.assertEqual(response.status_code, 400)
+
+
+class TaskEventsTest(TestCase):
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            username='live', first_name='Анна', last_name='Иванова'
+        )
+        self.new = Status.objects.create(name='Новый')
+        self.done = Status.objects.create(name='Готово')
+        self.bug = Label.objects.create(name='Баг')
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+        self.addCleanup(events.broker.subscribers.clear)
+
+    def subscribe(self, queue_size=10, **filters):
+        subscriber = events.Subscriber(
+            filters, self.user.pk, self.loop, queue_size
+        )
+        events.broker.subscribe(subscriber)
+        return subscriber
+
+    def create_task(self, **fields):
+        with self.captureOnCommitCallbacks(execute=True):
+            task = Task.objects.create(
+                name='Починить вход', description='Ошибка авторизации',
+                status=self.new, author=self.user, **fields,
+            )
+            task.labels.add(self.bug)
+        return task
+
+    def test_one_event_per_transaction_for_matching_viewers(self):
+        everyone = self.subscribe()
+        by_label = self.subscribe(label=str(self.bug.pk))
+        other_status = self.subscribe(status=str(self.done.pk))
+        task = self.create_task(executor=self.user)
+        expected = [('task', {
+            'action': 'created', 'id': task.pk, 'visible': True,
+            'name': 'Починить вход', 'status': 'Новый',
+            'executor': 'Анна Иванова',
+        })]
+        self.assertEqual(everyone.drain(), expected)
+        self.assertEqual(by_label.drain(), expected)
+        self.assertEqual(other_status.drain(), [])
+
+    def test_task_leaving_the_filter_is_sent_as_invisible(self):
+        task = self.create_task()
+        viewer = self.subscribe(status=str(self.new.pk))
+        with self.captureOnCommitCallbacks(execute=True):
+            task.status = self.done
+            task.save()
+        self.assertEqual(viewer.drain(), [('task', {
+            'action': 'updated', 'id': task.pk, 'visible': False,
+        })])
+        task_id = task.pk
+        with self.captureOnCommitCallbacks(execute=True):
+            task.delete()
+        self.assertEqual(viewer.drain(), [('task', {
+            'action': 'deleted', 'id': task_id, 'visible': False,
+        })])
+
+    def test_rolled_back_changes_are_not_published(self):
+        task = self.create_task()
+        viewer = self.subscribe()
+
+        @transaction.atomic
+        def rename(name, fail=False):
+            task.name = name
+            task.save()
+            if fail:
+                raise ValueError
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(ValueError):
+                rename('Отмена', fail=True)
+            rename('Починить выход')
+        self.assertEqual(viewer.drain(), [('task', {
+            'action': 'updated', 'id': task.pk, 'visible': True,
+            'name': 'Починить выход', 'status': 'Новый', 'executor': None,
+        })])
+
+    def test_search_and_own_task_filters(self):
+        found = self.subscribe(q='авторизац', self_tasks='on')
+        missed = self.subscribe(q='отчет')
+        self.create_task()
+        self.assertEqual(len(found.drain()), 1)
+        self.assertEqual(missed.drain(), [])
+
+    def test_renames_and_bulk_changes(self):
+        viewer = self.subscribe()
+        task = self.create_task()
+        viewer.drain()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.new.name = 'Открыт'
+            self.new.save()
+            bulk.apply_action(
+                Task.objects.filter(pk=task.pk), 'status', self.done,
+                self.user,
+            )
+        self.assertEqual(viewer.drain(), [
+            ('status', {'id': self.new.pk, 'name': 'Открыт'}),
+            ('reset', {}),
+        ])
+
+    def test_slow_reader_gets_a_reset_instead_of_a_backlog(self):
+        viewer = self.subscribe(queue_size=2)
+        for _ in range(5):
+            events.broker.publish('label', {'id': 1, 'name': 'Баг'})
+        self.assertEqual(viewer.drain(), [('reset', {})])
+        events.broker.publish('label', {'id': 1, 'name': 'Баг'})
+        self.assertEqual(len(viewer.drain()), 1)
+
+    def test_no_listeners_no_queries(self):
+        task = self.create_task()
+        with self.assertNumQueries(0):
+            events.task_changed(task.pk, 'updated')
+
+    async def test_stream_sends_heartbeats_and_events(self):
+        with override_settings(TASK_EVENTS_HEARTBEAT=0.01):
+            stream = events.stream(QueryDict(''), self.user.pk)
+            self.assertEqual(await anext(stream), 'retry: 5000\n\n')
+            self.assertEqual(len(events.broker), 1)
+            self.assertEqual(await anext(stream), ': ping\n\n')
+            events.broker.publish('label', {'id': 1, 'name': 'Баг'})
+            self.assertEqual(
+                await anext(stream),
+                'event: label\ndata: {"id": 1, "name": "Баг"}\n\n',
+            )
+            await stream.aclose()
+        self.assertEqual(len(events.broker), 0)
+
+    def test_endpoint_needs_the_async_deploy(self):
+        self.client.force_login(self.user)
+        url = reverse('tasks:task_events')
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertNotContains(
+            self.client.get(reverse('tasks:tasks')), 'data-events-url'
+        )
+        with override_settings(ASYNC_VIEWS=True):
+            self.assertContains(
+                self.client.get(
+                    reverse('tasks:tasks'), {'status': self.new.pk}
+                ),
+                f'data-events-url="{url}?status={self.new.pk}"',
+            )
+            with override_settings(TASK_EVENTS_MAX_CONNECTIONS=0):
+                self.assertEqual(self.client.get(url).status_code, 503)
+
+    async def test_endpoint_streams_events(self):
+        await self.async_client.aforce_login(self.user)
+        with override_settings(ASYNC_VIEWS=True):
+            response = await self.async_client.get(
+                reverse('tasks:task_events')
+            )
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        content = response.streaming_content
+        self.assertEqual(await anext(content), b'retry: 5000\n\n')
+        events.broker.publish('reset')
+        self.assertEqual(await anext(content), b'event: reset\ndata: {}\n\n')
@@ -1,16 +1,31 @@
 from django.urls import path
 
+from task_manager.mixins import pick_view
 from task_manager.tasks import views as task_views
 
+task_list_view = pick_view(task_views.TaskView, task_views.AsyncTaskView)
+show_task_view = pick_view(
+    task_views.ShowTaskView, task_views.AsyncShowTaskView
+)
+
 app_name = 'tasks'
 
 urlpatterns = [
     path('',
-         task_views.TaskView.as_view(),
+         task_list_view,
          name='tasks'),
     path('<int:pk>/', 
-        task_views.ShowTaskView.as_view(), 
+        show_task_view, 
         name='show_task'),
+    path('events/',
+         task_views.TaskEventsView.as_view(),
+         name='task_events'),
+    path('bulk/',
+         task_views.BulkTaskView.as_view(),
+         name='bulk_tasks'),
+    path('export/',
+         task_views.ExportTasksView.as_view(),
+         name='export_tasks'),
     path('create/',
          task_views.CreateTaskView.as_view(),
          name='create_task'),
@@ -1,44 +1,228 @@
+from urllib.parse import urlencode
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib import messages
-from django.shortcuts import get_object_or_404, redirect, render
-from django.urls import reverse_lazy
+from django.core.exceptions import BadRequest
+from django.http import (
+    Http404,
+    HttpResponse,
+    QueryDict,
+    StreamingHttpResponse,
+)
+from django.shortcuts import (
+    aget_object_or_404,
+    get_object_or_404,
+    redirect,
+    render,
+)
+from django.template.response import TemplateResponse
+from django.urls import reverse, reverse_lazy
+from django.utils import timezone
 from django.views.generic import DeleteView, ListView, UpdateView, View
 
-from task_manager.mixins import LoginRequiredMixin
+from task_manager.mixins import (
+    ConditionalGetMixin,
+    LoginRequiredMixin,
+    ObjectOnceMixin,
+    ObjectPermissionMixin,
+    ReplicaReadMixin,
+)
+from task_manager.versions import LABELS, STATUSES, TASKS, USERS
 
-from .forms import TaskFilterForm, TaskForm
+from . import bulk, events
+from .export import EXPORT_CHUNK_SIZE, EXPORT_FORMATS
+from .filters import (
+    TASK_LIST_TABLES,
+    InvalidFilter,
+    filter_tasks,
+    first_task_page,
+    get_task_filters,
+    get_task_ordering,
+    task_list_queryset,
+)
+from .forms import TaskBulkForm, TaskFilterForm, TaskForm
 from .models import Task
+from .pagination import KeysetPaginationMixin
 
 
-class TaskView(LoginRequiredMixin, ListView):
+class TaskView(LoginRequiredMixin, ReplicaReadMixin, ConditionalGetMixin,
+               KeysetPaginationMixin, ListView):
     model = Task
     template_name = 'tasks/index.html'
     context_object_name = 'tasks'
+    fragment_template_name = 'tasks/results.html'
+    version_tables = TASK_LIST_TABLES
+    # The bulk action form.
+    etag_csrf = True
+    keyset_page = None
+    fragment_param = 'fragment'
 
-    def get_queryset(self):
-        queryset = super().get_queryset()
-        status = self.request.GET.get('status')
-        executor = self.request.GET.get('executor')
-        label = self.request.GET.get('label')
-        self_tasks = self.request.GET.get('self_tasks')
+    def is_fragment(self):
+        # The filter form script asks for the table and pagination only.
+        return self.request.GET.get(self.fragment_param) == 'rows'
+
+    def get_template_names(self):
+        if self.is_fragment():
+            return [self.fragment_template_name]
+        return super().get_template_names()
+
+    def get_page_link_params(self):
+        params = super().get_page_link_params()
+        params.pop(self.fragment_param, None)
+        return params
 
-        if status:
-            queryset = queryset.filter(status=status)
-        if executor:
-            queryset = queryset.filter(executor=executor)
-        if label:
-            queryset = queryset.filter(labels=label)
+    def get_keyset_filters(self):
+        return get_task_filters(self.request.GET)
 
-        if self_tasks:
-            queryset = queryset.filter(author=self.request.user)
+    def get_keyset_ordering(self):
+        return get_task_ordering(self.request.GET)
 
-        return queryset
+    def get_queryset(self):
+        try:
+            return filter_tasks(
+                task_list_queryset(), self.request.GET, self.request.user
+            )
+        except InvalidFilter as invalid:
+            raise BadRequest(f'Некорректный фильтр: {invalid}')
+
+    def is_first_page(self):
+        return not (
+            self.request.GET.get(self.cursor_param)
+            or self.get_keyset_filters()
+        )
+
+    def paginate_keyset(self, queryset):
+        if not self.is_first_page():
+            return super().paginate_keyset(queryset)
+        return first_task_page(self.get_page_size(), self.table_versions)
 
     def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        context['filter_form'] = TaskFilterForm(self.request.GET)
+        page = self.keyset_page
+        if page is None:
+            page = self.paginate_keyset(self.object_list)
+        context = super().get_context_data(object_list=page.object_list,
+                                           **kwargs)
+        context['keyset_page'] = page
+        context['first_page_url'] = self.get_first_page_url()
+        context['next_page_url'] = self.get_next_page_url(page)
+        context['export_query'] = urlencode(
+            get_task_filters(self.request.GET)
+        )
+        if not self.is_fragment():
+            context['filter_form'] = TaskFilterForm(self.request.GET)
+            context['bulk_form'] = TaskBulkForm(
+                initial={'filters': context['export_query']}
+            )
+        if settings.ASYNC_VIEWS:
+            events_url = reverse('tasks:task_events')
+            context['events_url'] = (
+                f'{events_url}?{context["export_query"]}'
+                if context['export_query'] else events_url
+            )
         return context
 
 
+class AsyncTaskView(TaskView):
+
+    async def apaginate_keyset(self, queryset):
+        if not self.is_first_page():
+            return await super().apaginate_keyset(queryset)
+        # Cache lookups are synchronous.
+        return await sync_to_async(first_task_page)(
+            self.get_page_size(), self.table_versions
+        )
+
+    async def get(self, request, *args, **kwargs):
+        self.object_list = self.get_queryset()
+        self.keyset_page = await self.apaginate_keyset(self.object_list)
+        return self.render_to_response(self.get_context_data())
+
+
+class TaskEventsView(LoginRequiredMixin, View):
+    # Server-Sent Events for the task list. Each open stream is a request
+    # that never finishes, so it is served only by the ASGI deploy.
+
+    async def get(self, request, *args, **kwargs):
+        if not settings.ASYNC_VIEWS:
+            raise Http404('Обновления в реальном времени отключены')
+        if len(events.broker) >= settings.TASK_EVENTS_MAX_CONNECTIONS:
+            return HttpResponse(status=503, headers={'Retry-After': '30'})
+        response = StreamingHttpResponse(
+            events.stream(request.GET, request.user.pk),
+            content_type='text/event-stream',
+        )
+        response['Cache-Control'] = 'no-cache'
+        # Stops nginx from buffering the stream.
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+
+class BulkTaskView(LoginRequiredMixin, View):
+    def post(self, request, *args, **kwargs):
+        form = TaskBulkForm(request.POST)
+        # The selection is either the ticked rows or everything the task
+        # list filter matched, passed along as its query string.
+        filters = QueryDict(request.POST.get('filters', ''))
+        query = urlencode(get_task_filters(filters))
+        tasks_url = reverse('tasks:tasks')
+        success_url = f'{tasks_url}?{query}' if query else tasks_url
+        if not form.is_valid():
+            for errors in form.errors.values():
+                for error in errors:
+                    messages.error(request, error)
+            return redirect(success_url)
+
+        if form.cleaned_data['select_all']:
+            try:
+                queryset = filter_tasks(
+                    Task.objects.all(), filters, request.user
+                )
+            except InvalidFilter as invalid:
+                raise BadRequest(f'Некорректный фильтр: {invalid}')
+        else:
+            queryset = Task.objects.filter(pk__in=form.cleaned_data['tasks'])
+        action = form.cleaned_data['action']
+        count, skipped = bulk.apply_action(
+            queryset, action, form.get_value(), request.user
+        )
+        if action == 'delete':
+            messages.success(request, f'Удалено задач: {count}')
+        else:
+            messages.success(request, f'Изменено задач: {count}')
+        if skipped:
+            messages.error(
+                request,
+                f'Не удалено задач: {skipped}. '
+                f'Задачу может удалить только ее автор'
+            )
+        return redirect(success_url)
+
+
+class ExportTasksView(LoginRequiredMixin, View):
+    chunk_size = EXPORT_CHUNK_SIZE
+
+    def get(self, request, *args, **kwargs):
+        export_format = request.GET.get('format', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            raise Http404('Неизвестный формат экспорта')
+        stream, content_type = EXPORT_FORMATS[export_format]
+
+        # Validated before the response starts streaming.
+        try:
+            queryset = filter_tasks(
+                Task.objects.all(), request.GET, request.user
+            ).order_by(*get_task_ordering(request.GET))
+        except InvalidFilter as invalid:
+            raise BadRequest(f'Некорректный фильтр: {invalid}')
+        filename = f'tasks-{timezone.now():%Y%m%d-%H%M%S}.{export_format}'
+        response = StreamingHttpResponse(
+            stream(queryset, self.chunk_size), content_type=content_type
+        )
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
 class CreateTaskView(LoginRequiredMixin, View):
     def get(self, request, *args, **kwargs):
         form = TaskForm(user=request.user)
@@ -53,17 +237,37 @@ class CreateTaskView(LoginRequiredMixin, View):
         return render(request, 'tasks/create.html', {'form': form})
 
 
-class ShowTaskView(LoginRequiredMixin, View):
+class ShowTaskView(LoginRequiredMixin, ReplicaReadMixin, ConditionalGetMixin,
+                   View):
+    version_tables = (TASKS, STATUSES, USERS, LABELS)
+
+    def get_queryset(self):
+        return Task.objects.select_related(
+            'status', 'author', 'executor'
+        ).prefetch_related('labels')
+
     def get_object(self):
         task_id = self.kwargs.get('pk')
-        return get_object_or_404(Task, pk=task_id)
+        return get_object_or_404(self.get_queryset(), pk=task_id)
 
     def get(self, request, *args, **kwargs):
         task_to_show = self.get_object()
         return render(request, 'tasks/show_task.html', {'task': task_to_show})
 
 
-class EditTaskView(LoginRequiredMixin, UpdateView):
+class AsyncShowTaskView(ShowTaskView):
+
+    async def get(self, request, *args, **kwargs):
+        task_to_show = await aget_object_or_404(
+            self.get_queryset(), pk=self.kwargs.get('pk')
+        )
+        # Rendered by the handler, off the event loop.
+        return TemplateResponse(
+            request, 'tasks/show_task.html', {'task': task_to_show}
+        )
+
+
+class EditTaskView(LoginRequiredMixin, ObjectOnceMixin, UpdateView):
     model = Task
     form_class = TaskForm
     template_name = 'tasks/edit.html'
@@ -79,22 +283,16 @@ class EditTaskView(LoginRequiredMixin, UpdateView):
         return super().form_valid(form)
 
 
-class DeleteTaskView(LoginRequiredMixin, DeleteView):
+class DeleteTaskView(LoginRequiredMixin, ObjectPermissionMixin, DeleteView):
     model = Task
     template_name = 'tasks/task_confirm_delete.html'
     success_url = reverse_lazy('tasks:tasks')
+    permission_denied_message = 'Задачу может удалить только ее автор'
 
-    def get(self, request, *args, **kwargs):
-        if request.user.id != self.get_object().author.id:
-            messages.error(request, 'Задачу может удалить только ее автор')
-            return redirect(self.success_url)
-        return super().get(request, *args, **kwargs)
+    def has_object_permission(self, task):
+        return task.author_id == self.request.user.id
 
     def form_valid(self, form):
-        if self.request.user.id != self.get_object().author.id:
-            messages.error(self.request, 'Задачу может удалить только ее автор')
-            return redirect(self.success_url)
-        
         response = super().form_valid(form)
         messages.success(self.request, 'Задача успешно удалена')
-        return response
\ No newline at end of file
+        return response
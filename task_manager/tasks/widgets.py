@@ -0,0 +1,44 @@
+from django import forms
+from django.urls import reverse_lazy
+
+from .choices import get_selected_labels
+
+
+class AutocompleteMixin:
+    # Renders only the selected options; the rest are fetched from the
+    # autocomplete endpoint by static/js/autocomplete.js.
+    empty_label = '---------'
+
+    def __init__(self, url_name, choice_list, attrs=None):
+        self.url_name = url_name
+        self.choice_list = choice_list
+        super().__init__(attrs)
+
+    def get_context(self, name, value, attrs):
+        attrs = {
+            **(attrs or {}),
+            'data-autocomplete-url': reverse_lazy(self.url_name),
+        }
+        return super().get_context(name, value, attrs)
+
+    def optgroups(self, name, value, attrs=None):
+        pks = []
+        for item in value:
+            try:
+                pks.append(int(item))
+            except (TypeError, ValueError):
+                continue
+        labels = get_selected_labels(self.choice_list, pks)
+        selected = [(pk, labels[pk]) for pk in pks if pk in labels]
+        if not self.allow_multiple_selected:
+            selected.insert(0, ('', self.empty_label))
+        self.choices = selected
+        return super().optgroups(name, value, attrs)
+
+
+class AutocompleteSelect(AutocompleteMixin, forms.Select):
+    pass
+
+
+class AutocompleteSelectMultiple(AutocompleteMixin, forms.SelectMultiple):
+    pass
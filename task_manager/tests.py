@@ -0,0 +1,1051 @@
+import importlib
+import json
+import os
+import runpy
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+from dataclasses import replace
+from io import StringIO
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.redis import RedisCache
+from django.core.management import CommandError, call_command
+from django.db import connection, connections
+from django.test import AsyncClient, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import clear_url_caches, resolve, reverse
+
+from task_manager import (
+    benchmarks,
+    budgets,
+    sessions,
+    snapshots,
+    timing,
+    versions,
+)
+from task_manager.db import routers
+from task_manager.db.pool import ConnectionPool, PoolTimeout
+from task_manager.labels.models import Label
+from task_manager.snapshots import snapshot_path
+from task_manager.statuses.models import Status
+from task_manager.tasks import choices
+from task_manager.tasks.filters import first_task_page
+from task_manager.tasks.models import Task
+from task_manager.users.models import CustomUser
+
+
+class ConditionalGetTest(TestCase):
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            username='etag', first_name='Etag', last_name='User'
+        )
+        self.status = Status.objects.create(name='Новый')
+        self.label = Label.objects.create(name='Баг')
+        self.task = Task.objects.create(
+            name='Задача', description='', author=self.user,
+            status=self.status,
+        )
+        self.client.force_login(self.user)
+        self.urls = [
+            reverse('tasks:tasks'),
+            reverse('tasks:show_task', kwargs={'pk': self.task.pk}),
+            reverse('statuses:statuses'),
+            reverse('labels:labels'),
+            reverse('users:users'),
+        ]
+
+    def revalidate(self, url):
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        return first, self.client.get(
+            url, HTTP_IF_NONE_MATCH=first['ETag']
+        )
+
+    def test_unchanged_pages_answer_304_with_a_single_query(self):
+        for url in self.urls:
+            with self.subTest(url=url):
+                first = self.client.get(url)
+                # user + table versions
+                with self.assertNumQueries(2):
+                    response = self.client.get(
+                        url, HTTP_IF_NONE_MATCH=first['ETag']
+                    )
+                self.assertEqual(response.status_code, 304)
+
+    def test_if_modified_since(self):
+        first = self.client.get(self.urls[0])
+        response = self.client.get(
+            self.urls[0], HTTP_IF_MODIFIED_SINCE=first['Last-Modified']
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_writes_change_the_etag(self):
+        first, _ = self.revalidate(self.urls[2])
+        Status.objects.create(name='Готово')
+        response = self.client.get(
+            self.urls[2], HTTP_IF_NONE_MATCH=first['ETag']
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Готово')
+
+    def test_label_m2m_change_invalidates_task_pages(self):
+        detail = self.urls[1]
+        first = self.client.get(detail)
+        before = Task.objects.get(pk=self.task.pk).updated_at
+        self.task.labels.add(self.label)
+        response = self.client.get(detail, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Баг')
+        self.assertGreater(
+            Task.objects.get(pk=self.task.pk).updated_at, before
+        )
+
+        second = response
+        self.label.tasks.clear()
+        response = self.client.get(detail, HTTP_IF_NONE_MATCH=second['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, 'Баг')
+
+    def test_etag_depends_on_user(self):
+        first = self.client.get(self.urls[0])
+        other = CustomUser.objects.create_user(username='other')
+        self.client.force_login(other)
+        response = self.client.get(
+            self.urls[0], HTTP_IF_NONE_MATCH=first['ETag']
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_relogin_changes_the_etag_of_pages_with_forms(self):
+        self.user.set_password('secret')
+        self.user.save()
+        credentials = {'username': 'etag', 'password': 'secret'}
+        self.client.post(reverse('login'), credentials, follow=True)
+        first, second = self.revalidate(self.urls[0])
+        self.assertEqual(second.status_code, 304)
+
+        self.client.post(reverse('logout'), follow=True)
+        self.client.post(reverse('login'), credentials, follow=True)
+        response = self.client.get(
+            self.urls[0], HTTP_IF_NONE_MATCH=first['ETag']
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], first['ETag'])
+
+    def test_pending_messages_are_never_hidden_by_304(self):
+        author = CustomUser.objects.create_user(username='author')
+        task = Task.objects.create(
+            name='Чужая', description='', author=author, status=self.status,
+        )
+        first = self.client.get(self.urls[0])
+        # Refused delete: nothing is written, only a message is queued.
+        self.client.get(
+            reverse('tasks:delete_task', kwargs={'pk': task.pk})
+        )
+        response = self.client.get(
+            self.urls[0], HTTP_IF_NONE_MATCH=first['ETag']
+        )
+        self.assertContains(response, 'Задачу может удалить только ее автор')
+
+
+class ServerTimingTest(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.addCleanup(timing.reset)
+        timing.reset()
+        self.user = CustomUser.objects.create_user(username='timing')
+        self.client.force_login(self.user)
+
+    def enabled(self, **kwargs):
+        return override_settings(
+            SERVER_TIMING_ENABLED=True,
+            SERVER_TIMING_DIR=self.directory.name,
+            SERVER_TIMING_SNAPSHOT_INTERVAL=0,
+            **kwargs,
+        )
+
+    def test_disabled_middleware_adds_nothing(self):
+        response = self.client.get(reverse('statuses:statuses'))
+        self.assertNotIn('Server-Timing', response.headers)
+        self.assertEqual(timing.get_samples(), {})
+
+    def test_header_reports_queries_templates_and_cache(self):
+        with self.enabled():
+            response = self.client.get(reverse('tasks:create_task'))
+        header = response['Server-Timing']
+        for metric in ('total;dur=', 'view;dur=', 'db;dur=', 'tpl;dur='):
+            self.assertIn(metric, header)
+        self.assertRegex(header, r'db;dur=[\d.]+;desc="[1-9]\d* queries"')
+        self.assertRegex(header, r'cache;desc="\d+ hits, \d+ misses"')
+
+    def test_cache_metric_counts_fragments_and_sessions(self):
+        cache.clear()
+        self.client.force_login(self.user)
+        with self.enabled():
+            self.client.get(reverse('statuses:statuses'))
+            response = self.client.get(reverse('statuses:statuses'))
+        # the session, then the header and footer fragments
+        self.assertIn(
+            'cache;desc="3 hits, 0 misses"', response['Server-Timing']
+        )
+
+    def test_samples_are_kept_per_url_name(self):
+        with self.enabled():
+            for _ in range(3):
+                self.client.get(reverse('statuses:statuses'))
+            self.client.get(reverse('labels:labels'))
+        samples = timing.get_samples()
+        self.assertEqual(len(samples['statuses:statuses']), 3)
+        self.assertEqual(len(samples['labels:labels']), 1)
+
+    def test_window_limits_samples(self):
+        with self.enabled(SERVER_TIMING_WINDOW=2):
+            for _ in range(3):
+                self.client.get(reverse('statuses:statuses'))
+            self.assertEqual(
+                len(timing.get_samples()['statuses:statuses']), 2
+            )
+
+    def test_report_command_merges_snapshots(self):
+        with self.enabled():
+            self.client.get(reverse('statuses:statuses'))
+            with open(snapshot_path(self.directory.name, pid=1), 'w') as file:
+                json.dump({'statuses:statuses': [[10, 8, 2, 1]]}, file)
+            out = StringIO()
+            call_command('timing_report', '--json', '--reset', stdout=out)
+            report = json.loads(out.getvalue())
+            self.assertEqual(report['statuses:statuses']['count'], 2)
+            self.assertEqual(timing.read_snapshots(), {})
+
+    def test_summarize_percentiles(self):
+        rows = [(value, 0, 0, 0) for value in range(1, 101)]
+        report = timing.summarize({'view': rows})['view']
+        self.assertEqual(report['total_p50'], 50)
+        self.assertEqual(report['total_p95'], 95)
+        self.assertEqual(report['total_p99'], 99)
+
+
+class BenchmarkCommandsTest(TestCase):
+
+    def test_generate_fake_data(self):
+        before = versions.get_versions(versions.TASKS)[versions.TASKS][0]
+        call_command(
+            'generate_fake_data', users=5, statuses=2, labels=10, tasks=40,
+            batch_size=7, seed=1, stdout=StringIO(),
+        )
+        self.assertEqual(CustomUser.objects.count(), 5)
+        self.assertEqual(Status.objects.count(), 2)
+        self.assertEqual(Label.objects.count(), 10)
+        self.assertEqual(Task.objects.count(), 40)
+        self.assertTrue(Task.labels.through.objects.exists())
+        self.assertGreater(
+            versions.get_versions(versions.TASKS)[versions.TASKS][0], before
+        )
+
+    def test_run_benchmarks_rolls_back_writes(self):
+        call_command(
+            'generate_fake_data', users=3, statuses=2, labels=3, tasks=10,
+            seed=1, stdout=StringIO(),
+        )
+        out = StringIO()
+        with tempfile.TemporaryDirectory() as directory:
+            call_command(
+                'run_benchmarks', 'task_list', 'task_create',
+                requests=2, warmup=0, json=True,
+                baseline=f'{directory}/baseline.json', stdout=out,
+            )
+        results = json.loads(out.getvalue())
+        self.assertEqual(set(results), {'task_list', 'task_create'})
+        self.assertGreater(results['task_list']['queries'], 0)
+        self.assertEqual(Task.objects.count(), 10)
+
+    def test_compare_sessions_counts_queries_per_setup(self):
+        call_command(
+            'generate_fake_data', users=3, statuses=2, labels=3, tasks=10,
+            seed=1, stdout=StringIO(),
+        )
+        out = StringIO()
+        call_command(
+            'run_benchmarks', 'task_list', 'login_redirect',
+            compare_sessions=True, requests=2, warmup=1, json=True,
+            stdout=out,
+        )
+        results = json.loads(out.getvalue())
+        before = results['db+session_messages']
+        after = results['cached_db+cookie_messages']
+        self.assertLess(
+            after['task_list']['queries'], before['task_list']['queries']
+        )
+        self.assertEqual(after['login_redirect']['queries'], 0)
+
+    def test_regression_check_fails_on_extra_queries(self):
+        call_command(
+            'generate_fake_data', users=3, statuses=2, labels=3, tasks=10,
+            seed=1, stdout=StringIO(),
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            baseline = f'{directory}/baseline.json'
+            with open(baseline, 'w') as file:
+                json.dump({'task_list': {
+                    'p50_ms': 1000, 'p95_ms': 1000, 'queries': 1,
+                    'peak_kib': 1,
+                }}, file)
+            with self.assertRaisesMessage(CommandError, 'task_list queries'):
+                call_command(
+                    'run_benchmarks', 'task_list', requests=1, warmup=0,
+                    baseline=baseline, max_regression=10, stdout=StringIO(),
+                )
+
+    def test_throughput_through_both_entry_points(self):
+        call_command(
+            'generate_fake_data', users=3, statuses=2, labels=3, tasks=10,
+            seed=1, stdout=StringIO(),
+        )
+        # Other threads can't see the test transaction, so WSGI runs with
+        # a single worker here.
+        for entry_point, concurrency in (('wsgi', 1), ('asgi', 3)):
+            with self.subTest(entry_point=entry_point):
+                out = StringIO()
+                call_command(
+                    'run_benchmarks', 'task_list', 'task_detail',
+                    'task_create', throughput=entry_point, requests=6,
+                    concurrency=concurrency, warmup=1, json=True,
+                    stdout=out,
+                )
+                results = json.loads(out.getvalue())
+                self.assertEqual(set(results), {'task_list', 'task_detail'})
+                self.assertEqual(results['task_list']['requests'], 6)
+                self.assertGreater(results['task_list']['rps'], 0)
+        self.assertEqual(Task.objects.count(), 10)
+
+    @override_settings(ALLOWED_HOSTS=['localhost'])
+    def test_throughput_requests_use_the_given_host(self):
+        # Outside the test runner 'testserver' isn't an allowed host.
+        call_command(
+            'generate_fake_data', users=3, statuses=2, labels=3, tasks=10,
+            seed=1, stdout=StringIO(),
+        )
+        for entry_point in ('wsgi', 'asgi'):
+            with self.subTest(entry_point=entry_point):
+                results = benchmarks.throughput(
+                    entry_point, ['task_list'], requests=2, concurrency=1,
+                    warmup=0, host='localhost',
+                )
+                self.assertEqual(results['task_list']['requests'], 2)
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def sqlite_ping(connection):
+    connection.execute('SELECT 1')
+    return True
+
+
+class ConnectionPoolTest(TestCase):
+    # SQLite in-memory connections stand in for PostgreSQL ones.
+
+    def make_pool(self, **kwargs):
+        kwargs.setdefault('ping', sqlite_ping)
+        return ConnectionPool(
+            lambda: sqlite3.connect(':memory:', check_same_thread=False),
+            **kwargs,
+        )
+
+    def test_released_connections_are_reused(self):
+        pool = self.make_pool(size=2)
+        connection = pool.acquire()
+        pool.release(connection)
+        self.assertIs(pool.acquire(), connection)
+        self.assertEqual(pool.stats()['connects'], 1)
+        self.assertEqual(pool.stats()['reuses'], 1)
+        self.assertEqual(pool.stats()['in_use'], 1)
+
+    def test_pool_is_bounded(self):
+        pool = self.make_pool(size=1, timeout=0.01)
+        pool.acquire()
+        with self.assertRaises(PoolTimeout):
+            pool.acquire()
+        self.assertEqual(pool.stats()['timeouts'], 1)
+
+    def test_waiter_gets_released_connection(self):
+        pool = self.make_pool(size=1, timeout=5)
+        connection = pool.acquire()
+        borrowed = []
+        waiter = threading.Thread(target=lambda: borrowed.append(
+            pool.acquire()
+        ))
+        waiter.start()
+        while not pool.stats()['waits']:
+            threading.Event().wait(0.001)
+        pool.release(connection)
+        waiter.join()
+        self.assertEqual(borrowed, [connection])
+
+    def test_connections_expire_after_max_lifetime(self):
+        clock = FakeClock()
+        pool = self.make_pool(max_lifetime=60, clock=clock)
+        connection = pool.acquire()
+        pool.release(connection)
+        clock.now = 61
+        self.assertIsNot(pool.acquire(), connection)
+        self.assertEqual(pool.stats()['expired'], 1)
+
+    def test_pre_ping_replaces_dead_connections(self):
+        pool = self.make_pool()
+        connection = pool.acquire()
+        pool.release(connection)
+        connection.close()
+        fresh = pool.acquire()
+        self.assertIsNot(fresh, connection)
+        sqlite_ping(fresh)
+        self.assertEqual(pool.stats()['failed_pings'], 1)
+        self.assertEqual(pool.stats()['in_use'], 1)
+
+    def test_connections_that_fail_reset_are_discarded(self):
+        pool = self.make_pool(reset=lambda connection: False)
+        connection = pool.acquire()
+        pool.release(connection)
+        self.assertEqual(pool.stats()['idle'], 0)
+        self.assertEqual(pool.stats()['discarded'], 1)
+        self.assertIsNot(pool.acquire(), connection)
+
+    def test_failed_connect_frees_the_slot(self):
+        attempts = []
+
+        def connect():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise sqlite3.OperationalError('refused')
+            return sqlite3.connect(':memory:')
+
+        pool = ConnectionPool(connect, size=1, timeout=0.01)
+        with self.assertRaises(sqlite3.OperationalError):
+            pool.acquire()
+        self.assertIsNotNone(pool.acquire())
+
+    def test_stats_command_reads_worker_snapshots(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with override_settings(DB_POOL_STATS_DIR=directory):
+                stats = {'default': self.make_pool(size=3).stats()}
+                snapshots.write_snapshot(directory, stats)
+                out = StringIO()
+                call_command('db_pool_stats', '--json', stdout=out)
+        report = json.loads(out.getvalue())
+        self.assertEqual(list(report.values())[0]['default']['size'], 3)
+
+    def test_snapshots_of_exited_workers_are_dropped(self):
+        exited = subprocess.Popen([sys.executable, '-c', ''])
+        exited.wait()
+        with tempfile.TemporaryDirectory() as directory:
+            path = snapshot_path(directory, pid=exited.pid)
+            with open(path, 'w') as file:
+                json.dump({'default': {'size': 3}}, file)
+            snapshots.write_snapshot(directory, {'default': {'size': 5}})
+            self.assertEqual(
+                snapshots.read_snapshots(directory),
+                {str(os.getpid()): {'default': {'size': 5}}},
+            )
+            self.assertFalse(os.path.exists(path))
+
+
+class ReplicaRoutingTest(TestCase):
+    # Each replica is a separate SQLite file copied from the migrated test
+    # database, holding its own status so the page shows where it was read
+    # from. The connections are registered only for this thread, so the
+    # test runner doesn't try to create or guard them.
+    replicas = ('replica_a', 'replica_b')
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        primary = connections['default']
+        primary.ensure_connection()
+        for alias in cls.replicas:
+            replica = sqlite3.connect(cls.replica_path(alias))
+            primary.connection.backup(replica)
+            replica.close()
+        super().setUpClass()
+        for alias in (*cls.replicas, 'replica_down'):
+            connections[alias] = type(primary)(
+                {**primary.settings_dict, 'NAME': cls.replica_path(alias)},
+                alias,
+            )
+        for alias in cls.replicas:
+            Status.objects.using(alias).create(name=f'Копия {alias}')
+
+    @classmethod
+    def tearDownClass(cls):
+        for alias in (*cls.replicas, 'replica_down'):
+            connections[alias].close()
+            del connections[alias]
+        cls.directory.cleanup()
+        super().tearDownClass()
+
+    @classmethod
+    def replica_path(cls, alias):
+        if alias == 'replica_down':
+            return os.path.join(cls.directory.name, 'missing', 'db.sqlite3')
+        return os.path.join(cls.directory.name, f'{alias}.sqlite3')
+
+    def setUp(self):
+        routers.reset()
+        self.addCleanup(routers.reset)
+        self.user = CustomUser.objects.create_user(username='reader')
+        Status.objects.create(name='Основной')
+        self.client.force_login(self.user)
+
+    def get_statuses(self):
+        return self.client.get(reverse('statuses:statuses'))
+
+    def test_reads_round_robin_over_replicas(self):
+        with override_settings(DATABASE_REPLICAS=list(self.replicas)):
+            pages = [self.get_statuses().content.decode() for _ in range(2)]
+        for alias in self.replicas:
+            self.assertTrue(any(f'Копия {alias}' in page for page in pages))
+        self.assertFalse(any('Основной' in page for page in pages))
+
+    def test_without_replicas_reads_stay_on_primary(self):
+        self.assertContains(self.get_statuses(), 'Основной')
+
+    def test_write_pins_reads_to_primary(self):
+        with override_settings(DATABASE_REPLICAS=list(self.replicas)):
+            response = self.client.post(
+                reverse('statuses:create_status'), {'name': 'Свежий'}
+            )
+            self.assertIn('primary_pin', response.cookies)
+            page = self.get_statuses()
+        self.assertContains(page, 'Свежий')
+        self.assertContains(page, 'Основной')
+
+    def test_unavailable_replica_fails_over(self):
+        with override_settings(
+            DATABASE_REPLICAS=['replica_down', 'replica_b'],
+        ):
+            for _ in range(2):
+                self.assertContains(self.get_statuses(), 'Копия replica_b')
+
+    def test_all_replicas_down_falls_back_to_primary(self):
+        with override_settings(DATABASE_REPLICAS=['replica_down']):
+            self.assertContains(self.get_statuses(), 'Основной')
+            self.assertFalse(routers.is_available('replica_down'))
+
+    def test_async_views_read_from_replicas(self):
+        self.async_client.force_login(self.user)
+        with override_settings(
+            ASYNC_VIEWS=True, DATABASE_REPLICAS=list(self.replicas)
+        ):
+            reload_urlconfs()
+            self.addCleanup(reload_urlconfs)
+            response = async_to_sync(self.async_client.get)(
+                reverse('statuses:statuses')
+            )
+        self.assertContains(response, 'Копия replica_')
+        self.assertNotContains(response, 'Основной')
+
+    def test_writes_always_go_to_primary(self):
+        router = routers.ReplicaRouter()
+        with routers.read_from('replica_a'):
+            self.assertEqual(router.db_for_read(Status), 'replica_a')
+            self.assertEqual(router.db_for_write(Status), 'default')
+        self.assertIsNone(router.db_for_read(Status))
+        with override_settings(DATABASE_REPLICAS=['replica_a']):
+            self.assertFalse(router.allow_migrate('replica_a', 'tasks'))
+
+
+class SessionStorageTest(TestCase):
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            username='session', password='secret'
+        )
+
+    def login(self):
+        return self.client.post(
+            reverse('login'), {'username': 'session', 'password': 'secret'}
+        )
+
+    def test_flash_messages_use_a_cookie(self):
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('tasks:tasks'))
+        self.assertRedirects(
+            response, reverse('users:login'), fetch_redirect_response=False
+        )
+        self.assertIn('messages', response.cookies)
+
+    def test_cached_sessions_are_not_read_from_the_database(self):
+        self.login()
+        # the first page shows the login message
+        self.client.get(reverse('tasks:tasks'))
+        # user + table versions; the first page itself is cached
+        with self.assertNumQueries(2):
+            self.client.get(reverse('tasks:tasks'))
+
+    @override_settings(SESSION_CACHE_MAX_AGE=60)
+    def test_cached_sessions_are_capped_in_the_cache(self):
+        store = sessions.SessionStore()
+        store['key'] = 'value'
+        with mock.patch.object(store._cache.cache, 'set') as cache_set:
+            store.save()
+        self.assertGreater(store.get_expiry_age(), 60)
+        self.assertEqual(cache_set.call_args.args[2], 60)
+
+    @override_settings(SESSION_CACHE_MAX_AGE=None)
+    def test_shared_cache_keeps_the_session_age(self):
+        store = sessions.SessionStore()
+        self.assertNotIsInstance(store._cache, sessions.CappedCache)
+
+    def load_settings(self, **env):
+        # The settings module as a production process would import it.
+        environ = {
+            name: value for name, value in os.environ.items()
+            if name not in ('CACHE_BACKEND', 'SESSION_BACKEND')
+        }
+        environ.update(
+            DJANGO_ENV='production', DATABASE_URL='sqlite://', **env
+        )
+        with mock.patch.dict(os.environ, environ, clear=True):
+            return runpy.run_module('task_manager.settings')
+
+    def test_per_process_cache_falls_back_to_db_sessions(self):
+        self.assertEqual(
+            self.load_settings(CACHE_BACKEND='locmem')['SESSION_ENGINE'],
+            'django.contrib.sessions.backends.db',
+        )
+        with self.assertRaisesMessage(ValueError, 'shared CACHE_BACKEND'):
+            self.load_settings(
+                CACHE_BACKEND='locmem', SESSION_BACKEND='cached_db'
+            )
+
+    def test_shared_cache_keeps_cached_sessions(self):
+        loaded = self.load_settings(CACHE_BACKEND='file')
+        self.assertEqual(loaded['SESSION_ENGINE'], 'task_manager.sessions')
+        self.assertIsNone(loaded['SESSION_CACHE_MAX_AGE'])
+
+    @override_settings(
+        SESSION_ENGINE='django.contrib.sessions.backends.signed_cookies'
+    )
+    def test_signed_cookie_sessions(self):
+        self.login()
+        self.assertIn('sessionid', self.client.cookies)
+        response = self.client.get(reverse('tasks:tasks'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['user'], self.user)
+        self.client.get(reverse('logout'))
+        self.assertRedirects(
+            self.client.get(reverse('tasks:tasks')),
+            reverse('users:login'),
+        )
+
+
+class FakeRedis:
+    # Stands in for redis.Redis behind Django's RedisCache: every client
+    # shares one dict, like clients of one server. Expiry is ignored.
+    data = {}
+
+    def __init__(self, connection_pool=None):
+        self.connection_pool = connection_pool
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.data:
+            return None
+        if not isinstance(value, bytes):
+            value = str(value).encode()
+        self.data[key] = value
+        return True
+
+    def delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    def flushdb(self):
+        self.data.clear()
+        return True
+
+
+class CacheLayerTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        choices.clear()
+        self.addCleanup(cache.clear)
+        self.user = CustomUser.objects.create_user(
+            username='cache', first_name='Кеш', last_name='Тестов'
+        )
+        self.status = Status.objects.create(name='Новый')
+        Task.objects.create(
+            name='Кешируемая', description='', author=self.user,
+            status=self.status,
+        )
+        self.client.force_login(self.user)
+
+    def shared_cache(self):
+        # A file cache for the default alias; sessions stay where the
+        # login put them.
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        return override_settings(CACHES={
+            **settings.CACHES,
+            'default': {
+                'BACKEND':
+                    'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': directory.name,
+            },
+        })
+
+    def test_warm_caches_fills_choices_and_first_page(self):
+        out = StringIO()
+        with self.shared_cache():
+            call_command('warm_caches', stdout=out)
+            self.assertIn('Caches warmed', out.getvalue())
+            self.assertEqual(
+                cache.get(choices.make_key('users')),
+                [(self.user.pk, 'Кеш Тестов')],
+            )
+            # user + table versions; the page comes from the cache
+            with self.assertNumQueries(2):
+                response = self.client.get(reverse('tasks:tasks'))
+        self.assertContains(response, 'Кешируемая')
+
+    def test_warm_caches_refuses_a_per_process_cache(self):
+        with self.assertRaisesMessage(CommandError, 'not shared'):
+            call_command('warm_caches', stdout=StringIO())
+
+    def test_first_page_is_rebuilt_after_a_write(self):
+        self.client.get(reverse('tasks:tasks'))
+        Task.objects.create(
+            name='Новее', description='', author=self.user,
+            status=self.status,
+        )
+        self.assertContains(self.client.get(reverse('tasks:tasks')), 'Новее')
+
+    def test_filtered_pages_are_not_cached(self):
+        self.client.get(reverse('tasks:tasks'))
+        # user + table versions + tasks
+        with self.assertNumQueries(3):
+            self.client.get(reverse('tasks:tasks'), {'self_tasks': 'on'})
+
+    def test_invalidation_reaches_the_shared_tier(self):
+        choices.get_choices('statuses')
+        self.assertIsNotNone(cache.get(choices.make_key('statuses')))
+        Status.objects.create(name='Готово')
+        self.assertIsNone(cache.get(choices.make_key('statuses')))
+
+    def test_redis_backend_round_trips_cached_values(self):
+        # The CACHE_BACKEND=redis configuration, talking to FakeRedis.
+        FakeRedis.data.clear()
+        self.addCleanup(FakeRedis.data.clear)
+        redis_cache = {
+            **settings.CACHES['default'], **settings.CACHE_BACKENDS['redis'],
+        }
+        with mock.patch('redis.Redis', FakeRedis), override_settings(
+            CACHES={**settings.CACHES, 'default': redis_cache}
+        ):
+            self.assertIsInstance(caches['default'], RedisCache)
+            choices.clear()
+            self.assertEqual(
+                choices.get_choices('users'), [(self.user.pk, 'Кеш Тестов')]
+            )
+            self.assertEqual(
+                cache.get(choices.make_key('users')),
+                [(self.user.pk, 'Кеш Тестов')],
+            )
+            self.assertTrue(FakeRedis.data)
+
+            page = first_task_page(10)
+            with self.assertNumQueries(1):
+                cached = first_task_page(10)
+            self.assertEqual(
+                [task.pk for task in cached.object_list],
+                [task.pk for task in page.object_list],
+            )
+
+            choices.get_choices('statuses')
+            self.assertIsNotNone(cache.get(choices.make_key('statuses')))
+            Status.objects.create(name='Готово')
+            self.assertIsNone(cache.get(choices.make_key('statuses')))
+
+    def test_file_backend_shares_the_first_page(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_cache = {
+                'BACKEND':
+                    'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': directory,
+            }
+            with override_settings(CACHES={
+                'default': file_cache, 'sessions': file_cache,
+            }):
+                page = first_task_page(10)
+                with self.assertNumQueries(1):
+                    cached = first_task_page(10)
+        self.assertEqual(
+            [task.pk for task in cached.object_list],
+            [task.pk for task in page.object_list],
+        )
+
+
+class DashboardTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(
+            username='dash', first_name='Анна', last_name='Иванова'
+        )
+        self.other = CustomUser.objects.create_user(username='other')
+        self.new = Status.objects.create(name='Новый')
+        self.done = Status.objects.create(name='Готово')
+        self.label = Label.objects.create(name='Баг')
+        self.mine = Task.objects.create(
+            name='Моя задача', status=self.new, author=self.other,
+            executor=self.user,
+        )
+        self.mine.labels.add(self.label)
+        Task.objects.create(
+            name='Чужая задача', status=self.done, author=self.user,
+            executor=self.other,
+        )
+        self.client.force_login(self.user)
+        self.url = reverse('main_page')
+
+    def test_widgets(self):
+        dashboard = self.client.get(self.url).context['dashboard']
+        self.assertEqual(dashboard['total'], 2)
+        self.assertEqual(
+            dashboard['by_status'], [('Новый', 1), ('Готово', 1)]
+        )
+        self.assertEqual(dashboard['top_labels'], [('Баг', 1)])
+        self.assertEqual(
+            [task['name'] for task in dashboard['recent']],
+            ['Чужая задача', 'Моя задача'],
+        )
+        self.assertEqual(dashboard['my_tasks']['count'], 1)
+        self.assertEqual(
+            [task['name'] for task in dashboard['my_tasks']['recent']],
+            ['Моя задача'],
+        )
+
+    def test_never_aggregates_over_tasks(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url)
+        self.assertFalse([
+            query for query in queries
+            if 'GROUP BY' in query['sql'] or 'COUNT(' in query['sql']
+        ])
+
+    def test_warm_dashboard_is_served_from_cache(self):
+        self.client.get(self.url)
+        # user, table versions
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                self.url, HTTP_CACHE_CONTROL='no-cache'
+            )
+        self.assertContains(response, 'Моя задача')
+
+    def test_widgets_are_rebuilt_only_for_the_tables_they_read(self):
+        self.client.get(self.url)
+        self.label.name = 'Ошибка'
+        self.label.save()
+        # user, table versions, top labels
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url)
+        self.assertEqual(
+            response.context['dashboard']['top_labels'], [('Ошибка', 1)]
+        )
+
+    def test_user_edits_keep_the_page_etag(self):
+        first = self.client.get(self.url)
+        self.other.first_name = 'Пётр'
+        self.other.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_writes_refresh_the_dashboard(self):
+        self.client.get(self.url)
+        Task.objects.create(
+            name='Новая задача', status=self.new, author=self.user,
+            executor=self.user,
+        )
+        dashboard = self.client.get(self.url).context['dashboard']
+        self.assertEqual(dashboard['total'], 3)
+        self.assertEqual(dashboard['my_tasks']['count'], 2)
+        self.assertEqual(dashboard['recent'][0]['name'], 'Новая задача')
+
+    def test_personal_widgets_are_per_user(self):
+        self.client.get(self.url)
+        self.client.force_login(self.other)
+        dashboard = self.client.get(self.url).context['dashboard']
+        self.assertEqual(
+            [task['name'] for task in dashboard['my_tasks']['recent']],
+            ['Чужая задача'],
+        )
+
+    def test_guests_get_the_landing_page(self):
+        self.client.logout()
+        response = self.client.get(self.url)
+        self.assertNotIn('dashboard', response.context)
+        self.assertContains(response, 'Регистрация')
+
+
+def reload_urlconfs():
+    # The app URLconfs pick sync or async views when imported, and the root
+    # one keeps resolvers holding their patterns.
+    for app in ('tasks', 'statuses', 'labels', 'users'):
+        importlib.reload(importlib.import_module(f'task_manager.{app}.urls'))
+    importlib.reload(importlib.import_module('task_manager.urls'))
+    clear_url_caches()
+
+
+class AsyncViewsTest(TestCase):
+
+    def setUp(self):
+        async_views = override_settings(ASYNC_VIEWS=True)
+        async_views.enable()
+        self.addCleanup(reload_urlconfs)
+        self.addCleanup(async_views.disable)
+        reload_urlconfs()
+        self.user = CustomUser.objects.create_user(
+            username='async', first_name='Асинхронный', last_name='Читатель'
+        )
+        self.new = Status.objects.create(name='Новый')
+        self.done = Status.objects.create(name='Готово')
+        self.label = Label.objects.create(name='Баг')
+        self.task = Task.objects.create(
+            name='Новая задача', description='Описание задачи',
+            author=self.user, status=self.new,
+        )
+        self.task.labels.add(self.label)
+        Task.objects.create(
+            name='Готовая задача', author=self.user, status=self.done,
+        )
+        self.async_client.force_login(self.user)
+
+    def test_read_pages_are_served_by_async_views(self):
+        for url in (
+            reverse('tasks:tasks'),
+            reverse('tasks:show_task', kwargs={'pk': self.task.pk}),
+            reverse('statuses:statuses'),
+            reverse('labels:labels'),
+            reverse('users:users'),
+        ):
+            with self.subTest(url=url):
+                self.assertTrue(resolve(url).func.view_class.view_is_async)
+        self.assertFalse(
+            resolve(reverse('tasks:create_task')).func.view_class
+            .view_is_async
+        )
+
+    async def test_task_list_and_filters(self):
+        response = await self.async_client.get(reverse('tasks:tasks'))
+        self.assertContains(response, 'Новая задача')
+        self.assertContains(response, 'Готовая задача')
+        response = await self.async_client.get(
+            reverse('tasks:tasks'), {'status': self.done.pk}
+        )
+        self.assertContains(response, 'Готовая задача')
+        self.assertNotContains(response, 'Новая задача')
+
+    async def test_task_detail(self):
+        response = await self.async_client.get(
+            reverse('tasks:show_task', kwargs={'pk': self.task.pk})
+        )
+        self.assertContains(response, 'Описание задачи')
+        self.assertContains(response, 'Баг')
+        response = await self.async_client.get(
+            reverse('tasks:show_task', kwargs={'pk': 0})
+        )
+        self.assertEqual(response.status_code, 404)
+
+    async def test_lists(self):
+        for url, text in (
+            (reverse('statuses:statuses'), 'Готово'),
+            (reverse('labels:labels'), 'Баг'),
+            (reverse('users:users'), 'Асинхронный Читатель'),
+        ):
+            with self.subTest(url=url):
+                self.assertContains(await self.async_client.get(url), text)
+
+    async def test_guests_are_sent_to_login(self):
+        response = await AsyncClient().get(reverse('tasks:tasks'))
+        self.assertRedirects(
+            response, reverse('users:login'), fetch_redirect_response=False
+        )
+
+    async def test_unchanged_page_answers_304(self):
+        url = reverse('tasks:tasks')
+        first = await self.async_client.get(url)
+        second = await self.async_client.get(
+            url, headers={'if-none-match': first['ETag']}
+        )
+        self.assertEqual(second.status_code, 304)
+
+    async def test_server_timing_counts_queries(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with override_settings(
+                SERVER_TIMING_ENABLED=True, SERVER_TIMING_DIR=directory
+            ):
+                response = await self.async_client.get(
+                    reverse('statuses:statuses')
+                )
+        timing.reset()
+        self.assertRegex(
+            response['Server-Timing'], r'db;dur=[\d.]+;desc="[1-9]\d* queries"'
+        )
+
+
+class QueryBudgetTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        budgets.seed()
+        cls.fixture = budgets.Fixture()
+
+    def test_every_url_name_has_a_budget(self):
+        self.assertEqual(set(budgets.BUDGETS), budgets.url_names())
+
+    def test_routes_stay_within_budget(self):
+        for url_name, budget in budgets.BUDGETS.items():
+            with self.subTest(url_name):
+                problem = budgets.check(url_name, budget, self.fixture)
+                if problem:
+                    self.fail(problem)
+
+    def test_report_lists_the_offending_sql(self):
+        budget = replace(budgets.BUDGETS['tasks:show_task'], queries=1)
+        problem = budgets.check('tasks:show_task', budget, self.fixture)
+        self.assertIn('tasks:show_task: 5 queries, budget 1', problem)
+        self.assertIn('FROM "tasks_task"', problem)
+
+    def test_writes_are_rolled_back(self):
+        label_ids = set(self.fixture.task.labels.values_list('pk', flat=True))
+        budgets.measure(
+            'tasks:bulk_tasks',
+            replace(
+                budgets.BUDGETS['tasks:bulk_tasks'],
+                data=lambda f: {'action': 'delete', 'tasks': [f.task.pk]},
+            ),
+            self.fixture,
+        )
+        self.assertEqual(
+            set(self.fixture.task.labels.values_list('pk', flat=True)),
+            label_ids,
+        )
+        self.assertTrue(Task.objects.filter(pk=self.fixture.task.pk).exists())
@@ -0,0 +1,215 @@
+import math
+import time
+from collections import defaultdict, deque
+from contextvars import ContextVar
+from threading import Lock
+
+from django.conf import settings
+from django.db import connections
+
+from task_manager import snapshots
+
+METRICS = ('total', 'view', 'db', 'template')
+PERCENTILES = (50, 95, 99)
+
+# Metrics of the request being handled; None whenever the middleware is
+# disabled, so the record_* hooks cost a single ContextVar lookup.
+_current = ContextVar('request_timing', default=None)
+
+_samples = defaultdict(lambda: deque(maxlen=settings.SERVER_TIMING_WINDOW))
+_lock = Lock()
+_last_snapshot = 0.0
+
+
+class RequestTiming:
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.view_started = None
+        self.view_ms = 0.0
+        self.db_ms = 0.0
+        self.db_queries = 0
+        self.template_ms = 0.0
+        self.template_depth = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def total_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_ms += (time.perf_counter() - started) * 1000
+            self.db_queries += 1
+
+    def server_timing(self, total_ms):
+        return ', '.join([
+            f'total;dur={total_ms:.1f}',
+            f'view;dur={self.view_ms:.1f}',
+            f'db;dur={self.db_ms:.1f};desc="{self.db_queries} queries"',
+            f'tpl;dur={self.template_ms:.1f}',
+            f'cache;desc="{self.cache_hits} hits, '
+            f'{self.cache_misses} misses"',
+        ])
+
+
+def start():
+    timing = RequestTiming()
+    return timing, _current.set(timing)
+
+
+def finish(token):
+    _current.reset(token)
+
+
+def current():
+    return _current.get()
+
+
+def record_cache(hit):
+    timing = _current.get()
+    if timing is not None:
+        if hit:
+            timing.cache_hits += 1
+        else:
+            timing.cache_misses += 1
+
+
+def execute_wrapper(execute, sql, params, many, context):
+    timing = _current.get()
+    if timing is None:
+        return execute(sql, params, many, context)
+    return timing.execute_wrapper(execute, sql, params, many, context)
+
+
+def instrument_connections():
+    # Connections are per thread, and the async ORM queries from a worker
+    # thread, so this runs in whichever thread does the querying. The
+    # wrapper stays installed and passes through outside timed requests.
+    for connection in connections.all():
+        if execute_wrapper not in connection.execute_wrappers:
+            connection.execute_wrappers.append(execute_wrapper)
+
+
+def instrument_templates():
+    # Only the outermost render is timed; {% include %} and {% extends %}
+    # render nested templates inside it.
+    from django.template.base import Template
+
+    if getattr(Template.render, 'timed', False):
+        return
+    render = Template.render
+
+    def timed_render(self, context):
+        timing = _current.get()
+        if timing is None:
+            return render(self, context)
+        timing.template_depth += 1
+        started = time.perf_counter()
+        try:
+            return render(self, context)
+        finally:
+            timing.template_depth -= 1
+            if not timing.template_depth:
+                timing.template_ms += (time.perf_counter() - started) * 1000
+
+    timed_render.timed = True
+    Template.render = timed_render
+
+
+def instrument_caches():
+    # Counts every lookup on the configured backends: versioned keys,
+    # choice lists, {% cache %} fragments and cached sessions alike.
+    from django.core.cache import caches
+
+    for alias in settings.CACHES:
+        backend = type(caches[alias])
+        if getattr(backend.get, 'timed', False):
+            continue
+        backend.get = timed_get(backend.get)
+
+
+def timed_get(get):
+
+    def wrapper(self, key, default=None, version=None):
+        value = get(self, key, default, version)
+        record_cache(hit=value is not default)
+        return value
+
+    wrapper.timed = True
+    return wrapper
+
+
+def record(name, timing, total_ms):
+    sample = (total_ms, timing.view_ms, timing.db_ms, timing.template_ms)
+    with _lock:
+        _samples[name].append(sample)
+    maybe_snapshot()
+
+
+def percentile(values, rank):
+    ordered = sorted(values)
+    index = max(0, math.ceil(rank / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def summarize(samples):
+    report = {}
+    for name, rows in samples.items():
+        if not rows:
+            continue
+        columns = list(zip(*rows))
+        report[name] = {
+            'count': len(rows),
+            **{
+                f'{metric}_p{rank}': round(percentile(values, rank), 2)
+                for metric, values in zip(METRICS, columns)
+                for rank in PERCENTILES
+            },
+        }
+    return report
+
+
+def get_samples():
+    with _lock:
+        return {name: list(rows) for name, rows in _samples.items()}
+
+
+def reset():
+    global _last_snapshot
+    with _lock:
+        _samples.clear()
+    _last_snapshot = 0.0
+
+
+def write_snapshot():
+    snapshots.write_snapshot(settings.SERVER_TIMING_DIR, get_samples())
+
+
+def maybe_snapshot():
+    global _last_snapshot
+    now = time.monotonic()
+    if now - _last_snapshot < settings.SERVER_TIMING_SNAPSHOT_INTERVAL:
+        return
+    _last_snapshot = now
+    try:
+        write_snapshot()
+    except OSError:
+        pass
+
+
+def read_snapshots():
+    samples = defaultdict(list)
+    for data in snapshots.read_snapshots(
+        settings.SERVER_TIMING_DIR
+    ).values():
+        for name, rows in data.items():
+            samples[name].extend(tuple(row) for row in rows)
+    return samples
+
+
+def remove_snapshots():
+    snapshots.remove_snapshots(settings.SERVER_TIMING_DIR)
@@ -23,6 +23,7 @@ from .views import HomePageView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('api/', include('task_manager.api.urls')),
     path('', HomePageView.as_view(), name='main_page'),
     path('labels/', include('task_manager.labels.urls')),
     path('statuses/', include('task_manager.statuses.urls')),
@@ -0,0 +1,43 @@
+from django.db import migrations
+
+# Indexes for the case-insensitive prefix search used by the user
+# autocomplete endpoint (``istartswith``). SQLite needs NOCASE indexes for
+# its LIKE optimisation, PostgreSQL a pattern_ops index on UPPER().
+COLUMNS = ('username', 'first_name', 'last_name')
+
+
+def index_name(column):
+    return f'users_customuser_{column}_prefix_idx'
+
+
+def create_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    for column in COLUMNS:
+        if vendor == 'postgresql':
+            expression = f'(UPPER({column}::text) text_pattern_ops)'
+        elif vendor == 'sqlite':
+            expression = f'({column} COLLATE NOCASE)'
+        else:
+            continue
+        schema_editor.execute(
+            f'CREATE INDEX {index_name(column)} '
+            f'ON users_customuser {expression}'
+        )
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor not in ('postgresql', 'sqlite'):
+        return
+    for column in COLUMNS:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {index_name(column)}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
@@ -158,3 +158,88 @@ class UserCRUDTestWithFixtures(TestCase):
                     "Только авторизованные пользователи "
                     "могут редактировать или удалять"
                 )
+
+
+class UserObjectQueriesTest(TestCase):
+    fixtures = ['users.json']
+
+    def setUp(self):
+        self.user = CustomUser.objects.get(username='dixon')
+        self.other_user = CustomUser.objects.get(username='mary')
+        self.client.force_login(self.user)
+
+    def test_own_account_reuses_the_session_user(self):
+        for name in ('users:edit_user', 'users:delete_user'):
+            url = reverse(name, kwargs={'pk': self.user.pk})
+            with self.assertNumQueries(1):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+
+    def test_other_account_is_loaded_once(self):
+        for name in ('users:edit_user', 'users:delete_user'):
+            url = reverse(name, kwargs={'pk': self.other_user.pk})
+            for method in (self.client.get, self.client.post):
+                with self.assertNumQueries(2):
+                    response = method(url)
+                self.assertRedirects(response, reverse('users:users'))
+
+    def test_edit_saves_without_touching_the_session_user(self):
+        url = reverse('users:edit_user', kwargs={'pk': self.user.pk})
+        response = self.client.post(url, {
+            'first_name': 'Новое',
+            'last_name': self.user.last_name,
+            'username': self.user.username,
+            'password1': 'newpass123',
+            'password2': 'newpass123',
+        })
+        self.assertRedirects(response, reverse('users:users'))
+        self.assertEqual(
+            CustomUser.objects.get(pk=self.user.pk).first_name, 'Новое'
+        )
+        self.assertEqual(
+            self.client.get(reverse('users:users')).status_code, 200
+        )
+
+    def test_missing_account(self):
+        url = reverse('users:edit_user', kwargs={'pk': 0})
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+
+class UserAutocompleteTest(TestCase):
+    fixtures = ['users.json']
+
+    def setUp(self):
+        self.user = CustomUser.objects.get(username='dixon')
+        self.client.force_login(self.user)
+        self.url = reverse('users:autocomplete')
+
+    def test_prefix_search_over_names(self):
+        response = self.client.get(self.url, {'q': 'oleg'})
+        self.assertIn(
+            {'id': self.user.pk, 'text': str(self.user)},
+            response.json()['results'],
+        )
+        response = self.client.get(self.url, {'q': 'dix'})
+        self.assertIn(
+            self.user.pk, [r['id'] for r in response.json()['results']]
+        )
+        response = self.client.get(self.url, {'q': 'leg'})
+        self.assertNotIn(
+            self.user.pk, [r['id'] for r in response.json()['results']]
+        )
+
+    def test_limit_is_bounded(self):
+        CustomUser.objects.bulk_create(
+            CustomUser(username=f'bulk{i}', first_name='Bulk')
+            for i in range(60)
+        )
+        response = self.client.get(self.url, {'q': 'bulk', 'limit': 1000})
+        self.assertEqual(len(response.json()['results']), 50)
+        response = self.client.get(self.url, {'q': 'bulk', 'limit': 5})
+        self.assertEqual(len(response.json()['results']), 5)
+
+    def test_empty_query_returns_nothing(self):
+        # only the user lookup, the session is cached
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.json(), {'results': []})
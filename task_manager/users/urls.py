@@ -1,13 +1,19 @@
 from django.urls import path
 
+from task_manager.mixins import pick_view
 from task_manager.users import views as user_views
 
+user_list_view = pick_view(user_views.UserView, user_views.AsyncUserView)
+
 app_name = 'users'
 
 urlpatterns = [
      path('',
-         user_views.UserView.as_view(),
+         user_list_view,
          name='users'),
+     path('autocomplete/',
+         user_views.UserAutocompleteView.as_view(),
+         name='autocomplete'),
      path('create/',
          user_views.RegistrationView.as_view(),
          name='create_user'),
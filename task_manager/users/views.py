@@ -1,7 +1,9 @@
+from copy import copy
+
 from django.contrib import messages
 from django.contrib.auth import logout, update_session_auth_hash
 from django.contrib.auth.views import LoginView
-from django.db.models import ProtectedError, Value
+from django.db.models import ProtectedError, Q, Value
 from django.db.models.functions import Concat
 from django.shortcuts import redirect
 from django.urls import reverse_lazy
@@ -13,16 +15,25 @@ from django.views.generic import (
     View,
 )
 
-from task_manager.mixins import LoginRequiredMixin
+from task_manager.mixins import (
+    AsyncListMixin,
+    AutocompleteMixin,
+    ConditionalGetMixin,
+    LoginRequiredMixin,
+    ObjectPermissionMixin,
+    ReplicaReadMixin,
+)
 from task_manager.users.models import CustomUser
+from task_manager.versions import USERS
 
 from .forms import LoginUserForm, RegisterUserForm, UserEditForm
 
 
-class UserView(ListView):
+class UserView(ReplicaReadMixin, ConditionalGetMixin, ListView):
     model = CustomUser
     template_name = 'users/index.html'
     context_object_name = 'users'
+    version_tables = (USERS,)
     
     def get_queryset(self):
         return CustomUser.objects.annotate(
@@ -35,6 +46,25 @@ class UserView(ListView):
         ).order_by('date_joined')
 
 
+class AsyncUserView(AsyncListMixin, UserView):
+    pass
+
+
+class UserAutocompleteView(LoginRequiredMixin, AutocompleteMixin, View):
+    def get_results(self, query, limit):
+        users = CustomUser.objects.filter(
+            Q(username__istartswith=query)
+            | Q(first_name__istartswith=query)
+            | Q(last_name__istartswith=query)
+        ).order_by('first_name', 'last_name', 'pk').values_list(
+            'pk', 'first_name', 'last_name'
+        )[:limit]
+        return [
+            {'id': pk, 'text': f'{first_name} {last_name}'}
+            for pk, first_name, last_name in users
+        ]
+
+
 class RegistrationView(CreateView):
     form_class = RegisterUserForm
     template_name = 'users/create.html'
@@ -66,22 +96,28 @@ class LogoutUserView(LoginRequiredMixin, View):
         return redirect('main_page')
 
 
-class UserEditView(LoginRequiredMixin, UpdateView):
+class OwnAccountMixin(ObjectPermissionMixin):
+    permission_denied_message = (
+        'У вас нет прав для изменения другого пользователя'
+    )
+
+    def load_object(self):
+        # The only account anyone may change is the one already loaded for
+        # the session. A copy keeps form validation off request.user.
+        if self.kwargs.get(self.pk_url_kwarg) == self.request.user.pk:
+            return copy(self.request.user)
+        return super().load_object()
+
+    def has_object_permission(self, user):
+        return user.pk == self.request.user.pk
+
+
+class UserEditView(LoginRequiredMixin, OwnAccountMixin, UpdateView):
     model = CustomUser
     form_class = UserEditForm
     template_name = 'users/edit.html'
     success_url = reverse_lazy('users:users')
 
-    def dispatch(self, request, *args, **kwargs):
-        user = self.get_object()
-        if request.user.pk != user.pk:
-            messages.error(
-                request,
-                'У вас нет прав для изменения другого пользователя'
-            )
-            return redirect(self.success_url)
-        return super().dispatch(request, *args, **kwargs)
-    
     def form_valid(self, form):
         response = super().form_valid(form)
         if self.request.user.pk == self.object.pk:
@@ -90,27 +126,15 @@ class UserEditView(LoginRequiredMixin, UpdateView):
         return response
     
 
-class UserDeleteView(LoginRequiredMixin, DeleteView):
+class UserDeleteView(LoginRequiredMixin, OwnAccountMixin, DeleteView):
     model = CustomUser
     template_name = 'users/user_confirm_delete.html'
     success_url = reverse_lazy('users:users')
-
-    def get(self, request, *args, **kwargs):
-        if request.user.pk != self.get_object().pk:
-            messages.error(
-                request, 'У вас нет прав для изменения другого пользователя.'
-            )
-            return redirect(self.success_url)
-        return super().get(request, *args, **kwargs)
+    permission_denied_message = (
+        'У вас нет прав для изменения другого пользователя.'
+    )
 
     def form_valid(self, form):
-        if self.request.user.pk != self.get_object().pk:
-            messages.error(
-                self.request,
-                'У вас нет прав для изменения другого пользователя.'
-            )
-            return redirect(self.success_url)
-        
         try:
             response = super().form_valid(form)
             messages.success(self.request, 'Пользователь успешно удален')
@@ -120,4 +144,4 @@ class UserDeleteView(LoginRequiredMixin, DeleteView):
                 self.request,
                 'Невозможно удалить пользователя, потому что он используется'
             )
-            return redirect(self.success_url)
\ No newline at end of file
+            return redirect(self.success_url)
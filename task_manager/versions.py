@@ -0,0 +1,56 @@
+import hashlib
+
+from django.db.models import F
+from django.utils import timezone
+
+from .models import TableVersion
+
+TASKS = 'tasks'
+STATUSES = 'statuses'
+LABELS = 'labels'
+USERS = 'users'
+TABLES = (TASKS, STATUSES, LABELS, USERS)
+
+
+def bump_versions(*names):
+    now = timezone.now()
+    for name in names:
+        updated = TableVersion.objects.filter(name=name).update(
+            version=F('version') + 1, updated_at=now
+        )
+        if not updated:
+            TableVersion.objects.get_or_create(
+                name=name, defaults={'version': 1, 'updated_at': now}
+            )
+
+
+def get_versions(*names):
+    return {
+        name: (version, updated_at)
+        for name, version, updated_at in TableVersion.objects.filter(
+            name__in=names
+        ).values_list('name', 'version', 'updated_at')
+    }
+
+
+async def aget_versions(*names):
+    return {
+        name: (version, updated_at)
+        async for name, version, updated_at in TableVersion.objects.filter(
+            name__in=names
+        ).values_list('name', 'version', 'updated_at')
+    }
+
+
+def make_etag(versions, *parts):
+    raw = '|'.join(
+        [str(part) for part in parts]
+        + [f'{name}:{versions[name][0]}' for name in sorted(versions)]
+    )
+    return hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest()
+
+
+def last_modified(versions):
+    if not versions:
+        return None
+    return max(updated_at for _, updated_at in versions.values())
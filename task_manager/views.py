@@ -1,8 +1,17 @@
-from django.shortcuts import render
 from django.views.generic.base import TemplateView
 
+from task_manager.mixins import ConditionalGetMixin, ReplicaReadMixin
+from task_manager.tasks import dashboard
 
-class HomePageView(TemplateView):
 
-    def get(self, request):
-        return render(request, 'index.html')
\ No newline at end of file
+class HomePageView(ReplicaReadMixin, ConditionalGetMixin, TemplateView):
+    template_name = 'index.html'
+    version_tables = dashboard.widget_tables()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        if self.request.user.is_authenticated:
+            context['dashboard'] = dashboard.get_dashboard(
+                self.request.user, self.table_versions
+            )
+        return context